@@ -0,0 +1,30 @@
+"""Add full-text search indexes over product names."""
+
+revision = "0003_product_search_index"
+down_revision = "0002_global_settings"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+
+from app.models.product import PRODUCT_SEARCH_DDL
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for statement in PRODUCT_SEARCH_DDL.get(dialect, ()):
+        op.execute(statement)
+    if dialect == "sqlite":
+        # External-content FTS5 tables start empty; index the existing rows.
+        op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("products_fts_ai", "products_fts_ad", "products_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS products_fts")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_products_name_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_products_name_fts")
@@ -0,0 +1,18 @@
+"""Add composite indexes for keyset pagination over products."""
+
+revision = "0004_product_keyset_indexes"
+down_revision = "0003_product_search_index"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+
+
+def upgrade() -> None:
+    op.create_index("ix_products_price_id", "products", ["price", "id"], if_not_exists=True)
+    op.create_index("ix_products_updated_at_id", "products", ["updated_at", "id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_updated_at_id", table_name="products")
+    op.drop_index("ix_products_price_id", table_name="products")
@@ -0,0 +1,43 @@
+"""Add product_stock_summary and backfill it from inventory."""
+
+revision = "0006_product_stock_summary"
+down_revision = "0005_catalog_version"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.create_table(
+        "product_stock_summary",
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("total_available", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("branches_in_stock", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_changed", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("product_id"),
+    )
+    op.create_index(
+        "ix_product_stock_summary_branches_in_stock", "product_stock_summary", ["branches_in_stock"]
+    )
+    op.create_index(
+        "ix_product_stock_summary_total_available", "product_stock_summary", ["total_available", "product_id"]
+    )
+    op.execute(
+        """
+        INSERT INTO product_stock_summary (product_id, total_available, branches_in_stock)
+        SELECT product_id,
+               SUM(available_quantity),
+               SUM(CASE WHEN available_quantity > 0 THEN 1 ELSE 0 END)
+        FROM inventory
+        GROUP BY product_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_product_stock_summary_total_available", table_name="product_stock_summary")
+    op.drop_index("ix_product_stock_summary_branches_in_stock", table_name="product_stock_summary")
+    op.drop_table("product_stock_summary")
@@ -0,0 +1,25 @@
+"""Stamp products and stock summaries with the catalog version that last changed them."""
+
+revision = "0007_catalog_version_stamps"
+down_revision = "0006_product_stock_summary"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    for table in ("products", "product_stock_summary"):
+        op.add_column(table, sa.Column("catalog_version", sa.BigInteger(), nullable=False, server_default="0"))
+    op.create_index("ix_products_catalog_version", "products", ["catalog_version"])
+    op.create_index(
+        "ix_product_stock_summary_catalog_version", "product_stock_summary", ["catalog_version"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_product_stock_summary_catalog_version", table_name="product_stock_summary")
+    op.drop_index("ix_products_catalog_version", table_name="products")
+    for table in ("product_stock_summary", "products"):
+        op.drop_column(table, "catalog_version")
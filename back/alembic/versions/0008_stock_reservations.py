@@ -0,0 +1,33 @@
+"""Add stock_reservations for two-phase checkout."""
+
+revision = "0008_stock_reservations"
+down_revision = "0007_catalog_version_stamps"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_reservations",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("idempotency_key_id", sa.Integer(), nullable=False),
+        sa.Column("inventory_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["idempotency_key_id"], ["idempotency_keys.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["inventory_id"], ["inventory.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_stock_reservations_idempotency_key_id", "stock_reservations", ["idempotency_key_id"])
+    op.create_index("ix_stock_reservations_expires_at", "stock_reservations", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_reservations_expires_at", table_name="stock_reservations")
+    op.drop_index("ix_stock_reservations_idempotency_key_id", table_name="stock_reservations")
+    op.drop_table("stock_reservations")
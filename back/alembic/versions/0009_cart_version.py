@@ -0,0 +1,17 @@
+"""Add carts.version, bumped whenever a cart's items change."""
+
+revision = "0009_cart_version"
+down_revision = "0008_stock_reservations"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.add_column("carts", sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("carts", "version")
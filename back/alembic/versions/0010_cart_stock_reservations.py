@@ -0,0 +1,43 @@
+"""Let stock_reservations hold stock for cart lines as well as checkouts."""
+
+revision = "0010_cart_stock_reservations"
+down_revision = "0009_cart_version"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.alter_column("stock_reservations", "idempotency_key_id", existing_type=sa.Integer(), nullable=True)
+    op.add_column("stock_reservations", sa.Column("cart_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_stock_reservations_cart_id", "stock_reservations", "carts", ["cart_id"], ["id"], ondelete="CASCADE"
+    )
+    op.create_unique_constraint(
+        "uq_stock_reservations_cart_product", "stock_reservations", ["cart_id", "product_id"]
+    )
+
+
+def downgrade() -> None:
+    # Hand cart-held stock back before dropping the rows that track it.
+    op.execute(
+        """
+        UPDATE inventory
+        SET available_quantity = inventory.available_quantity + held.quantity,
+            reserved_quantity = inventory.reserved_quantity - held.quantity
+        FROM (
+            SELECT inventory_id, SUM(quantity) AS quantity
+            FROM stock_reservations
+            WHERE cart_id IS NOT NULL
+            GROUP BY inventory_id
+        ) AS held
+        WHERE inventory.id = held.inventory_id
+        """
+    )
+    op.execute("DELETE FROM stock_reservations WHERE cart_id IS NOT NULL")
+    op.drop_constraint("uq_stock_reservations_cart_product", "stock_reservations", type_="unique")
+    op.drop_constraint("fk_stock_reservations_cart_id", "stock_reservations", type_="foreignkey")
+    op.drop_column("stock_reservations", "cart_id")
+    op.alter_column("stock_reservations", "idempotency_key_id", existing_type=sa.Integer(), nullable=False)
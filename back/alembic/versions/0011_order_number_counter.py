@@ -0,0 +1,23 @@
+"""Add the order_number_counter that order number blocks are leased from."""
+
+revision = "0011_order_number_counter"
+down_revision = "0010_cart_stock_reservations"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.create_table(
+        "order_number_counter",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("next_value", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO order_number_counter (id, next_value) VALUES (1, 1)")
+
+
+def downgrade() -> None:
+    op.drop_table("order_number_counter")
@@ -0,0 +1,17 @@
+"""Add global_settings.version, bumped whenever an admin saves settings."""
+
+revision = "0012_global_settings_version"
+down_revision = "0011_order_number_counter"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.add_column("global_settings", sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("global_settings", "version")
@@ -0,0 +1,105 @@
+"""Partition audit by month on Postgres and index it for the admin list filters."""
+
+revision = "0013_audit_partitions"
+down_revision = "0012_global_settings_version"
+branch_labels = None
+depends_on = None
+
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.audit import AUDIT_DEFAULT_PARTITION, audit_partition_ddl, month_start
+
+_COLUMNS = "id, entity_type, entity_id, action, old_value, new_value, context, actor_user_id, created_at"
+_OLD_INDEXES = ("ix_audit_entity_type", "ix_audit_action", "ix_audit_actor_user_id")
+_NEW_INDEXES = {
+    "ix_audit_created_at_id": ["created_at", "id"],
+    "ix_audit_entity_type_action_created_at": ["entity_type", "action", "created_at"],
+    "ix_audit_action_created_at": ["action", "created_at"],
+    "ix_audit_actor_user_id_created_at": ["actor_user_id", "created_at"],
+}
+_MONTHS_AHEAD = 3
+
+
+def _is_partitioned(bind) -> bool:
+    return bool(bind.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = 'audit'"
+    )).scalar())
+
+
+def _drop_indexes(bind, table: str) -> None:
+    names = bind.execute(sa.text(
+        "SELECT indexname FROM pg_indexes WHERE tablename = :table AND indexname NOT LIKE '%_pkey'"
+    ), {"table": table}).scalars().all()
+    for name in names:
+        op.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+def _partition(bind) -> None:
+    op.execute("ALTER TABLE audit RENAME TO audit_unpartitioned")
+    op.execute("ALTER TABLE audit_unpartitioned RENAME CONSTRAINT audit_pkey TO audit_unpartitioned_pkey")
+    _drop_indexes(bind, "audit_unpartitioned")
+    op.execute(
+        """
+        CREATE TABLE audit (
+            id INTEGER NOT NULL DEFAULT nextval('audit_id_seq'),
+            entity_type VARCHAR(64) NOT NULL,
+            entity_id INTEGER NOT NULL,
+            action VARCHAR(64) NOT NULL,
+            old_value JSON,
+            new_value JSON,
+            context JSON,
+            actor_user_id INTEGER REFERENCES users (id),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("ALTER SEQUENCE audit_id_seq OWNED BY audit.id")
+
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM audit_unpartitioned")).scalar()
+    month = month_start(oldest or datetime.utcnow())
+    last = month_start(datetime.utcnow(), _MONTHS_AHEAD)
+    while month <= last:
+        op.execute(audit_partition_ddl(month))
+        month = month_start(month, 1)
+    op.execute(f"CREATE TABLE IF NOT EXISTS {AUDIT_DEFAULT_PARTITION} PARTITION OF audit DEFAULT")
+
+    op.execute(f"INSERT INTO audit ({_COLUMNS}) SELECT {_COLUMNS} FROM audit_unpartitioned")
+    op.execute("DROP TABLE audit_unpartitioned")
+
+
+def _unpartition() -> None:
+    op.execute("ALTER TABLE audit RENAME TO audit_partitioned")
+    op.execute("ALTER TABLE audit_partitioned RENAME CONSTRAINT audit_pkey TO audit_partitioned_pkey")
+    op.execute("CREATE TABLE audit (LIKE audit_partitioned INCLUDING DEFAULTS)")
+    op.execute("ALTER TABLE audit ADD PRIMARY KEY (id)")
+    op.execute("ALTER TABLE audit ADD FOREIGN KEY (actor_user_id) REFERENCES users (id)")
+    op.execute("ALTER SEQUENCE audit_id_seq OWNED BY audit.id")
+    op.execute(f"INSERT INTO audit ({_COLUMNS}) SELECT {_COLUMNS} FROM audit_partitioned")
+    op.execute("DROP TABLE audit_partitioned CASCADE")
+    op.create_index("ix_audit_entity_id", "audit", ["entity_id"], if_not_exists=True)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and not _is_partitioned(bind):
+        _partition(bind)
+        op.create_index("ix_audit_entity_id", "audit", ["entity_id"], if_not_exists=True)
+    for name in _OLD_INDEXES:
+        op.drop_index(name, table_name="audit", if_exists=True)
+    for name, columns in _NEW_INDEXES.items():
+        op.create_index(name, "audit", columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and _is_partitioned(bind):
+        _unpartition()
+    for name in _NEW_INDEXES:
+        op.drop_index(name, table_name="audit", if_exists=True)
+    op.create_index("ix_audit_entity_type", "audit", ["entity_type"], if_not_exists=True)
+    op.create_index("ix_audit_action", "audit", ["action"], if_not_exists=True)
+    op.create_index("ix_audit_actor_user_id", "audit", ["actor_user_id"], if_not_exists=True)
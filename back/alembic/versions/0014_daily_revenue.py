@@ -0,0 +1,44 @@
+"""Add the daily_revenue rollup and index orders by (status, created_at)."""
+
+revision = "0014_daily_revenue"
+down_revision = "0013_audit_partitions"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+def upgrade() -> None:
+    fulfillment_type = postgresql.ENUM("DELIVERY", "PICKUP", name="fulfillment_type", create_type=False)
+    if op.get_bind().dialect.name != "postgresql":
+        fulfillment_type = sa.Enum("DELIVERY", "PICKUP", name="fulfillment_type")
+    op.create_table(
+        "daily_revenue",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("branch_id", sa.Integer(), nullable=False),
+        sa.Column("fulfillment_type", fulfillment_type, nullable=False),
+        sa.Column("order_count", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Numeric(14, 2), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("day", "branch_id", "fulfillment_type"),
+    )
+    # Backfill from existing delivered orders so the revenue charts are not empty after deploy.
+    op.execute(
+        """
+        INSERT INTO daily_revenue (day, branch_id, fulfillment_type, order_count, revenue)
+        SELECT DATE(created_at), COALESCE(branch_id, 0), fulfillment_type, COUNT(*), SUM(total_amount)
+        FROM orders
+        WHERE status = 'DELIVERED'
+        GROUP BY DATE(created_at), COALESCE(branch_id, 0), fulfillment_type
+        """
+    )
+    op.create_index("ix_orders_status_created_at", "orders", ["status", "created_at"], if_not_exists=True)
+    op.drop_index("ix_orders_status", table_name="orders", if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index("ix_orders_status", "orders", ["status"], if_not_exists=True)
+    op.drop_index("ix_orders_status_created_at", table_name="orders", if_exists=True)
+    op.drop_table("daily_revenue")
@@ -3,6 +3,7 @@
 from flask import Flask
 
 from .services.branch import BranchCoreService
+from .services.catalog import autocomplete_index, vocabulary_index
 from .config import AppConfig
 from .extensions import db, jwt, limiter
 from .middleware import register_middlewares
@@ -50,6 +51,8 @@ def create_app(config: AppConfig | None = None) -> Flask:
     _register_options_short_circuit(app)
     with app.app_context():
         BranchCoreService.ensure_delivery_source_branch_exists(app.config.get("DELIVERY_SOURCE_BRANCH_ID", ""))
+        autocomplete_index.warm()
+        vocabulary_index.warm()
 
     return app
 
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 import os
+import tempfile
 from dataclasses import dataclass, field
 from pathlib import Path
 from dotenv import load_dotenv
@@ -35,6 +36,32 @@ class AppConfig:
     SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
     SQLALCHEMY_DATABASE_URI: str = field(init=False)
     RATE_LIMIT_DEFAULTS: str = field(default_factory=lambda: _env_or_default("RATE_LIMIT_DEFAULTS", "200 per day, 50 per hour"))
+    AUTOCOMPLETE_REFRESH_SECONDS: int = field(default_factory=lambda: int(_env_or_default("AUTOCOMPLETE_REFRESH_SECONDS", "300")))
+    CATALOG_CACHE_MAX_ENTRIES: int = field(default_factory=lambda: int(_env_or_default("CATALOG_CACHE_MAX_ENTRIES", "2048")))
+    CATALOG_CACHE_MAX_AGE: int = field(default_factory=lambda: int(_env_or_default("CATALOG_CACHE_MAX_AGE", "30")))
+    SEARCH_FACET_TTL_SECONDS: int = field(default_factory=lambda: int(_env_or_default("SEARCH_FACET_TTL_SECONDS", "30")))
+    SEARCH_FUZZY_BUDGET_MS: int = field(default_factory=lambda: int(_env_or_default("SEARCH_FUZZY_BUDGET_MS", "250")))
+    SETTINGS_CACHE_TTL_SECONDS: int = field(default_factory=lambda: int(_env_or_default("SETTINGS_CACHE_TTL_SECONDS", "30")))
+    CATALOG_SNAPSHOT_DIR: str = field(default_factory=lambda: _env_or_default(
+        "CATALOG_SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "catalog-snapshots")
+    ))
+    CATALOG_SNAPSHOT_MAX_AGE: int = field(default_factory=lambda: int(_env_or_default("CATALOG_SNAPSHOT_MAX_AGE", "300")))
+    CHECKOUT_LOCK_TIMEOUT_MS: int = field(default_factory=lambda: int(_env_or_default("CHECKOUT_LOCK_TIMEOUT_MS", "2000")))
+    CHECKOUT_LOCK_RETRIES: int = field(default_factory=lambda: int(_env_or_default("CHECKOUT_LOCK_RETRIES", "3")))
+    CHECKOUT_LOCK_RETRY_BASE_MS: int = field(default_factory=lambda: int(_env_or_default("CHECKOUT_LOCK_RETRY_BASE_MS", "25")))
+    CHECKOUT_RESERVATION_TTL_SECONDS: int = field(default_factory=lambda: int(_env_or_default("CHECKOUT_RESERVATION_TTL_SECONDS", "600")))
+    CART_RESERVATIONS_ENABLED: bool = field(default_factory=lambda: _env_bool("CART_RESERVATIONS_ENABLED", "false"))
+    CART_RESERVATION_TTL_SECONDS: int = field(default_factory=lambda: int(_env_or_default("CART_RESERVATION_TTL_SECONDS", "900")))
+    CHECKOUT_PREVIEW_TTL_SECONDS: int = field(default_factory=lambda: int(_env_or_default("CHECKOUT_PREVIEW_TTL_SECONDS", "60")))
+    ORDER_NUMBER_BLOCK_SIZE: int = field(default_factory=lambda: int(_env_or_default("ORDER_NUMBER_BLOCK_SIZE", "100")))
+    OPS_METRICS_TTL_SECONDS: int = field(default_factory=lambda: int(_env_or_default("OPS_METRICS_TTL_SECONDS", "5")))
+    AUDIT_WRITE_MODE: str = field(default_factory=lambda: _env_or_default("AUDIT_WRITE_MODE", "commit"))
+    AUDIT_QUEUE_SIZE: int = field(default_factory=lambda: int(_env_or_default("AUDIT_QUEUE_SIZE", "10000")))
+    AUDIT_BATCH_SIZE: int = field(default_factory=lambda: int(_env_or_default("AUDIT_BATCH_SIZE", "500")))
+    AUDIT_QUEUE_TIMEOUT_MS: int = field(default_factory=lambda: int(_env_or_default("AUDIT_QUEUE_TIMEOUT_MS", "50")))
+    AUDIT_RETENTION_MONTHS: int = field(default_factory=lambda: int(_env_or_default("AUDIT_RETENTION_MONTHS", "6")))
+    # No default: archived months are dropped from the database, so the files must land on durable storage.
+    AUDIT_ARCHIVE_DIR: str = field(default_factory=lambda: _env_or_default("AUDIT_ARCHIVE_DIR", ""))
 
     def __post_init__(self) -> None:
         self.SQLALCHEMY_DATABASE_URI = self.DATABASE_URL
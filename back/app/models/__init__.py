@@ -3,17 +3,22 @@ from .address import Address
 from .audit import Audit
 from .branch import Branch
 from .cart import Cart, CartItem
+from .catalog_version import CatalogVersion
 from .category import Category
+from .daily_revenue import DailyRevenue
 from .delivery_slot import DeliverySlot
 from .global_settings import GlobalSettings
 from .idempotency_key import IdempotencyKey
 from .inventory import Inventory
 from .order import Order, OrderDeliveryDetails, OrderItem, OrderPickupDetails
+from .order_number_counter import OrderNumberCounter
 from .payment_token import PaymentToken
 from .product import Product
+from .product_stock_summary import ProductStockSummary
 from .registration_otp import RegistrationOTP
 from .password_reset_token import PasswordResetToken
 from .stock_request import StockRequest
+from .stock_reservation import StockReservation
 from .user import User
 from .wishlist_item import WishlistItem
 from .enums import (
@@ -34,7 +39,9 @@ __all__ = [
     "Branch",
     "Cart",
     "CartItem",
+    "CatalogVersion",
     "Category",
+    "DailyRevenue",
     "DeliverySlot",
     "GlobalSettings",
     "IdempotencyKey",
@@ -42,12 +49,15 @@ __all__ = [
     "Order",
     "OrderDeliveryDetails",
     "OrderItem",
+    "OrderNumberCounter",
     "OrderPickupDetails",
     "PaymentToken",
     "Product",
+    "ProductStockSummary",
     "RegistrationOTP",
     "PasswordResetToken",
     "StockRequest",
+    "StockReservation",
     "User",
     "WishlistItem",
     "CartStatus",
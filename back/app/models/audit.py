@@ -1,24 +1,57 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String ,func
+from datetime import date, datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, JSON, String ,func
 from sqlalchemy.orm import relationship
 
 from .base import Base
 
 class Audit(Base):
     __tablename__ = "audit"
+    # Match AuditQueryService.list_logs filters, each ordered by created_at.
+    __table_args__ = (
+        Index("ix_audit_created_at_id", "created_at", "id"),
+        Index("ix_audit_entity_type_action_created_at", "entity_type", "action", "created_at"),
+        Index("ix_audit_action_created_at", "action", "created_at"),
+        Index("ix_audit_actor_user_id_created_at", "actor_user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    entity_type = Column(String(64), nullable=False, index=True)
+    entity_type = Column(String(64), nullable=False)
     entity_id = Column(Integer, nullable=False, index=True)
 
-    action = Column(String(64), nullable=False, index=True)
+    action = Column(String(64), nullable=False)
     old_value = Column(JSON, nullable=True)
     new_value = Column(JSON, nullable=True)
     context = Column(JSON, nullable=True)
 
-    actor_user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=True)
+    actor_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
 
     created_at = Column(DateTime, nullable=False, server_default=func.now())
 
     actor = relationship("User")
+
+
+# On Postgres ``audit`` is range-partitioned by month on created_at (migration 0013):
+# one ``audit_pYYYYMM`` table per month plus ``audit_default`` for anything outside
+# them. services/audit_retention.py creates upcoming months and drops archived ones.
+AUDIT_PARTITION_PREFIX = "audit_p"
+AUDIT_DEFAULT_PARTITION = "audit_default"
+
+
+def month_start(value: date | datetime, months: int = 0) -> date:
+    """First day of the month holding ``value``, shifted by ``months``."""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def audit_partition_name(month: date) -> str:
+    return f"{AUDIT_PARTITION_PREFIX}{month:%Y%m}"
+
+
+def audit_partition_ddl(month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {audit_partition_name(month)} PARTITION OF audit "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{month_start(month, 1).isoformat()}')"
+    )
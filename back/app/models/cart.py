@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, Enum as SQLEnum, ForeignKey, Integer, Numeric
+from sqlalchemy import Column, Enum as SQLEnum, ForeignKey, Integer, Numeric, text
 from sqlalchemy.orm import relationship
 
 from .base import Base, TimestampMixin
@@ -12,6 +12,8 @@ class Cart(Base, TimestampMixin):
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     status = Column(SQLEnum(CartStatus, name="cart_status"),nullable=False,server_default=CartStatus.ACTIVE.value,)
+    # Bumped on every item change (see app.services.cart.versioning); keys cached checkout previews.
+    version = Column(Integer, nullable=False, server_default=text("0"), default=0)
 
     user = relationship("User", back_populates="carts")
     items = relationship("CartItem", back_populates="cart", cascade="all, delete-orphan")
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Column, Integer
+
+from .base import Base, TimestampMixin
+
+
+class CatalogVersion(Base, TimestampMixin):
+    """Single-row counter bumped by every committed catalog or stock change."""
+
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from sqlalchemy import TIMESTAMP, Column, Date, Enum as SQLEnum, Integer, Numeric, func
+
+from .base import Base
+from .enums import FulfillmentType
+
+
+class DailyRevenue(Base):
+    """Delivered-order totals per order day, branch and fulfillment type.
+
+    Maintained by ``RevenueRollupService`` on status changes and rebuilt by
+    ``scripts.maintenance.rebuild_daily_revenue``. ``branch_id`` 0 collects orders
+    without a branch.
+    """
+
+    __tablename__ = "daily_revenue"
+
+    day = Column(Date, primary_key=True)
+    branch_id = Column(Integer, primary_key=True)
+    fulfillment_type = Column(SQLEnum(FulfillmentType, name="fulfillment_type"), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now())
@@ -23,6 +23,9 @@ class GlobalSettings(Base):
     delivery_min: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False, default=50.0)
     delivery_fee: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False, default=15.0)
     free_threshold: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False, default=200.0)
+
+    # Bumped on every update; identifies the settings a worker has cached
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     
     # Audit fields
     updated_at: Mapped[datetime] = mapped_column(
@@ -39,6 +42,7 @@ class GlobalSettings(Base):
         """Convert to dictionary for API responses."""
         return {
             "id": self.id,
+            "version": self.version,
             "delivery_min": float(self.delivery_min),
             "delivery_fee": float(self.delivery_fee),
             "free_threshold": float(self.free_threshold),
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from sqlalchemy import Column, ForeignKey, Integer, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import mapped_column, relationship
 
 from .base import Base, TimestampMixin
 
@@ -15,7 +15,9 @@ class Inventory(Base, TimestampMixin):
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     branch_id = Column(Integer, ForeignKey("branches.id"), nullable=False)
 
-    available_quantity = Column(Integer, nullable=False, default=0)
+    # active_history keeps the pre-update value available to the stock summary listener
+    # even when the attribute is assigned without being read first.
+    available_quantity = mapped_column(Integer, nullable=False, default=0, active_history=True)
     reserved_quantity = Column(Integer, nullable=False, default=0)
     reorder_point = Column(Integer, nullable=False, default=0)
 
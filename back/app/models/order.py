@@ -19,7 +19,7 @@ class Order(Base, TimestampMixin):
     __tablename__ = "orders"
     __table_args__ = (
         Index("ix_orders_user_id", "user_id"),
-        Index("ix_orders_status", "status"),
+        Index("ix_orders_status_created_at", "status", "created_at"),
         Index("ix_orders_created_at", "created_at"),
     )
 
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Column, Integer
+
+from .base import Base
+
+
+class OrderNumberCounter(Base):
+    """Single-row high-water mark of order numbers leased to workers."""
+
+    __tablename__ = "order_number_counter"
+
+    id = Column(Integer, primary_key=True)
+    next_value = Column(BigInteger, nullable=False)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, ForeignKey, Index, Numeric, String, text, Integer, JSON, Boolean, Text
+from sqlalchemy import DDL, BigInteger, Column, ForeignKey, Index, Numeric, String, text, Integer, JSON, Boolean, Text, event
 from sqlalchemy.orm import relationship
 from .base import Base, SoftDeleteMixin, TimestampMixin
 
@@ -9,6 +9,10 @@ class Product(Base, TimestampMixin, SoftDeleteMixin):
     __table_args__ = (
         Index("ix_products_name", "name"),
         Index("ix_products_category_id", "category_id"),
+        # Keyset pagination seeks on (sort column, id).
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_updated_at_id", "updated_at", "id"),
+        Index("ix_products_catalog_version", "catalog_version"),
     )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -23,6 +27,42 @@ class Product(Base, TimestampMixin, SoftDeleteMixin):
     description = Column(Text, nullable=True)
     bin_location = Column(String(64), nullable=True)
     image_url = Column(String(256), nullable=True)
+    # Catalog version of the last commit that changed this row (drives the delta feed).
+    catalog_version = Column(BigInteger, nullable=False, server_default=text("0"), default=0)
 
     category = relationship("Category", back_populates="products")
     inventory = relationship("Inventory", back_populates="product", cascade="all, delete-orphan")
+
+
+# Full-text search index over product names (queried by services/catalog/search_index.py).
+# SQLite keeps an external-content FTS5 table in sync through triggers; Postgres uses a
+# tsvector expression index plus a trigram index so ILIKE substring matches stay indexed.
+PRODUCT_SEARCH_DDL: dict[str, tuple[str, ...]] = {
+    "sqlite": (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+        "name, content='products', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+        "INSERT INTO products_fts(rowid, name) VALUES (new.id, new.name); END",
+        "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+        "INSERT INTO products_fts(products_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+        "CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name ON products BEGIN "
+        "INSERT INTO products_fts(products_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+        "INSERT INTO products_fts(rowid, name) VALUES (new.id, new.name); END",
+    ),
+    "postgresql": (
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_products_name_fts ON products "
+        "USING gin (to_tsvector('simple', name))",
+        "CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products "
+        "USING gin (name gin_trgm_ops)",
+    ),
+}
+
+for _dialect, _statements in PRODUCT_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Product.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(
+    Product.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS products_fts").execute_if(dialect="sqlite"),
+)
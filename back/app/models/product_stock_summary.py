@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from sqlalchemy import TIMESTAMP, BigInteger, Column, ForeignKey, Index, Integer, func, text
+
+from .base import Base
+
+
+class ProductStockSummary(Base):
+    """Per-product roll-up of ``inventory``, maintained on every inventory write."""
+
+    __tablename__ = "product_stock_summary"
+    __table_args__ = (
+        Index("ix_product_stock_summary_branches_in_stock", "branches_in_stock"),
+        Index("ix_product_stock_summary_total_available", "total_available", "product_id"),
+        Index("ix_product_stock_summary_catalog_version", "catalog_version"),
+    )
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    total_available = Column(Integer, nullable=False, default=0)
+    branches_in_stock = Column(Integer, nullable=False, default=0)
+    last_changed = Column(TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now())
+    catalog_version = Column(BigInteger, nullable=False, server_default=text("0"), default=0)
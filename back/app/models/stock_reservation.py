@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from sqlalchemy import TIMESTAMP, Column, ForeignKey, Index, Integer, UniqueConstraint, func
+
+from .base import Base
+
+
+class StockReservation(Base):
+    """Quantity held in ``inventory.reserved_quantity``.
+
+    A row belongs either to a checkout awaiting payment (``idempotency_key_id``)
+    or to a cart line (``cart_id``) when cart reservations are enabled.
+    """
+
+    __tablename__ = "stock_reservations"
+    __table_args__ = (
+        UniqueConstraint("cart_id", "product_id", name="uq_stock_reservations_cart_product"),
+        Index("ix_stock_reservations_idempotency_key_id", "idempotency_key_id"),
+        Index("ix_stock_reservations_expires_at", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    idempotency_key_id = Column(Integer, ForeignKey("idempotency_keys.id", ondelete="CASCADE"), nullable=True)
+    cart_id = Column(Integer, ForeignKey("carts.id", ondelete="CASCADE"), nullable=True)
+    inventory_id = Column(Integer, ForeignKey("inventory.id", ondelete="CASCADE"), nullable=False)
+    product_id = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(TIMESTAMP, nullable=False)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
@@ -1,10 +1,12 @@
-"""Admin analytics: revenue endpoint (sum of completed orders, grouped by day/month)."""
+"""Admin analytics: revenue endpoint (sum of completed orders, grouped by day/month), checkout lock, idempotency and audit pipeline counters."""
 
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from app.middleware.auth import require_role
 from app.models.enums import Role
 from app.services.admin_analytics_service import AdminAnalyticsService
+from app.services.audit_pipeline import AuditPipeline
+from app.services.checkout import CheckoutIdempotencyManager, checkout_lock_stats, idempotency_stats
 from app.utils.responses import success_envelope
 from app.schemas.admin_branches_query import RevenueQuery
 
@@ -17,3 +19,22 @@ def revenue():
     params = RevenueQuery(**request.args)
     data = AdminAnalyticsService.get_revenue(params.range, params.granularity)
     return jsonify(success_envelope(data))
+
+@blueprint.get("/checkout-locks")
+@jwt_required()
+@require_role(Role.MANAGER, Role.ADMIN)
+def checkout_locks():
+    return jsonify(success_envelope(checkout_lock_stats.stats()))
+
+@blueprint.get("/idempotency")
+@jwt_required()
+@require_role(Role.MANAGER, Role.ADMIN)
+def idempotency():
+    stats = {**idempotency_stats.stats(), "purge_backlog": CheckoutIdempotencyManager.purge_backlog()}
+    return jsonify(success_envelope(stats))
+
+@blueprint.get("/audit-pipeline")
+@jwt_required()
+@require_role(Role.MANAGER, Role.ADMIN)
+def audit_pipeline():
+    return jsonify(success_envelope(AuditPipeline.stats()))
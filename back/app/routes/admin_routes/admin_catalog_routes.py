@@ -4,7 +4,7 @@ from flask_jwt_extended import jwt_required
 from app.middleware.auth import require_role
 from app.models.enums import Role
 from app.schemas.catalog import CategoryAdminRequest, ProductAdminRequest, ProductUpdateRequest
-from app.services.catalog import CatalogAdminService
+from app.services.catalog import CatalogAdminService, catalog_response_cache
 from app.utils.request_params import toggle_flag
 from app.utils.responses import success_envelope 
 from app.schemas.admin_branches_query import ToggleCategoryQuery
@@ -77,3 +77,10 @@ def toggle_product(product_id: int):
     active = toggle_flag(request.args)
     product = CatalogAdminService.toggle_product(product_id, active)
     return jsonify(success_envelope(product))
+
+## READ (Catalog Response Cache Stats)
+@blueprint.get("/catalog/cache-stats")
+@jwt_required()
+@require_role(Role.MANAGER, Role.ADMIN)
+def catalog_cache_stats():
+    return jsonify(success_envelope(catalog_response_cache.stats()))
@@ -1,10 +1,10 @@
-"""Audit listing for admin/manager."""
+"""Audit listing and streaming export for admin/manager."""
 
 from __future__ import annotations
 
 from datetime import datetime
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from flask_jwt_extended import jwt_required
 
 from app.middleware.auth import require_role
@@ -49,3 +49,23 @@ def list_audit():
     filters, limit, offset = _parse_filters()
     rows, total = AuditQueryService.list_logs(filters, limit, offset)
     return jsonify(success_envelope(rows, pagination=pagination_envelope(total, limit, offset)))
+
+
+_EXPORT_MIMETYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+## READ (Audit Export)
+@blueprint.get("/export")
+@jwt_required()
+@require_role(Role.MANAGER, Role.ADMIN)
+def export_audit():
+    filters, _, _ = _parse_filters()
+    fmt = request.args.get("format", "csv")
+    if fmt not in _EXPORT_MIMETYPES:
+        raise DomainError("BAD_REQUEST", "format must be csv or ndjson", status_code=400)
+    filename = f"audit-{datetime.utcnow():%Y%m%dT%H%M%S}.{fmt}"
+    return Response(
+        stream_with_context(AuditQueryService.export_chunks(filters, fmt)),
+        mimetype=_EXPORT_MIMETYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
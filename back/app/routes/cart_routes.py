@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 
 from app.schemas.cart import CartItemUpsertRequest
 from app.services.cart_service import CartService
 from app.services.cart import helpers
+from app.utils.request_params import optional_int
 from app.utils.request_utils import current_user_id, parse_json_or_400
 from app.utils.responses import success_envelope
 
@@ -19,7 +20,11 @@ blueprint = Blueprint("cart", __name__)
 @jwt_required()
 def get_cart():
     user_id = current_user_id()
-    cart = CartService.get_cart(user_id)
+    cart = CartService.get_cart(
+        user_id,
+        embed_products=request.args.get("include") == "products",
+        branch_id=optional_int(request.args, "branchId"),
+    )
     return jsonify(success_envelope(cart))
 
 
@@ -3,10 +3,20 @@
 from __future__ import annotations
 
 # PUBLIC: All endpoints in this file are intentionally unauthenticated for catalog browsing.
-from flask import Blueprint, jsonify, request
-
-from app.services.catalog import CatalogQueryService
-from app.utils.request_params import optional_int, safe_int
+import hashlib
+from functools import wraps
+
+from flask import Blueprint, current_app, jsonify, request, send_file
+
+from app.middleware.error_handler import DomainError
+from app.services.catalog import (
+    CachedResponse,
+    CatalogQueryService,
+    CatalogSnapshotService,
+    CatalogVersionService,
+    catalog_response_cache,
+)
+from app.utils.request_params import optional_int, parse_bool, safe_int
 from app.utils.responses import success_envelope 
 from app.schemas.query_params import ProductSearchQuery
 
@@ -14,10 +24,55 @@ from app.schemas.query_params import ProductSearchQuery
 blueprint = Blueprint("catalog", __name__)
 
 
+def _keyset_meta(limit: int, total: int | None, next_cursor: str | None) -> dict:
+    meta = {"limit": limit, "next_cursor": next_cursor, "has_next": next_cursor is not None}
+    if total is not None:
+        meta["total"] = total
+    return meta
+
+
+def _include_total() -> bool:
+    return parse_bool(request.args.get("include_total")) is not False
+
+
+def _versioned_cache(view):
+    """Serve identical public reads from the response cache with a strong ETag."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version = CatalogVersionService.current()
+        key = (request.path, tuple(sorted(request.args.items(multi=True))), version)
+        entry = catalog_response_cache.get(key)
+        if entry is None:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            body = response.get_data()
+            etag = f"{version}-{hashlib.sha1(body).hexdigest()[:16]}"
+            entry = CachedResponse(body=body, etag=etag, mimetype=response.mimetype)
+            catalog_response_cache.put(key, entry, current_app.config.get("CATALOG_CACHE_MAX_ENTRIES", 2048))
+        response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+        response.set_etag(entry.etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config.get("CATALOG_CACHE_MAX_AGE", 30)
+        response.make_conditional(request)
+        if response.status_code == 304:
+            catalog_response_cache.record_not_modified()
+        return response
+
+    return wrapper
+
+
 ## READ (List Categories)
 @blueprint.get("/categories")
+@_versioned_cache
 def list_categories():
     limit = safe_int(request.args, "limit", 50)
+    if "cursor" in request.args:
+        categories, total, next_cursor = CatalogQueryService.list_categories_keyset(
+            limit, request.args["cursor"], _include_total()
+        )
+        return jsonify(success_envelope(categories, _keyset_meta(limit, total, next_cursor)))
     offset = safe_int(request.args, "offset", 0)
     categories, total = CatalogQueryService.list_categories(limit, offset)
     return jsonify(success_envelope(categories, {"total": total, "limit": limit, "offset": offset}))
@@ -25,16 +80,70 @@ def list_categories():
 
 ## READ (Category Products)
 @blueprint.get("/categories/<int:category_id>/products")
+@_versioned_cache
 def category_products(category_id):
     limit = safe_int(request.args, "limit", 50)
-    offset = safe_int(request.args, "offset", 0)
     branch_id = optional_int(request.args, "branchId")
+    if "cursor" in request.args:
+        products, total, next_cursor = CatalogQueryService.get_category_products_keyset(
+            category_id, branch_id, limit, request.args["cursor"], _include_total()
+        )
+        return jsonify(success_envelope(products, _keyset_meta(limit, total, next_cursor)))
+    offset = safe_int(request.args, "offset", 0)
     products, total = CatalogQueryService.get_category_products(category_id, branch_id, limit, offset)
     return jsonify(success_envelope(products, {"total": total, "limit": limit, "offset": offset}))
 
 
+## READ (Bulk Product Lookup)
+@blueprint.get("/products")
+@_versioned_cache
+def products_by_ids():
+    raw_ids = request.args.get("ids", "")
+    try:
+        product_ids = [int(part) for part in raw_ids.split(",") if part.strip()]
+    except ValueError:
+        raise DomainError("INVALID_IDS", "ids must be a comma-separated list of integers", status_code=400)
+    if not product_ids:
+        raise DomainError("INVALID_IDS", "ids is required", status_code=400)
+    branch_id = optional_int(request.args, "branchId")
+    products = CatalogQueryService.get_products_by_ids(product_ids, branch_id)
+    found = {product.id for product in products}
+    missing = [product_id for product_id in dict.fromkeys(product_ids) if product_id not in found]
+    return jsonify(success_envelope(products, {"requested": len(found) + len(missing), "missing": missing}))
+
+
+## READ (Catalog Snapshot)
+@blueprint.get("/products/snapshot")
+def catalog_snapshot():
+    """Whole active catalog as gzip NDJSON; follow up with /products/changes?since=<version>."""
+    path, version = CatalogSnapshotService.latest_snapshot()
+    accepts_gzip = "gzip" in request.headers.get("Accept-Encoding", "")
+    response = send_file(
+        path,
+        mimetype="application/x-ndjson" if accepts_gzip else "application/gzip",
+        etag=f"snapshot-{version}",
+        conditional=True,
+        max_age=current_app.config.get("CATALOG_SNAPSHOT_MAX_AGE", 300),
+    )
+    if accepts_gzip:
+        response.headers["Content-Encoding"] = "gzip"
+    response.headers["X-Catalog-Version"] = str(version)
+    return response
+
+
+## READ (Catalog Changes)
+@blueprint.get("/products/changes")
+def catalog_changes():
+    since = optional_int(request.args, "since")
+    if since is None:
+        raise DomainError("INVALID_VERSION", "since is required", status_code=400)
+    changes = CatalogSnapshotService.changes_since(since)
+    return jsonify(success_envelope(changes))
+
+
 ## READ (Get Product)
 @blueprint.get("/products/<int:product_id>")
+@_versioned_cache
 def get_product(product_id):
     branch_id = optional_int(request.args, "branchId")
     product = CatalogQueryService.get_product(product_id, branch_id)
@@ -45,15 +154,33 @@ def get_product(product_id):
 @blueprint.get("/products/search")
 def search_products():
     params = ProductSearchQuery(**request.args)
-    products, total = CatalogQueryService.search_products(
-        params.q, None, None, None, params.limit, params.offset, params.min_price, params.max_price, None, params.sort
-    )
-    has_next = total > (params.offset + params.limit)
-    meta = {"total": total, "limit": params.limit, "offset": params.offset, "has_next": has_next}
+    facets = None
+    if params.facets:
+        # The facet pass also counts the filtered set, so the separate count query is skipped.
+        facets = CatalogQueryService.search_facets(
+            params.q, None, None, None, params.min_price, params.max_price, None, params.fuzzy
+        )
+    if params.cursor is not None:
+        products, total, next_cursor = CatalogQueryService.search_products_keyset(
+            params.q, None, None, None, params.limit, params.cursor, params.min_price, params.max_price,
+            None, params.sort, params.include_total and facets is None, params.fuzzy,
+        )
+        meta = _keyset_meta(params.limit, facets.total if facets else total, next_cursor)
+    else:
+        products, total = CatalogQueryService.search_products(
+            params.q, None, None, None, params.limit, params.offset, params.min_price, params.max_price, None,
+            params.sort, facets is None, params.fuzzy,
+        )
+        total = facets.total if facets else total
+        has_next = total > (params.offset + params.limit)
+        meta = {"total": total, "limit": params.limit, "offset": params.offset, "has_next": has_next}
+    if facets:
+        meta["facets"] = facets
     return jsonify(success_envelope(products, meta))
     
 ## READ (Featured Products)
 @blueprint.get("/products/featured")
+@_versioned_cache
 def featured_products():
     limit = safe_int(request.args, "limit", 10)
     branch_id = optional_int(request.args, "branchId")
@@ -1,11 +1,12 @@
 """Storefront endpoints."""
 
 # PUBLIC: The /shipping-info endpoint is intentionally unauthenticated for public access.
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 
 from app.schemas.store import WishlistRequest
 from app.services.store import WishlistService
+from app.utils.request_params import optional_int
 from app.utils.request_utils import current_user_id, parse_json_or_400
 from app.utils.responses import success_envelope 
 
@@ -49,9 +50,13 @@ def shipping_info():
 @blueprint.get("/wishlist")
 @jwt_required()
 def wishlist():
-    """Return the current user's wishlist."""
+    """Return the current user's wishlist; ``include=products`` embeds product details."""
     # params = WishlistQuery(**request.args)  # Removed: unused variable
-    items = WishlistService.list_items(current_user_id())
+    items = WishlistService.list_items(
+        current_user_id(),
+        embed_products=request.args.get("include") == "products",
+        branch_id=optional_int(request.args, "branchId"),
+    )
     return jsonify(success_envelope({"items": items}))
 
 
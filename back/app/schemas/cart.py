@@ -2,6 +2,7 @@ from __future__ import annotations
 from decimal import Decimal
 from pydantic import Field
 
+from .catalog import ProductResponse
 from .common import DefaultModel
 
 class CartItemUpsertRequest(DefaultModel):
@@ -15,6 +16,7 @@ class CartItemResponse(DefaultModel):
     unit_price: Decimal = Field(ge=0, le=100000)
     product_name: str | None = None
     product_image: str | None = None
+    product: ProductResponse | None = None
 
 class CartResponse(DefaultModel):
     id: int = Field(gt=0)
@@ -44,6 +44,23 @@ class AutocompleteItem(DefaultModel):
 class AutocompleteResponse(Pagination):
     items: list[AutocompleteItem]
 
+class CategoryFacet(DefaultModel):
+    category_id: int
+    name: str
+    count: int
+
+class PriceBucket(DefaultModel):
+    min: float
+    max: float | None = None
+    count: int
+
+class SearchFacets(DefaultModel):
+    total: int
+    categories: list[CategoryFacet]
+    price_buckets: list[PriceBucket]
+    organic: int
+    in_stock: int
+
 class CategoryAdminRequest(DefaultModel):
     name: str = Field(min_length=2, max_length=50, pattern=r"^[\w\s\-א-ת]+$")
     description: str | None = Field(default=None, min_length=0, max_length=300)
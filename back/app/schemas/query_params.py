@@ -8,4 +8,11 @@ class ProductSearchQuery(DefaultModel):
     offset: int = Field(default=0, ge=0)
     min_price: Optional[float] = Field(default=None, ge=0)
     max_price: Optional[float] = Field(default=None, ge=0)
-    sort: Optional[str] = Field(default=None, pattern=r"^(price|name|date)$")
+    sort: Optional[str] = Field(
+        default=None,
+        pattern=r"^(price|name|date|price_asc|price_desc|name_asc|name_desc|updated_at_desc|stock_desc)$",
+    )
+    cursor: Optional[str] = None
+    include_total: bool = True
+    facets: bool = False
+    fuzzy: bool = True
@@ -1,8 +1,5 @@
 from datetime import datetime, timedelta
-import sqlalchemy as sa
-from sqlalchemy import table, column, DateTime, Numeric, Enum, func, cast, select
-from app.extensions import db
-from app.models.enums import OrderStatus
+from app.services.revenue_rollup_service import RevenueRollupService
 
 class AdminAnalyticsService:
     @staticmethod
@@ -11,7 +8,8 @@ class AdminAnalyticsService:
         Calculate revenue over time based on DELIVERED orders only.
         
         Note: Only orders with status DELIVERED are counted as revenue.
-        Pending, in-progress, or cancelled orders are excluded.
+        Pending, in-progress, or cancelled orders are excluded. Totals come from
+        the ``daily_revenue`` rollup, bucketed by the day each order was placed.
         
         Args:
             range_: Time range - "30d", "90d", or "12m"
@@ -33,57 +31,5 @@ class AdminAnalyticsService:
         if granularity:
             gran = granularity
 
-        RevenueTable = table(
-            "orders",
-            column("created_at", DateTime),
-            column("total_amount", Numeric(12, 2)),
-            column("status", Enum(OrderStatus, name="order_status")),
-        )
-
-        is_sqlite = hasattr(db, 'engine') and db.engine and db.engine.dialect.name == "sqlite"
-        created_at = RevenueTable.c.created_at
-        
-        # Use database-agnostic date truncation where possible
-        if is_sqlite:
-            # SQLite requires strftime
-            label_expr = (
-                func.strftime('%Y-%m', created_at)
-                if gran == "month"
-                else func.strftime('%Y-%m-%d', created_at)
-            )
-        else:
-            # PostgreSQL and others support date_trunc
-            if gran == "month":
-                label_expr = func.to_char(
-                    func.date_trunc('month', created_at),
-                    'YYYY-MM',
-                )
-            else:
-                label_expr = func.to_char(
-                    func.date_trunc('day', created_at),
-                    'YYYY-MM-DD',
-                )
-
-        status_filter = RevenueTable.c.status == OrderStatus.DELIVERED
-        q = (
-            select(
-                label_expr.label("label"),
-                func.coalesce(
-                    func.sum(cast(RevenueTable.c.total_amount, sa.Numeric(12, 2))),
-                    0,
-                ).label("value"),
-            )
-            .select_from(RevenueTable)
-            .where(
-                sa.and_(
-                    status_filter,
-                    RevenueTable.c.created_at >= sa.bindparam("start"),
-                ),
-            )
-            .group_by(label_expr)
-            .order_by(label_expr)
-        )
-        result = db.session.execute(q, {"start": start}).fetchall()
-        labels = [row.label for row in result]
-        values = [float(row.value) for row in result]
+        labels, values = RevenueRollupService.series(start.date(), gran)
         return {"labels": labels, "values": values}
@@ -0,0 +1,199 @@
+"""Per-transaction audit buffer, written in one multi-row insert at commit."""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any
+
+from flask import current_app, has_app_context
+from sqlalchemy import Engine, event, insert
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import Audit
+
+logger = logging.getLogger("app")
+
+_PENDING = "audit_pending"
+_COMMITTING = "audit_committing"
+
+
+class AuditWriter:
+    """Background thread that writes committed audit rows in batches.
+
+    ``submit`` hands rows over through a bounded queue. When the queue is full
+    it waits up to ``timeout`` seconds and then writes the rows itself, so a
+    slow database throttles callers instead of dropping audit rows.
+    """
+
+    def __init__(self, engine: Engine, max_queue: int = 10_000, batch_size: int = 500) -> None:
+        self.engine = engine
+        self.batch_size = batch_size
+        self._queue: queue.Queue[dict[str, Any] | None] = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._counts = {"enqueued": 0, "written": 0, "batches": 0, "blocked": 0, "sync_fallbacks": 0, "errors": 0}
+        self._blocked_ms = 0.0
+        self._max_depth = 0
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, rows: list[dict[str, Any]], timeout: float = 0.05) -> None:
+        for index, row in enumerate(rows):
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                started = time.perf_counter()
+                try:
+                    self._queue.put(row, timeout=timeout)
+                except queue.Full:
+                    self._record(blocked_ms=(time.perf_counter() - started) * 1000, sync_fallbacks=1)
+                    self._write(rows[index:])
+                    return
+                self._record(blocked_ms=(time.perf_counter() - started) * 1000)
+            with self._lock:
+                self._counts["enqueued"] += 1
+                self._max_depth = max(self._max_depth, self._queue.qsize())
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every submitted row is written; ``False`` on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return not self._queue.unfinished_tasks
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counts,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_depth,
+                "queue_capacity": self._queue.maxsize,
+                "blocked_ms_total": round(self._blocked_ms, 1),
+            }
+
+    def _run(self) -> None:
+        while True:
+            row = self._queue.get()
+            if row is None:
+                self._queue.task_done()
+                return
+            batch = [row]
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    self._queue.put_nowait(None)
+                    self._queue.task_done()
+                    break
+                batch.append(row)
+            try:
+                self._write(batch)
+            except Exception:
+                logger.exception("Audit writer dropped %d rows", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, rows: list[dict[str, Any]]) -> None:
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(insert(Audit), rows)
+        except Exception:
+            self._record(errors=1)
+            raise
+        self._record(written=len(rows), batches=1)
+
+    def _record(self, blocked_ms: float = 0.0, **counts: int) -> None:
+        with self._lock:
+            for name, amount in counts.items():
+                self._counts[name] += amount
+            if blocked_ms:
+                self._counts["blocked"] += 1
+                self._blocked_ms += blocked_ms
+
+
+class AuditPipeline:
+    """Collects audit rows per session transaction and writes them when it commits.
+
+    In the default ``commit`` mode the rows go out as one multi-row ``INSERT`` just
+    before the commit, inside the same transaction. With ``AUDIT_WRITE_MODE=async``
+    they are handed to an ``AuditWriter`` after the commit instead, so requests do
+    not wait for the insert; rows still queued when a worker is killed are lost.
+    Rolled-back transactions discard their rows in both modes.
+    """
+
+    _writer: AuditWriter | None = None
+    _writer_lock = threading.Lock()
+
+    @staticmethod
+    def add(rows: list[dict[str, Any]], session: Session | None = None) -> None:
+        session = session or db.session()
+        if session.get_transaction() is None:
+            # Begin now so a rollback before the first statement still discards the rows.
+            session.begin()
+        session.info.setdefault(_PENDING, []).extend(rows)
+
+    @staticmethod
+    def flush(session: Session | None = None) -> None:
+        """Write this transaction's buffered rows now, e.g. before reading them back."""
+        session = session or db.session()
+        rows = session.info.pop(_PENDING, None)
+        if rows:
+            session.execute(insert(Audit), rows)
+
+    @staticmethod
+    def writer() -> AuditWriter:
+        with AuditPipeline._writer_lock:
+            if AuditPipeline._writer is None:
+                config = current_app.config
+                AuditPipeline._writer = AuditWriter(
+                    db.engine,
+                    max_queue=config.get("AUDIT_QUEUE_SIZE", 10_000),
+                    batch_size=config.get("AUDIT_BATCH_SIZE", 500),
+                )
+                atexit.register(AuditPipeline._writer.flush)
+            return AuditPipeline._writer
+
+    @staticmethod
+    def stats() -> dict[str, Any]:
+        writer = AuditPipeline._writer
+        return {"mode": AuditPipeline._mode(), "writer": writer.stats() if writer else None}
+
+    @staticmethod
+    def _mode() -> str:
+        return current_app.config.get("AUDIT_WRITE_MODE", "commit") if has_app_context() else "commit"
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending(session) -> None:
+    if not session.info.get(_PENDING):
+        return
+    if AuditPipeline._mode() == "async":
+        session.info[_COMMITTING] = session.info.pop(_PENDING)
+    else:
+        AuditPipeline.flush(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _hand_off(session) -> None:
+    rows = session.info.pop(_COMMITTING, None)
+    if rows:
+        timeout = current_app.config.get("AUDIT_QUEUE_TIMEOUT_MS", 50) / 1000
+        AuditPipeline.writer().submit(rows, timeout=timeout)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard(session, previous_transaction) -> None:
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING, None)
+        session.info.pop(_COMMITTING, None)
@@ -0,0 +1,212 @@
+"""Monthly audit rollover: export old months to gzip NDJSON, then drop them."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import delete, func, select, text
+
+from app.extensions import db
+from app.models import Audit
+from app.models.audit import (
+    AUDIT_DEFAULT_PARTITION,
+    AUDIT_PARTITION_PREFIX,
+    audit_partition_ddl,
+    audit_partition_name,
+    month_start,
+)
+from app.services.audit_service import AuditQueryService
+
+_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class ArchivedMonth:
+    month: date
+    rows: int
+    path: Path | None
+    dropped_partition: bool
+
+
+class AuditRetentionService:
+    """Keeps only recent months in ``audit``.
+
+    Each month older than the retention window is written to
+    ``audit-YYYY-MM.ndjson.gz`` in the archive directory (one row per line, shaped
+    like ``AuditQueryService.iter_rows``) and only then removed. An archive is
+    never overwritten: if a month is archived again, say after a run failed
+    partway through its deletes, the remaining rows go to the next free
+    ``audit-YYYY-MM.partN.ndjson.gz``. On Postgres the
+    month's partition is detached and dropped, which costs no row deletes or
+    vacuum; rows that landed in ``audit_default``, and every row on SQLite, are
+    deleted in batches instead. ``ensure_partitions`` should run ahead of each new month so new
+    rows never land in the default partition; if it runs late it moves them out.
+    """
+
+    @staticmethod
+    def partitioned() -> bool:
+        if db.session.get_bind().dialect.name != "postgresql":
+            return False
+        return bool(db.session.scalar(text(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = 'audit'"
+        )))
+
+    @staticmethod
+    def ensure_partitions(months_ahead: int = 3) -> dict[str, int]:
+        """Create the partitions for this month and the next ``months_ahead``.
+
+        Returns each new partition with the number of rows it took over from
+        ``audit_default``. Months that already have rows there (the job did not
+        run in time) are partitioned as well: ``PARTITION OF`` would fail for
+        them, so the table is created standalone, the month's default rows are
+        moved into it and it is then attached.
+        """
+        if not AuditRetentionService.partitioned():
+            return {}
+        existing = set(AuditRetentionService._partitions())
+        months = {month_start(datetime.utcnow(), offset) for offset in range(months_ahead + 1)}
+        months.update(
+            month_start(value)
+            for value in db.session.scalars(text(
+                f"SELECT DISTINCT date_trunc('month', created_at) FROM {AUDIT_DEFAULT_PARTITION}"
+            ))
+        )
+        created = {}
+        for month in sorted(months):
+            if audit_partition_name(month) not in existing:
+                created[audit_partition_name(month)] = AuditRetentionService._create_partition(month)
+                db.session.commit()
+        return created
+
+    @staticmethod
+    def expired_months(keep_months: int) -> list[date]:
+        """Months that end before the retention window and still hold rows or a partition."""
+        cutoff = month_start(datetime.utcnow(), -keep_months)
+        months = {
+            datetime.strptime(name[len(AUDIT_PARTITION_PREFIX):], "%Y%m").date()
+            for name in AuditRetentionService._partitions()
+        }
+        # Hop from one occupied month to the next with index seeks on created_at.
+        floor = None
+        while True:
+            stmt = select(func.min(Audit.created_at)).where(Audit.created_at < cutoff)
+            if floor is not None:
+                stmt = stmt.where(Audit.created_at >= floor)
+            oldest = db.session.scalar(stmt)
+            if oldest is None:
+                break
+            months.add(month_start(oldest))
+            floor = month_start(oldest, 1)
+        return sorted(month for month in months if month < cutoff)
+
+    @staticmethod
+    def archive_directory(configured: str | None) -> Path:
+        """The directory to archive into, refusing a missing or temporary one.
+
+        ``archive_month`` deletes what it exports, so an archive written to the
+        temp directory of an ephemeral host would be lost on the next restart.
+        """
+        if not configured:
+            raise RuntimeError("AUDIT_ARCHIVE_DIR is not set; refusing to archive audit months")
+        directory = Path(configured).resolve()
+        if directory.is_relative_to(Path(tempfile.gettempdir()).resolve()):
+            raise RuntimeError(f"AUDIT_ARCHIVE_DIR {directory} is a temporary directory; use durable storage")
+        return directory
+
+    @staticmethod
+    def archive_month(month: date, directory: Path, batch_size: int = _BATCH_SIZE) -> ArchivedMonth:
+        """Export one month's rows, then drop its partition or delete them."""
+        start, end = month_start(month), month_start(month, 1)
+        path, rows = AuditRetentionService._export(start, end, directory)
+        partition = audit_partition_name(start)
+        dropped = partition in AuditRetentionService._partitions()
+        if dropped:
+            db.session.execute(text(f"ALTER TABLE audit DETACH PARTITION {partition}"))
+            db.session.execute(text(f"DROP TABLE {partition}"))
+            db.session.commit()
+        # Rows outside a dedicated partition (the default one, or all of them on SQLite).
+        in_month = (Audit.created_at >= start) & (Audit.created_at < end)
+        while True:
+            ids = select(Audit.id).where(in_month).limit(batch_size).scalar_subquery()
+            deleted = db.session.execute(delete(Audit).where(in_month, Audit.id.in_(ids))).rowcount
+            db.session.commit()
+            if deleted < batch_size:
+                break
+        return ArchivedMonth(month=start, rows=rows, path=path, dropped_partition=dropped)
+
+    @staticmethod
+    def _export(start: date, end: date, directory: Path) -> tuple[Path | None, int]:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=".audit-", suffix=".tmp")
+        rows = 0
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as out:
+                for row in AuditQueryService.iter_rows([Audit.created_at >= start, Audit.created_at < end]):
+                    out.write(_ndjson(row))
+                    rows += 1
+            path = AuditRetentionService._publish(tmp_name, directory, start) if rows else None
+        finally:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+        return path, rows
+
+    @staticmethod
+    def _publish(tmp_name: str, directory: Path, start: date) -> Path:
+        """Hard-link the finished export under the first free name for its month."""
+        part = 1
+        while True:
+            suffix = "" if part == 1 else f".part{part}"
+            path = directory / f"audit-{start:%Y-%m}{suffix}.ndjson.gz"
+            try:
+                os.link(tmp_name, path)  # fails instead of replacing an existing archive
+                return path
+            except FileExistsError:
+                part += 1
+
+    @staticmethod
+    def _create_partition(month: date) -> int:
+        """Create ``month``'s partition, moving its rows out of the default one; returns how many moved."""
+        start, end = month.isoformat(), month_start(month, 1).isoformat()
+        in_month = f"created_at >= '{start}' AND created_at < '{end}'"
+        if db.session.scalar(text(f"SELECT 1 FROM {AUDIT_DEFAULT_PARTITION} WHERE {in_month} LIMIT 1")) is None:
+            db.session.execute(text(audit_partition_ddl(month)))
+            return 0
+        name = audit_partition_name(month)
+        db.session.execute(text(f"CREATE TABLE {name} (LIKE audit INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        moved = db.session.execute(text(
+            f"WITH moved AS (DELETE FROM {AUDIT_DEFAULT_PARTITION} WHERE {in_month} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        )).rowcount
+        # Attaching builds the partitioned indexes and foreign key on the new table.
+        db.session.execute(text(f"ALTER TABLE audit ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"))
+        return moved
+
+    @staticmethod
+    def _partitions() -> list[str]:
+        if not AuditRetentionService.partitioned():
+            return []
+        return [
+            name
+            for name in db.session.scalars(text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = 'audit'"
+            ))
+            if name.startswith(AUDIT_PARTITION_PREFIX)
+        ]
+
+
+def _ndjson(row: dict) -> bytes:
+    return (json.dumps(row, default=_default, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Unserializable audit value: {value!r}")
@@ -1,19 +1,33 @@
 from __future__ import annotations
 
-from sqlalchemy import select , func 
+import csv
+import io
+import json
+from itertools import islice
+from typing import Iterator
+
+from sqlalchemy import select , func , tuple_
 from datetime import datetime
 from sqlalchemy.orm import selectinload
-from sqlalchemy.orm import Session
 
 from ..extensions import db
-from ..models import Audit
+from ..models import Audit, User
+from .audit_pipeline import AuditPipeline
 
 from app.services.shared_queries import SharedOperations
 
+_EXPORT_BATCH_SIZE = 1000
+_EXPORT_COLUMNS = (
+    "id", "created_at", "entity_type", "entity_id", "action",
+    "actor_user_id", "actor_email", "old_value", "new_value", "context",
+)
+
 class AuditService:
     @staticmethod
     def _serialize_for_json(value):
         from datetime import time, date, datetime
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
         if isinstance(value, (time, date, datetime)):
             return value.isoformat()
         if isinstance(value, dict):
@@ -32,33 +46,127 @@ class AuditService:
         old_value: dict[str, object] | None = None,
         new_value: dict[str, object] | None = None,
         context: dict[str, object] | None = None,
-    ) -> Audit:
-
-        resolved_entity_id = entity_id or actor_user_id or 0
-        session: Session = db.session
-        entry = Audit(
-            entity_type=entity_type,
-            action=action,
-            actor_user_id=actor_user_id,
-            entity_id=resolved_entity_id,
-            old_value=AuditService._serialize_for_json(old_value) if old_value else None,
-            new_value=AuditService._serialize_for_json(new_value) if new_value else None,
-            context=AuditService._serialize_for_json(context) if context else None,
-            created_at=datetime.utcnow(),
-        )
-        session.add(entry)
-        session.flush()  # Flush but let caller commit
-        return entry
+    ) -> None:
+        """Buffer one audit row; it is written when the caller's transaction commits."""
+        AuditService.log_events([{
+            "entity_type": entity_type,
+            "action": action,
+            "actor_user_id": actor_user_id,
+            "entity_id": entity_id,
+            "old_value": old_value,
+            "new_value": new_value,
+            "context": context,
+        }])
+
+    @staticmethod
+    def log_events(events: list[dict[str, object]]) -> None:
+        """Buffer many audit rows; each event takes ``log_event``'s keywords.
+
+        Rows are serialized now and inserted together by ``AuditPipeline`` at commit,
+        so a request that logs several events issues one ``INSERT``. A rollback
+        discards them along with the rest of the transaction.
+        """
+        if not events:
+            return
+        now = datetime.utcnow()
+        rows = [
+            {
+                "entity_type": event["entity_type"],
+                "action": event["action"],
+                "actor_user_id": event.get("actor_user_id"),
+                "entity_id": event.get("entity_id") or event.get("actor_user_id") or 0,
+                "old_value": AuditService._serialize_for_json(event.get("old_value")) or None,
+                "new_value": AuditService._serialize_for_json(event.get("new_value")) or None,
+                "context": AuditService._serialize_for_json(event.get("context")) or None,
+                "created_at": now,
+            }
+            for event in events
+        ]
+        AuditPipeline.add(rows)
+
+    @staticmethod
+    def flush_pending() -> None:
+        """Write buffered rows now, for callers that read their own audit rows before commit."""
+        AuditPipeline.flush()
 
 class AuditQueryService:
     @staticmethod
     def list_logs(filters: dict, limit: int, offset: int) -> tuple[list[dict], int]:
         from app.services.shared_queries import SharedOperations
         
-        stmt = select(Audit).options(selectinload(Audit.actor)).order_by(Audit.created_at.desc())
+        stmt = (
+            select(Audit)
+            .options(selectinload(Audit.actor))
+            .order_by(Audit.created_at.desc(), Audit.id.desc())
+        )
+        
+        stmt = SharedOperations.build_filtered_query(stmt, AuditQueryService._conditions(filters))
+        
+        def transform(row):
+            return AuditQueryService._to_dict(row)
         
-        # Build conditions for filtering
-        conditions = {
+        rows, total = SharedOperations.paginate_query(
+            base_query=stmt,
+            model_class=Audit,
+            limit=limit,
+            offset=offset,
+            transform_fn=transform,
+        )
+        return rows, total
+
+    @staticmethod
+    def export_chunks(filters: dict, fmt: str = "csv", batch_size: int = _EXPORT_BATCH_SIZE) -> Iterator[str]:
+        """Rows matching ``list_logs`` filters, oldest first, as CSV or NDJSON text chunks.
+
+        Each chunk holds one keyset batch, so memory stays flat however many
+        months the export covers.
+        """
+        conditions = [clause for check, clause in AuditQueryService._conditions(filters).values() if check()]
+        rows = AuditQueryService.iter_rows(conditions, batch_size)
+        if fmt == "ndjson":
+            for batch in _batched(rows, batch_size):
+                yield "".join(json.dumps(row, default=str, separators=(",", ":")) + "\n" for row in batch)
+            return
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(_EXPORT_COLUMNS)
+        for batch in _batched(rows, batch_size):
+            for row in batch:
+                writer.writerow(_csv_value(row[column]) for column in _EXPORT_COLUMNS)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    @staticmethod
+    def iter_rows(conditions: list, batch_size: int = _EXPORT_BATCH_SIZE) -> Iterator[dict]:
+        """Audit rows with the actor's email, keyset-paged over ``(created_at, id)``.
+
+        Each batch is read through a server-side cursor (``yield_per``) and joins
+        ``users`` once instead of lazy-loading ``Audit.actor`` per row.
+        """
+        stmt = (
+            select(*Audit.__table__.columns, User.email.label("actor_email"))
+            .outerjoin(User, User.id == Audit.actor_user_id)
+            .where(*conditions)
+            .order_by(Audit.created_at, Audit.id)
+            .limit(batch_size)
+        )
+        last = None
+        while True:
+            page = stmt if last is None else stmt.where(tuple_(Audit.created_at, Audit.id) > last)
+            count = 0
+            for row in db.session.execute(page.execution_options(yield_per=batch_size)).mappings():
+                count += 1
+                last = (row["created_at"], row["id"])
+                yield {**row, "created_at": row["created_at"].isoformat()}
+            if count < batch_size:
+                return
+
+    @staticmethod
+    def _conditions(filters: dict) -> dict:
+        return {
             "entity_type": (
                 lambda: bool(filters.get("entity_type")),
                 Audit.entity_type == filters["entity_type"] if filters.get("entity_type") else None,
@@ -80,20 +188,6 @@ class AuditQueryService:
                 Audit.created_at <= filters["date_to"] if filters.get("date_to") is not None else None,
             ),
         }
-        
-        stmt = SharedOperations.build_filtered_query(stmt, conditions)
-        
-        def transform(row):
-            return AuditQueryService._to_dict(row)
-        
-        rows, total = SharedOperations.paginate_query(
-            base_query=stmt,
-            model_class=Audit,
-            limit=limit,
-            offset=offset,
-            transform_fn=transform,
-        )
-        return rows, total
 
     @staticmethod
     def _to_dict(row: Audit) -> dict:
@@ -109,3 +203,14 @@ class AuditQueryService:
             "actor_email": row.actor.email if row.actor else None,
             "created_at": row.created_at,
         }
+
+
+def _batched(rows: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str, separators=(",", ":"))
+    return "" if value is None else value
@@ -6,13 +6,14 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from ...extensions import db
-from ...models import Cart
+from ...models import Cart, CartItem
 from ...schemas.cart import CartItemResponse, CartResponse
+from ...schemas.catalog import ProductResponse
 
 def get_or_create_cart(user_id: int) -> Cart:
     """Get existing cart or create new one for user."""
     cart = db.session.query(Cart).options(
-        selectinload(Cart.items)
+        selectinload(Cart.items).selectinload(CartItem.product)
     ).filter_by(user_id=user_id).first()
     
     if cart is None:
@@ -25,11 +26,12 @@ def get_or_create_cart(user_id: int) -> Cart:
 def reload_cart(cart_id: int) -> Cart:
     """Reload cart with items from database."""
     return db.session.execute(
-        select(Cart).where(Cart.id == cart_id).options(selectinload(Cart.items))
+        select(Cart).where(Cart.id == cart_id).options(selectinload(Cart.items).selectinload(CartItem.product))
     ).scalar_one()
 
-def to_response(cart: Cart) -> CartResponse:
-    """Convert cart model to response schema."""
+def to_response(cart: Cart, products: dict[int, ProductResponse] | None = None) -> CartResponse:
+    """Convert cart model to response schema, embedding ``products`` by id when given."""
+    products = products or {}
     items = [
         CartItemResponse(
             id=item.id,
@@ -38,6 +40,7 @@ def to_response(cart: Cart) -> CartResponse:
             unit_price=Decimal(item.unit_price),
             product_name=item.product.name if item.product else None,
             product_image=item.product.image_url if item.product else None,
+            product=products.get(item.product_id),
         )
         for item in cart.items
     ]
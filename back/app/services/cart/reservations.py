@@ -0,0 +1,152 @@
+"""Optional time-boxed holds on delivery-warehouse stock for cart lines."""
+
+from __future__ import annotations
+from datetime import datetime, timedelta
+from typing import Iterable, NamedTuple
+from flask import current_app
+from sqlalchemy import delete, select, update
+
+from ...extensions import db
+from ...middleware.error_handler import DomainError
+from ...models import Inventory, StockReservation
+from ..checkout.inventory import CheckoutInventoryManager, ReservedStock
+from . import validators
+
+
+class _Wanted(NamedTuple):
+    product_id: int
+    quantity: int
+
+
+class CartReservations:
+    """Holds cart quantities in ``inventory.reserved_quantity`` at the delivery warehouse.
+
+    Enabled with ``CART_RESERVATIONS_ENABLED``. Adding or updating a line reserves
+    the difference (or fails with ``OUT_OF_STOCK_DELIVERY_BRANCH``), removing it
+    releases the hold, and any cart write extends every hold of that cart by
+    ``CART_RESERVATION_TTL_SECONDS``. Abandoned carts are released in bulk by
+    ``sweep``. Checkout takes a cart's holds over instead of reserving that stock
+    again (see ``CheckoutService``).
+    """
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(current_app.config.get("CART_RESERVATIONS_ENABLED", False))
+
+    @staticmethod
+    def sync(cart_id: int, product_id: int, quantity: int) -> None:
+        """Make the cart hold exactly ``quantity`` of ``product_id``."""
+        held = db.session.execute(
+            select(StockReservation)
+            .where(StockReservation.cart_id == cart_id, StockReservation.product_id == product_id)
+            .with_for_update()
+        ).scalar_one_or_none()
+        current = held.quantity if held else 0
+        if quantity > current:
+            taken = CartReservations._reserve(product_id, quantity - current)
+            inventory_id = taken.inventory_id
+        else:
+            inventory_id = held.inventory_id if held else None
+            if quantity < current:
+                CheckoutInventoryManager.release_reserved([ReservedStock(inventory_id, product_id, current - quantity)])
+
+        if quantity == 0:
+            if held:
+                db.session.delete(held)
+        elif held:
+            held.quantity = quantity
+            held.inventory_id = inventory_id
+        else:
+            db.session.add(
+                StockReservation(
+                    cart_id=cart_id,
+                    inventory_id=inventory_id,
+                    product_id=product_id,
+                    quantity=quantity,
+                    expires_at=CartReservations._expiry(),
+                )
+            )
+        CartReservations._extend(cart_id)
+
+    @staticmethod
+    def release(cart_id: int, product_ids: Iterable[int] | None = None) -> int:
+        """Drop the cart's holds (all, or for ``product_ids``); returns the lines released."""
+        stmt = delete(StockReservation).where(StockReservation.cart_id == cart_id)
+        if product_ids is not None:
+            stmt = stmt.where(StockReservation.product_id.in_(list(product_ids)))
+        return CartReservations._release_deleted(stmt)
+
+    @staticmethod
+    def claim(cart_id: int, branch_id: int) -> list[StockReservation]:
+        """Lock the cart's live holds at ``branch_id`` for checkout to take over."""
+        return list(
+            db.session.scalars(
+                select(StockReservation)
+                .join(Inventory, Inventory.id == StockReservation.inventory_id)
+                .where(
+                    StockReservation.cart_id == cart_id,
+                    StockReservation.expires_at > datetime.utcnow(),
+                    Inventory.branch_id == branch_id,
+                )
+                .order_by(StockReservation.product_id)
+                .with_for_update(of=StockReservation)
+            )
+        )
+
+    @staticmethod
+    def sweep(limit: int = 500, product_ids: Iterable[int] | None = None) -> int:
+        """Release up to ``limit`` expired cart holds in one statement; returns the lines released.
+
+        Holds locked by a concurrent cart write or checkout are skipped. The caller commits.
+        """
+        expired = (
+            select(StockReservation.id)
+            .where(StockReservation.cart_id.is_not(None), StockReservation.expires_at < datetime.utcnow())
+            .order_by(StockReservation.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        if product_ids is not None:
+            expired = expired.where(StockReservation.product_id.in_(list(product_ids)))
+        ids = list(db.session.scalars(expired))
+        if not ids:
+            return 0
+        return CartReservations._release_deleted(delete(StockReservation).where(StockReservation.id.in_(ids)))
+
+    @staticmethod
+    def _reserve(product_id: int, quantity: int) -> ReservedStock:
+        manager = CheckoutInventoryManager(validators.get_delivery_source_branch_id())
+        wanted = [_Wanted(product_id, quantity)]
+        taken, missing = manager.reserve_inventory(wanted)
+        if missing and CartReservations.sweep(product_ids=[product_id]):
+            taken, missing = manager.reserve_inventory(wanted)
+        if missing:
+            raise DomainError(
+                "OUT_OF_STOCK_DELIVERY_BRANCH",
+                "Product is out of stock in the delivery warehouse",
+                status_code=409,
+            )
+        return taken[0]
+
+    @staticmethod
+    def _release_deleted(stmt) -> int:
+        rows = db.session.execute(
+            stmt.returning(StockReservation.inventory_id, StockReservation.product_id, StockReservation.quantity)
+            .execution_options(synchronize_session=False)
+        ).all()
+        CheckoutInventoryManager.release_reserved([ReservedStock(*row) for row in rows])
+        return len(rows)
+
+    @staticmethod
+    def _extend(cart_id: int) -> None:
+        db.session.execute(
+            update(StockReservation)
+            .where(StockReservation.cart_id == cart_id)
+            .values(expires_at=CartReservations._expiry())
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _expiry() -> datetime:
+        ttl = current_app.config.get("CART_RESERVATION_TTL_SECONDS", 900)
+        return datetime.utcnow() + timedelta(seconds=ttl)
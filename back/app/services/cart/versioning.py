@@ -0,0 +1,23 @@
+"""Per-cart version counter, bumped whenever a cart's items change."""
+
+from __future__ import annotations
+from itertools import chain
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session
+from ...models import Cart, CartItem
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_cart_versions(session, _flush_context) -> None:
+    cart_ids = {
+        inspect(obj).dict.get("cart_id")
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, CartItem)
+    }
+    cart_ids.discard(None)
+    if not cart_ids:
+        return
+    carts = Cart.__table__
+    session.connection().execute(
+        update(carts).where(carts.c.id.in_(sorted(cart_ids))).values(version=carts.c.version + 1)
+    )
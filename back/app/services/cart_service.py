@@ -5,7 +5,10 @@ from ..middleware.error_handler import DomainError
 from ..models import Cart, CartItem
 from ..schemas.cart import CartResponse
 from ..services.audit_service import AuditService
+from ..services.catalog import CatalogQueryService
 from .cart import helpers, validators
+from .cart import versioning  # noqa: F401  registers the cart version listener
+from .cart.reservations import CartReservations
 
 
 class CartService:
@@ -20,10 +23,18 @@ class CartService:
         )
     
     @staticmethod
-    def get_cart(user_id: int) -> CartResponse:
-        """Get user's cart."""
+    def get_cart(user_id: int, embed_products: bool = False, branch_id: int | None = None) -> CartResponse:
+        """Get user's cart, optionally with full product details from one batch lookup."""
         cart = helpers.get_or_create_cart(user_id)
-        return helpers.to_response(cart)
+        products = None
+        if embed_products and cart.items:
+            products = {
+                product.id: product
+                for product in CatalogQueryService.lookup_products(
+                    [item.product_id for item in cart.items], branch_id
+                )
+            }
+        return helpers.to_response(cart, products)
 
     @staticmethod
     def add_item(user_id: int, product_id: int, quantity: int) -> CartResponse:
@@ -32,12 +43,11 @@ class CartService:
             raise DomainError("INVALID_QUANTITY", "Quantity must be positive")
         
         product = validators.validate_product(product_id)
-        validators.assert_in_stock_anywhere(product)
         
         cart = helpers.get_or_create_cart(user_id)
         existing = next((i for i in cart.items if i.product_id == product_id), None)
         requested_quantity = quantity + existing.quantity if existing else quantity
-        validators.assert_in_stock_delivery_branch(product, requested_quantity)
+        CartService._ensure_stock(cart.id, product, requested_quantity, new_line=existing is None)
         
         if existing:
             existing.quantity += quantity
@@ -72,8 +82,7 @@ class CartService:
             raise DomainError("NOT_FOUND", "Cart item not found", status_code=404)
         
         product = validators.validate_product(item.product_id)
-        validators.assert_in_stock_anywhere(product)
-        validators.assert_in_stock_delivery_branch(product, quantity)
+        CartService._ensure_stock(cart.id, product, quantity, new_line=False)
 
         old_qty = item.quantity
         item.quantity = quantity
@@ -94,6 +103,7 @@ class CartService:
         item = db.session.get(CartItem, item_id)
         if not item or item.cart_id != cart.id:
             raise DomainError("NOT_FOUND", "Cart item not found", status_code=404)
+        CartReservations.release(cart.id, [item.product_id])
         db.session.delete(item)
         CartService._audit(cart.id, "DELETE_ITEM", user_id, old_value={"item_id": str(item_id)})
         db.session.commit()
@@ -103,12 +113,29 @@ class CartService:
     def clear_cart(user_id: int, cart_id: int) -> CartResponse:
         """Clear all items from cart."""
         cart = CartService._get_cart_for_user(cart_id, user_id)
+        CartReservations.release(cart.id)
         for item in list(cart.items):
             db.session.delete(item)
         db.session.commit()
         CartService._audit(cart.id, "CLEAR", user_id)
         return helpers.to_response(helpers.reload_cart(cart.id))
     
+    @staticmethod
+    def _ensure_stock(cart_id: int, product, quantity: int, new_line: bool) -> None:
+        """Check stock for a line of ``quantity``, or hold it when cart reservations are on."""
+        if not CartReservations.enabled():
+            validators.assert_in_stock_anywhere(product)
+            validators.assert_in_stock_delivery_branch(product, quantity)
+            return
+        try:
+            CartReservations.sync(cart_id, product.id, quantity)
+        except DomainError:
+            # Same error as without holds for products stocked nowhere. Existing lines skip
+            # the check: their own hold no longer counts as available.
+            if new_line:
+                validators.assert_in_stock_anywhere(product)
+            raise
+
     @staticmethod
     def _get_cart_for_user(cart_id: int, user_id: int) -> Cart:
         """Get cart and verify ownership."""
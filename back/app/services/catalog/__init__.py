@@ -1,17 +1,37 @@
 from app.services.catalog.admin import CatalogAdminService
+from app.services.catalog.autocomplete_index import ProductAutocompleteIndex, autocomplete_index
+from app.services.catalog.fuzzy_index import ProductVocabularyIndex, vocabulary_index
 from app.services.catalog.query import CatalogQueryService
+from app.services.catalog.response_cache import CachedResponse, CatalogResponseCache, catalog_response_cache
+from app.services.catalog.search_index import ProductSearchIndex
+from app.services.catalog.snapshot import CatalogSnapshotService
+from app.services.catalog.stock_summary import StockSummaryService
+from app.services.catalog.versioning import CatalogVersionService
 from app.services.catalog.mappers import (
     map_products,
     matches_stock,
+    project_products,
     to_category_response,
     to_product_response,
 )
 
 __all__ = [
+    "CachedResponse",
     "CatalogAdminService",
     "CatalogQueryService",
+    "CatalogResponseCache",
+    "CatalogSnapshotService",
+    "CatalogVersionService",
+    "ProductAutocompleteIndex",
+    "ProductSearchIndex",
+    "ProductVocabularyIndex",
+    "StockSummaryService",
+    "autocomplete_index",
+    "catalog_response_cache",
     "map_products",
     "matches_stock",
+    "project_products",
     "to_category_response",
     "to_product_response",
+    "vocabulary_index",
 ]
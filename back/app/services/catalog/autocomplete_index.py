@@ -0,0 +1,212 @@
+"""Per-worker prefix trie for product name autocomplete."""
+
+from __future__ import annotations
+import bisect
+import heapq
+import re
+import threading
+import time
+from dataclasses import dataclass
+from flask import current_app
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models import OrderItem, Product
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _tokenize(text: str | None) -> list[str]:
+    return [token.lower() for token in _TOKEN_RE.findall(text or "")]
+
+
+@dataclass(frozen=True)
+class _Entry:
+    product_id: int
+    name: str
+    popularity: int
+    tokens: tuple[str, ...]
+
+    @property
+    def rank(self) -> tuple[int, str, int]:
+        return (-self.popularity, self.name.lower(), self.product_id)
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids", "top")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.ids: set[int] = set()
+        # The best-ranked ids under this prefix, kept sorted so lookups are a slice. It
+        # holds at least MAX_RESULTS of them (or all), plus slack so removals rarely re-rank.
+        self.top: list[int] = []
+
+
+class ProductAutocompleteIndex:
+    """In-memory prefix index over active product names, ranked by units sold.
+
+    Every word of a product name is indexed, so "tom" completes "Cherry Tomatoes".
+    The index is built once per worker, patched in place by catalog admin writes,
+    and rebuilt after ``AUTOCOMPLETE_REFRESH_SECONDS`` to pick up writes served by
+    other workers and fresh sales counts. One request per worker rebuilds; the
+    others keep serving the previous index meanwhile (or wait, if there is none).
+    """
+
+    MAX_RESULTS = 50
+    _TOP_CAPACITY = 2 * MAX_RESULTS
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        self._root = _TrieNode()
+        self._entries: dict[int, _Entry] = {}
+        self._built_at: float | None = None
+
+    def warm(self) -> None:
+        """Build the index at startup; defer to the first lookup if the schema is not ready."""
+        try:
+            self.rebuild()
+        except SQLAlchemyError:
+            db.session.rollback()
+            current_app.logger.warning("Autocomplete index not built at startup; will build lazily")
+
+    def rebuild(self) -> None:
+        rows = db.session.execute(
+            select(Product.id, Product.name).where(Product.is_active.is_(True))
+        ).all()
+        popularity = dict(
+            db.session.execute(
+                select(OrderItem.product_id, func.sum(OrderItem.quantity)).group_by(OrderItem.product_id)
+            ).all()
+        )
+        root = _TrieNode()
+        entries: dict[int, _Entry] = {}
+        for product_id, name in rows:
+            entry = _Entry(product_id, name, int(popularity.get(product_id) or 0), tuple(_tokenize(name)))
+            entries[product_id] = entry
+            for node in self._path_nodes(root, entry.tokens, create=True):
+                node.ids.add(product_id)
+        self._fill_top(root, entries)
+        with self._lock:
+            self._root, self._entries = root, entries
+            self._built_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Force a rebuild on the next lookup."""
+        with self._lock:
+            self._built_at = None
+
+    def upsert(self, product_id: int, name: str, is_active: bool) -> None:
+        """Apply a single product write without rebuilding the whole index."""
+        with self._lock:
+            if self._built_at is None:
+                return
+            previous = self._entries.get(product_id)
+            if previous:
+                self._remove(previous)
+            if not is_active:
+                return
+            entry = _Entry(product_id, name, previous.popularity if previous else 0, tuple(_tokenize(name)))
+            self._entries[product_id] = entry
+            for node in self._path_nodes(self._root, entry.tokens, create=True):
+                node.ids.add(product_id)
+                self._offer_top(node, entry)
+
+    def search(self, query: str | None, limit: int) -> list[tuple[int, str]]:
+        """Return ``(product_id, name)`` pairs whose words start with every query token."""
+        self._ensure_fresh()
+        tokens = _tokenize(query)
+        limit = max(0, min(limit, self.MAX_RESULTS))
+        with self._lock:
+            if len(tokens) <= 1:
+                node = self._find(tokens[0]) if tokens else self._root
+                ids = node.top[:limit] if node else []
+            else:
+                ids = self._search_all(tokens, limit)
+            return [(pid, self._entries[pid].name) for pid in ids]
+
+    def _ensure_fresh(self) -> None:
+        if self._fresh():
+            return
+        # Single flight: with an index to fall back on, nobody waits for the rebuild.
+        if not self._rebuild_lock.acquire(blocking=self._built_at is None):
+            return
+        try:
+            if not self._fresh():
+                self.rebuild()
+        finally:
+            self._rebuild_lock.release()
+
+    def _fresh(self) -> bool:
+        max_age = current_app.config.get("AUTOCOMPLETE_REFRESH_SECONDS", 300)
+        built_at = self._built_at
+        return built_at is not None and time.monotonic() - built_at <= max_age
+
+    def _search_all(self, tokens: list[str], limit: int) -> list[int]:
+        nodes = [self._find(token) for token in tokens]
+        if any(node is None for node in nodes):
+            return []
+        narrowest = min(nodes, key=lambda node: len(node.ids))
+        matches = (
+            self._entries[pid]
+            for pid in narrowest.ids
+            if all(any(word.startswith(t) for word in self._entries[pid].tokens) for t in tokens)
+        )
+        return [entry.product_id for entry in heapq.nsmallest(limit, matches, key=lambda e: e.rank)]
+
+    def _find(self, prefix: str) -> _TrieNode | None:
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _remove(self, entry: _Entry) -> None:
+        del self._entries[entry.product_id]
+        for node in self._path_nodes(self._root, entry.tokens, create=False):
+            node.ids.discard(entry.product_id)
+            if entry.product_id in node.top:
+                node.top.remove(entry.product_id)
+                # Re-rank only once the slack is used up, not on every removal.
+                if len(node.top) < self.MAX_RESULTS and len(node.top) < len(node.ids):
+                    node.top = self._ranked(node.ids, self._entries)
+
+    def _offer_top(self, node: _TrieNode, entry: _Entry) -> None:
+        ranks = [self._entries[pid].rank for pid in node.top]
+        position = bisect.bisect_left(ranks, entry.rank)
+        # Past the end only if top already held every other id; otherwise an unlisted id may outrank it.
+        if position < len(node.top) or len(node.top) >= len(node.ids) - 1:
+            node.top.insert(position, entry.product_id)
+            del node.top[self._TOP_CAPACITY:]
+
+    def _fill_top(self, root: _TrieNode, entries: dict[int, _Entry]) -> None:
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            node.top = self._ranked(node.ids, entries)
+            stack.extend(node.children.values())
+
+    def _ranked(self, ids: set[int], entries: dict[int, _Entry]) -> list[int]:
+        best = heapq.nsmallest(self._TOP_CAPACITY, (entries[pid] for pid in ids), key=lambda e: e.rank)
+        return [entry.product_id for entry in best]
+
+    @staticmethod
+    def _path_nodes(root: _TrieNode, tokens: tuple[str, ...], *, create: bool) -> list[_TrieNode]:
+        """Distinct nodes for every prefix of every token, including the root."""
+        seen: dict[int, _TrieNode] = {id(root): root}
+        for token in tokens:
+            node = root
+            for char in token:
+                child = node.children.get(char)
+                if child is None:
+                    if not create:
+                        break
+                    child = node.children[char] = _TrieNode()
+                node = child
+                seen[id(node)] = node
+        return list(seen.values())
+
+
+autocomplete_index = ProductAutocompleteIndex()
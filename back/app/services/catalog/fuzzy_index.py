@@ -0,0 +1,140 @@
+"""Per-worker trigram index over the words of product names, for typo correction."""
+
+from __future__ import annotations
+import re
+import threading
+import time
+from collections import Counter
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models import Product
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class SearchBudgetExceeded(Exception):
+    """A typo-tolerant search ran past ``SEARCH_FUZZY_BUDGET_MS``."""
+
+
+def _tokenize(text: str | None) -> list[str]:
+    return [token.lower() for token in _TOKEN_RE.findall(text or "")]
+
+
+def trigrams(word: str) -> set[str]:
+    """pg_trgm-style trigrams: two leading blanks and one trailing blank."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ProductVocabularyIndex:
+    """Maps misspelled query words to the closest word used in an active product name.
+
+    The vocabulary (distinct words, not products) stays small even for very large
+    catalogs, so a query word is compared only with words sharing a trigram with
+    it. Similarity is trigram Jaccard, the measure pg_trgm uses, with the same
+    0.3 default threshold; ties go to the word used by more products. One
+    request per worker rebuilds a stale or invalidated vocabulary; the others
+    keep correcting against the previous one meanwhile (or wait, if there is none).
+    """
+
+    SIMILARITY_THRESHOLD = 0.3
+    MIN_WORD_LENGTH = 3
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        self._frequency: Counter[str] = Counter()
+        self._postings: dict[str, set[str]] = {}
+        self._built_at: float | None = None
+
+    def warm(self) -> None:
+        try:
+            self.rebuild()
+        except SQLAlchemyError:
+            db.session.rollback()
+            current_app.logger.warning("Search vocabulary not built at startup; will build lazily")
+
+    def rebuild(self) -> None:
+        frequency: Counter[str] = Counter()
+        for (name,) in db.session.execute(select(Product.name).where(Product.is_active.is_(True))):
+            frequency.update(set(_tokenize(name)))
+        postings: dict[str, set[str]] = {}
+        for word in frequency:
+            for gram in trigrams(word):
+                postings.setdefault(gram, set()).add(word)
+        with self._lock:
+            self._frequency, self._postings = frequency, postings
+            self._built_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._built_at = None
+
+    def add(self, name: str) -> None:
+        """Learn the words of a new or renamed product; removals wait for the next rebuild."""
+        with self._lock:
+            if self._built_at is None:
+                return
+            for word in set(_tokenize(name)):
+                if word not in self._frequency:
+                    for gram in trigrams(word):
+                        self._postings.setdefault(gram, set()).add(word)
+                self._frequency[word] += 1
+
+    def correct(self, query: str | None, deadline: float | None = None) -> str | None:
+        """The query with unknown words replaced, or ``None`` if nothing could be corrected.
+
+        Raises ``SearchBudgetExceeded`` if ``time.perf_counter()`` passes ``deadline``
+        before every word is corrected.
+        """
+        self._ensure_fresh()
+        tokens = _tokenize(query)
+        corrected, changed = [], False
+        with self._lock:
+            for token in tokens:
+                if token in self._frequency or len(token) < self.MIN_WORD_LENGTH:
+                    corrected.append(token)
+                    continue
+                if deadline is not None and time.perf_counter() > deadline:
+                    raise SearchBudgetExceeded
+                match = self._closest(token)
+                if match is None:
+                    return None
+                corrected.append(match)
+                changed = True
+        return " ".join(corrected) if changed else None
+
+    def _closest(self, token: str) -> str | None:
+        grams = trigrams(token)
+        shared: Counter[str] = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        best: tuple[float, int, str] | None = None
+        for word, overlap in shared.items():
+            score = overlap / (len(grams) + len(trigrams(word)) - overlap)
+            candidate = (score, self._frequency[word], word)
+            if score >= self.SIMILARITY_THRESHOLD and (best is None or candidate[:2] > best[:2]):
+                best = candidate
+        return best[2] if best else None
+
+    def _ensure_fresh(self) -> None:
+        if self._fresh():
+            return
+        # Single flight, as in ProductAutocompleteIndex; only a never-built vocabulary waits.
+        if not self._rebuild_lock.acquire(blocking=not self._frequency):
+            return
+        try:
+            if not self._fresh():
+                self.rebuild()
+        finally:
+            self._rebuild_lock.release()
+
+    def _fresh(self) -> bool:
+        max_age = current_app.config.get("AUTOCOMPLETE_REFRESH_SECONDS", 300)
+        built_at = self._built_at
+        return built_at is not None and time.monotonic() - built_at <= max_age
+
+
+vocabulary_index = ProductVocabularyIndex()
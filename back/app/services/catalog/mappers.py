@@ -1,8 +1,9 @@
 from __future__ import annotations
 from typing import Sequence
-from sqlalchemy import select
+from sqlalchemy import and_, func, select
+from sqlalchemy.engine import Row
 from app.extensions import db
-from app.models import Category, Inventory, Product
+from app.models import Category, Inventory, Product, ProductStockSummary
 from app.schemas.catalog import CategoryResponse, ProductResponse
 
 
@@ -66,3 +67,73 @@ def to_product_response(product: Product, branch_id: int | None) -> ProductRespo
 
 def map_products(items: Sequence[Product], branch_id: int | None) -> list[ProductResponse]:
     return [to_product_response(item, branch_id) for item in items]
+
+
+# Product columns needed by ProductResponse; read as plain values, never as ORM objects.
+_PRODUCT_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.sku,
+    Product.price,
+    Product.old_price,
+    Product.unit,
+    Product.nutritional_info,
+    Product.is_organic,
+    Product.bin_location,
+    Product.image_url,
+    Product.description,
+    Product.category_id,
+    Product.is_active,
+)
+
+
+def stock_projection(branch_id: int | None) -> list:
+    """Stock columns read from ``product_stock_summary`` and the branch's inventory row."""
+    columns = [
+        func.coalesce(ProductStockSummary.total_available, 0).label("available_quantity"),
+        (func.coalesce(ProductStockSummary.branches_in_stock, 0) > 0).label("in_stock_anywhere"),
+    ]
+    if branch_id:
+        columns.append(func.coalesce(Inventory.available_quantity, 0).label("branch_available_quantity"))
+    return columns
+
+
+def row_to_product_response(row: Row, branch_id: int | None) -> ProductResponse:
+    branch_available_quantity = int(row.branch_available_quantity) if branch_id else None
+    return ProductResponse(
+        id=row.id,
+        name=row.name,
+        sku=row.sku,
+        price=row.price,
+        old_price=row.old_price,
+        unit=row.unit,
+        nutritional_info=row.nutritional_info,
+        is_organic=bool(row.is_organic),
+        bin_location=row.bin_location,
+        image_url=row.image_url,
+        description=row.description,
+        category_id=row.category_id,
+        is_active=row.is_active,
+        in_stock_anywhere=bool(row.in_stock_anywhere),
+        in_stock_for_branch=branch_available_quantity > 0 if branch_id else None,
+        available_quantity=int(row.available_quantity),
+        branch_available_quantity=branch_available_quantity,
+    )
+
+
+def project_products(product_ids: Sequence[int], branch_id: int | None) -> list[ProductResponse]:
+    """Build responses for ``product_ids`` (in that order) from a single keyed join."""
+    if not product_ids:
+        return []
+    stmt = (
+        select(*_PRODUCT_COLUMNS, *stock_projection(branch_id))
+        .select_from(Product)
+        .outerjoin(ProductStockSummary, ProductStockSummary.product_id == Product.id)
+        .where(Product.id.in_(product_ids))
+    )
+    if branch_id:
+        stmt = stmt.outerjoin(
+            Inventory, and_(Inventory.product_id == Product.id, Inventory.branch_id == branch_id)
+        )
+    rows = {row.id: row for row in db.session.execute(stmt)}
+    return [row_to_product_response(rows[pid], branch_id) for pid in product_ids if pid in rows]
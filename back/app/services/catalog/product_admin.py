@@ -8,6 +8,8 @@ from app.middleware.error_handler import DomainError
 from app.models import Category, Product
 from app.schemas.catalog import ProductResponse
 from app.services.audit_service import AuditService
+from .autocomplete_index import autocomplete_index
+from .fuzzy_index import vocabulary_index
 from .mappers import to_product_response
 
 
@@ -48,6 +50,8 @@ def create_product(
             details={"error": str(exc)},
         ) from exc
     
+    autocomplete_index.upsert(product.id, product.name, product.is_active)
+    vocabulary_index.add(product.name)
     AuditService.log_event(
         entity_type="product", action="CREATE", entity_id=product.id
     )
@@ -88,6 +92,9 @@ def update_product(
     
     db.session.add(product)
     db.session.commit()
+    autocomplete_index.upsert(product.id, product.name, product.is_active)
+    if name:
+        vocabulary_index.add(product.name)
     
     AuditService.log_event(
         entity_type="product",
@@ -114,6 +121,7 @@ def toggle_product(product_id: int, active: bool) -> ProductResponse:
     product.is_active = active
     db.session.add(product)
     db.session.commit()
+    autocomplete_index.upsert(product.id, product.name, product.is_active)
     
     AuditService.log_event(
         entity_type="product",
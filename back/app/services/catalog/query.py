@@ -1,11 +1,49 @@
 from __future__ import annotations
-from sqlalchemy import select, func, exists
-from sqlalchemy.orm import selectinload
+import time
+from flask import current_app
+from sqlalchemy import and_, case, or_, select, func
+from sqlalchemy.orm import aliased
 from app.extensions import db
 from app.middleware.error_handler import DomainError
-from app.models import Category, Inventory, Product
-from app.schemas.catalog import AutocompleteItem, AutocompleteResponse, CategoryResponse, ProductResponse
-from .mappers import map_products, to_category_response, to_product_response
+from app.models import Category, Inventory, Product, ProductStockSummary
+from app.schemas.catalog import (
+    AutocompleteItem,
+    AutocompleteResponse,
+    CategoryFacet,
+    CategoryResponse,
+    PriceBucket,
+    ProductResponse,
+    SearchFacets,
+)
+from app.services.shared_queries import SharedOperations
+from app.utils.ttl_cache import TTLCache
+from .autocomplete_index import autocomplete_index
+from .fuzzy_index import SearchBudgetExceeded
+from .mappers import project_products, to_category_response
+from .search_index import ProductSearchIndex
+from .versioning import CatalogVersionService
+
+
+# Keyset sort keys per search sort: (columns ending in a unique key, descending).
+_SEARCH_SORTS = {
+    "price_asc": ((Product.price, Product.id), False),
+    "price_desc": ((Product.price, Product.id), True),
+    "updated_at_desc": ((Product.updated_at, Product.id), True),
+    "name_asc": ((Product.name, Product.id), False),
+    "name_desc": ((Product.name, Product.id), True),
+    "stock_desc": ((func.coalesce(ProductStockSummary.total_available, 0), Product.id), True),
+}
+# Short forms accepted by ProductSearchQuery.sort.
+_SORT_ALIASES = {"price": "price_asc", "name": "name_asc", "date": "updated_at_desc"}
+
+# Lower edges of the price histogram; the last bucket is open-ended.
+_PRICE_EDGES = (0, 10, 25, 50, 100, 200)
+_facet_cache = TTLCache(max_entries=2048)
+BULK_LOOKUP_MAX_IDS = 300
+
+
+def _price_in(low: float, high: float | None):
+    return Product.price >= low if high is None else and_(Product.price >= low, Product.price < high)
 
 
 class CatalogQueryService:
@@ -16,6 +54,18 @@ class CatalogQueryService:
         total = db.session.scalar(select(func.count()).select_from(Category).where(Category.is_active.is_(True)))
         return ([to_category_response(c) for c in categories], total or 0)
 
+    @staticmethod
+    def list_categories_keyset(
+        limit: int,
+        cursor: str | None,
+        include_total: bool = True,
+    ) -> tuple[list[CategoryResponse], int | None, str | None]:
+        base = select(Category).where(Category.is_active.is_(True))
+        categories, next_cursor = SharedOperations.keyset_paginate(
+            base, [Category.id], limit, cursor, transform_fn=to_category_response
+        )
+        return categories, CatalogQueryService._total(base, include_total), next_cursor
+
     @staticmethod
     def get_category_products(
         category_id: int,
@@ -24,29 +74,69 @@ class CatalogQueryService:
         offset: int,
     ) -> tuple[list[ProductResponse], int]:
         stmt = (
-            select(Product)
+            select(Product.id)
             .where(Product.category_id == category_id)
             .where(Product.is_active.is_(True))
-            .options(selectinload(Product.inventory).selectinload(Inventory.branch))
             .offset(offset)
             .limit(limit)
         )
-        products = db.session.execute(stmt).scalars().all()
+        product_ids = db.session.execute(stmt).scalars().all()
         total = db.session.scalar(
             select(func.count())
             .select_from(Product)
             .where(Product.category_id == category_id)
             .where(Product.is_active.is_(True))
         )
-        return map_products(products, branch_id), total or 0
+        return project_products(product_ids, branch_id), total or 0
+
+    @staticmethod
+    def get_category_products_keyset(
+        category_id: int,
+        branch_id: int | None,
+        limit: int,
+        cursor: str | None,
+        include_total: bool = True,
+    ) -> tuple[list[ProductResponse], int | None, str | None]:
+        base = (
+            select(Product.id)
+            .where(Product.category_id == category_id)
+            .where(Product.is_active.is_(True))
+        )
+        product_ids, next_cursor = SharedOperations.keyset_paginate(base, [Product.id], limit, cursor)
+        total = CatalogQueryService._total(base, include_total)
+        return project_products(product_ids, branch_id), total, next_cursor
 
     @staticmethod
     def get_product(product_id: int, branch_id: int | None) -> ProductResponse:
-        stmt = select(Product).where(Product.id == product_id).options(selectinload(Product.inventory).selectinload(Inventory.branch))
-        product = db.session.execute(stmt).scalar_one_or_none()
-        if not product or not product.is_active:
+        products = project_products([product_id], branch_id)
+        if not products or not products[0].is_active:
             raise DomainError("NOT_FOUND", "Product not found", status_code=404)
-        return to_product_response(product, branch_id)
+        return products[0]
+
+    @staticmethod
+    def get_products_by_ids(product_ids: list[int], branch_id: int | None) -> list[ProductResponse]:
+        """Active products for ``product_ids`` in request order; unknown or inactive ids are skipped."""
+        unique_ids = list(dict.fromkeys(product_ids))
+        if len(unique_ids) > BULK_LOOKUP_MAX_IDS:
+            raise DomainError(
+                "TOO_MANY_IDS",
+                f"At most {BULK_LOOKUP_MAX_IDS} product ids can be requested at once",
+                status_code=400,
+            )
+        return CatalogQueryService.lookup_products(unique_ids, branch_id)
+
+    @staticmethod
+    def lookup_products(product_ids: list[int], branch_id: int | None) -> list[ProductResponse]:
+        """``get_products_by_ids`` without the request cap, for server-owned id lists (cart, wishlist).
+
+        Ids are projected ``BULK_LOOKUP_MAX_IDS`` at a time so each ``IN`` list stays bounded.
+        """
+        unique_ids = list(dict.fromkeys(product_ids))
+        products: list[ProductResponse] = []
+        for start in range(0, len(unique_ids), BULK_LOOKUP_MAX_IDS):
+            chunk = project_products(unique_ids[start:start + BULK_LOOKUP_MAX_IDS], branch_id)
+            products.extend(product for product in chunk if product.is_active)
+        return products
 
     @staticmethod
     def search_products(
@@ -60,10 +150,151 @@ class CatalogQueryService:
         max_price: float | None = None,
         organic_only: bool | None = None,
         sort: str | None = None,
-    ) -> tuple[list[ProductResponse], int]:
-        base = select(Product).where(Product.is_active.is_(True))
-        if query:
-            base = base.where(Product.name.ilike(f"%{query}%"))
+        include_total: bool = True,
+        fuzzy: bool = True,
+    ) -> tuple[list[ProductResponse], int | None]:
+        filters = (category_id, in_stock, branch_id, min_price, max_price, organic_only)
+
+        def run(base, rank):
+            sort_keys, descending = CatalogQueryService._search_sort(sort, rank)
+            ordered = base.order_by(*[key.desc() if descending else key.asc() for key in sort_keys])
+            product_ids = db.session.execute(ordered.offset(offset).limit(limit)).scalars().all()
+            return product_ids, CatalogQueryService._total(base, include_total)
+
+        base, rank = CatalogQueryService._search_base(query, *filters)
+        product_ids, total = run(base, rank)
+        if CatalogQueryService._needs_fuzzy(query, fuzzy, product_ids, offset == 0, base):
+            product_ids, total = CatalogQueryService._fuzzy(query, filters, run) or (product_ids, total)
+        return project_products(product_ids, branch_id), total
+
+    @staticmethod
+    def search_products_keyset(
+        query: str | None,
+        category_id: int | None,
+        in_stock: bool | None,
+        branch_id: int | None,
+        limit: int,
+        cursor: str | None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        organic_only: bool | None = None,
+        sort: str | None = None,
+        include_total: bool = True,
+        fuzzy: bool = True,
+    ) -> tuple[list[ProductResponse], int | None, str | None]:
+        """Search seeking on the sort key; the cursor is only valid for the same filters."""
+        filters = (category_id, in_stock, branch_id, min_price, max_price, organic_only)
+
+        def run(base, rank):
+            sort_keys, descending = CatalogQueryService._search_sort(sort, rank)
+            product_ids, next_cursor = SharedOperations.keyset_paginate(
+                base, list(sort_keys), limit, cursor, descending
+            )
+            return product_ids, CatalogQueryService._total(base, include_total), next_cursor
+
+        base, rank = CatalogQueryService._search_base(query, *filters)
+        product_ids, total, next_cursor = run(base, rank)
+        if CatalogQueryService._needs_fuzzy(query, fuzzy, product_ids, cursor is None, base):
+            product_ids, total, next_cursor = (
+                CatalogQueryService._fuzzy(query, filters, run) or (product_ids, total, next_cursor)
+            )
+        return project_products(product_ids, branch_id), total, next_cursor
+
+    @staticmethod
+    def search_facets(
+        query: str | None,
+        category_id: int | None,
+        in_stock: bool | None,
+        branch_id: int | None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        organic_only: bool | None = None,
+        fuzzy: bool = True,
+    ) -> SearchFacets:
+        """Category counts, price histogram, organic and in-stock counts for a search.
+
+        Computed in one grouped query over the same filtered set as ``search_products``
+        (its total replaces the separate count) and cached per normalized filter set
+        and catalog version, so a committed catalog or stock write is counted at once.
+        """
+        normalized = " ".join((query or "").lower().split())
+        key = (
+            CatalogVersionService.current(),
+            normalized, category_id, in_stock, branch_id, min_price, max_price, bool(organic_only), fuzzy,
+        )
+        cached = _facet_cache.get(key)
+        if cached is not None:
+            return cached
+        filters = (category_id, in_stock, branch_id, min_price, max_price, organic_only)
+        bounds = list(zip(_PRICE_EDGES, [*_PRICE_EDGES[1:], None]))
+
+        def run(base, _rank):
+            if branch_id:
+                branch_stock = aliased(Inventory)
+                base = base.outerjoin(
+                    branch_stock, and_(branch_stock.product_id == Product.id, branch_stock.branch_id == branch_id)
+                )
+                stocked = branch_stock.available_quantity > 0
+            else:
+                stocked = ProductStockSummary.branches_in_stock > 0
+            stmt = (
+                base.join(Category, Category.id == Product.category_id)
+                .with_only_columns(
+                    Product.category_id,
+                    Category.name,
+                    func.count(),
+                    func.sum(case((Product.is_organic.is_(True), 1), else_=0)),
+                    func.sum(case((stocked, 1), else_=0)),
+                    *[func.sum(case((_price_in(low, high), 1), else_=0)) for low, high in bounds],
+                )
+                .group_by(Product.category_id, Category.name)
+            )
+            return db.session.execute(stmt).all()
+
+        rows = run(*CatalogQueryService._search_base(normalized or None, *filters))
+        if CatalogQueryService._needs_fuzzy(normalized, fuzzy, rows, True, None):
+            rows = CatalogQueryService._fuzzy(normalized, filters, run) or rows
+        buckets = [0] * len(bounds)
+        for row in rows:
+            for index, value in enumerate(row[5:]):
+                buckets[index] += int(value or 0)
+        facets = SearchFacets(
+            total=sum(row[2] for row in rows),
+            categories=sorted(
+                (CategoryFacet(category_id=row[0], name=row[1], count=row[2]) for row in rows),
+                key=lambda facet: (-facet.count, facet.name),
+            ),
+            price_buckets=[
+                PriceBucket(min=low, max=high, count=count) for (low, high), count in zip(bounds, buckets)
+            ],
+            organic=sum(int(row[3] or 0) for row in rows),
+            in_stock=sum(int(row[4] or 0) for row in rows),
+        )
+        _facet_cache.set(key, facets, ttl=current_app.config.get("SEARCH_FACET_TTL_SECONDS", 30))
+        return facets
+
+    @staticmethod
+    def _search_base(
+        query: str | None,
+        category_id: int | None,
+        in_stock: bool | None,
+        branch_id: int | None,
+        min_price: float | None,
+        max_price: float | None,
+        organic_only: bool | None,
+        typo_tolerant: bool = False,
+        deadline: float | None = None,
+    ):
+        """Filtered product-id select and its relevance rank (``None`` without a query).
+
+        With ``typo_tolerant`` the query is matched by ``ProductSearchIndex.apply_fuzzy``
+        instead, and ``None`` is returned when nothing is close enough.
+        """
+        base = (
+            select(Product.id)
+            .outerjoin(ProductStockSummary, ProductStockSummary.product_id == Product.id)
+            .where(Product.is_active.is_(True))
+        )
         if category_id:
             base = base.where(Product.category_id == category_id)
         if min_price is not None:
@@ -72,52 +303,78 @@ class CatalogQueryService:
             base = base.where(Product.price <= max_price)
         if organic_only:
             base = base.where(Product.is_organic.is_(True))
-        if in_stock is not None:
-            stock_match = (
-                select(Inventory.id)
-                .where(Inventory.product_id == Product.id)
-                .where(Inventory.available_quantity > 0)
+        if in_stock is not None and branch_id:
+            base = base.outerjoin(
+                Inventory, and_(Inventory.product_id == Product.id, Inventory.branch_id == branch_id)
             )
-            if branch_id:
-                stock_match = stock_match.where(Inventory.branch_id == branch_id)
-            predicate = exists(stock_match)
-            base = base.where(predicate if in_stock else ~predicate)
-        # Sorting
-        if sort == "price_asc":
-            base = base.order_by(Product.price.asc())
-        elif sort == "price_desc":
-            base = base.order_by(Product.price.desc())
-        elif sort == "updated_at_desc":
-            base = base.order_by(Product.updated_at.desc())
-        elif sort == "name_asc":
-            base = base.order_by(Product.name.asc())
-        elif sort == "name_desc":
-            base = base.order_by(Product.name.desc())
-        else:
-            base = base.order_by(Product.id.desc())
-        stmt = base.options(selectinload(Product.inventory).selectinload(Inventory.branch)).offset(offset).limit(limit)
-        products = db.session.execute(stmt).scalars().all()
-        count_stmt = select(func.count()).select_from(base.subquery())
-        total = db.session.scalar(count_stmt)
-        return map_products(products, branch_id), total or 0
+            in_branch = Inventory.available_quantity > 0
+            base = base.where(in_branch if in_stock else or_(Inventory.id.is_(None), ~in_branch))
+        elif in_stock is not None:
+            anywhere = ProductStockSummary.branches_in_stock > 0
+            base = base.where(anywhere if in_stock else or_(ProductStockSummary.product_id.is_(None), ~anywhere))
+        if not query:
+            return base, None
+        if typo_tolerant:
+            return ProductSearchIndex.apply_fuzzy(base, query, deadline)
+        return ProductSearchIndex.apply(base, query)
+
+    @staticmethod
+    def _needs_fuzzy(query: str | None, fuzzy: bool, found, first_page: bool, exact_base) -> bool:
+        """Whether an exact search should be rerun typo-tolerantly.
+
+        Only an empty result can need it. Past the first page an empty page may just
+        mean the exact matches ran out, so one ``EXISTS`` tells the two apart there.
+        """
+        if found or not (fuzzy and query):
+            return False
+        return first_page or not db.session.scalar(select(exact_base.exists()))
+
+    @staticmethod
+    def _fuzzy(query: str, filters: tuple, run):
+        """``run(base, rank)`` over a typo-tolerant match, within ``SEARCH_FUZZY_BUDGET_MS``.
+
+        Returns ``None`` when nothing is close enough or the budget runs out, so the
+        caller keeps its empty exact result.
+        """
+        budget_ms = current_app.config.get("SEARCH_FUZZY_BUDGET_MS", 250)
+        deadline = time.perf_counter() + budget_ms / 1000 if budget_ms > 0 else None
+        try:
+            searched = CatalogQueryService._search_base(query, *filters, typo_tolerant=True, deadline=deadline)
+            if searched is None:
+                return None
+            with ProductSearchIndex.statement_budget(budget_ms):
+                return run(*searched)
+        except SearchBudgetExceeded:
+            current_app.logger.warning("Typo-tolerant search for %r exceeded %s ms", query, budget_ms)
+            return None
+
+    @staticmethod
+    def _search_sort(sort: str | None, rank) -> tuple[tuple, bool]:
+        sort = _SORT_ALIASES.get(sort, sort)
+        if sort in _SEARCH_SORTS:
+            return _SEARCH_SORTS[sort]
+        if rank is not None:
+            return (rank, Product.id), True
+        return (Product.id,), True
+
+    @staticmethod
+    def _total(base, include_total: bool) -> int | None:
+        if not include_total:
+            return None
+        return db.session.scalar(select(func.count()).select_from(base.subquery())) or 0
 
     @staticmethod
     def featured_products(limit: int, branch_id: int | None) -> list[ProductResponse]:
         stmt = (
-            select(Product)
+            select(Product.id)
             .where(Product.is_active.is_(True))
             .order_by(Product.updated_at.desc(), Product.id.desc())
             .limit(limit)
-            .options(selectinload(Product.inventory).selectinload(Inventory.branch))
         )
-        products = db.session.execute(stmt).scalars().all()
-        return map_products(products, branch_id)
+        return project_products(db.session.execute(stmt).scalars().all(), branch_id)
 
     @staticmethod
     def autocomplete(query: str | None, limit: int) -> AutocompleteResponse:
-        stmt = select(Product).where(Product.is_active.is_(True))
-        if query:
-            stmt = stmt.where(Product.name.ilike(f"%{query}%"))
-        products = db.session.execute(stmt.limit(limit)).scalars().all()
-        items = [AutocompleteItem(id=p.id, name=p.name) for p in products]
+        matches = autocomplete_index.search(query, limit)
+        items = [AutocompleteItem(id=product_id, name=name) for product_id, name in matches]
         return AutocompleteResponse(total=len(items), limit=limit, offset=0, items=items)
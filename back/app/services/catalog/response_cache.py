@@ -0,0 +1,51 @@
+"""Process-local cache of serialized public catalog responses."""
+
+from __future__ import annotations
+import threading
+from dataclasses import dataclass
+from typing import Hashable
+from app.utils.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    mimetype: str
+
+
+class CatalogResponseCache:
+    """LRU of rendered responses keyed by route, query args and catalog version.
+
+    Entries are never invalidated in place: a catalog write bumps the version,
+    new requests miss, and entries for old versions age out of the LRU. The
+    versioned keys cannot go stale, so entries are stored without expiry.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cache = TTLCache(ttl=float("inf"))
+        self._not_modified = 0
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        return self._cache.get(key)
+
+    def put(self, key: Hashable, entry: CachedResponse, max_entries: int) -> None:
+        self._cache.max_entries = max_entries
+        self._cache.set(key, entry)
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self._not_modified += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._cache.stats(), "not_modified": self._not_modified}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache = TTLCache(ttl=float("inf"))
+            self._not_modified = 0
+
+
+catalog_response_cache = CatalogResponseCache()
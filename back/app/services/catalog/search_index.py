@@ -0,0 +1,123 @@
+"""Indexed product name search backed by FTS5 (SQLite) or tsvector/trigram (Postgres)."""
+
+from __future__ import annotations
+import re
+from contextlib import contextmanager
+from typing import Iterator
+from sqlalchemy import Select, column, func, literal, literal_column, or_, select, table, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql.elements import ColumnElement
+from app.extensions import db
+from app.models import Product
+from .fuzzy_index import SearchBudgetExceeded, vocabulary_index
+
+_TOKEN_RE = re.compile(r"\w+")
+_FTS_TABLE = table("products_fts", column("rowid"))
+_TS_CONFIG = literal_column("'simple'::regconfig")
+_QUERY_CANCELED = "57014"
+
+
+class ProductSearchIndex:
+    """Applies an index-served name match and a relevance rank to product queries.
+
+    The indexes themselves are created alongside the ``products`` table (see
+    ``app.models.product.PRODUCT_SEARCH_DDL``) and are kept current by the database,
+    so seeds and admin writes are searchable as soon as they commit.
+    """
+
+    @staticmethod
+    def tokens(query: str | None) -> list[str]:
+        return [token.lower() for token in _TOKEN_RE.findall(query or "")]
+
+    @staticmethod
+    def apply(stmt: Select, query: str) -> tuple[Select, ColumnElement | None]:
+        """Filter ``stmt`` to products matching ``query``.
+
+        Returns the filtered statement and a rank expression where higher is more
+        relevant, or ``None`` when the dialect has no index to rank with.
+        """
+        tokens = ProductSearchIndex.tokens(query)
+        dialect = db.engine.dialect.name
+        if tokens and dialect == "sqlite":
+            return ProductSearchIndex._apply_fts5(stmt, tokens)
+        if tokens and dialect == "postgresql":
+            return ProductSearchIndex._apply_tsvector(stmt, query, tokens)
+        return stmt.where(Product.name.ilike(f"%{query}%")), None
+
+    @staticmethod
+    def apply_fuzzy(
+        stmt: Select, query: str, deadline: float | None = None
+    ) -> tuple[Select, ColumnElement | None] | None:
+        """Typo-tolerant variant of ``apply``; ``None`` when no close match exists.
+
+        Postgres matches with pg_trgm word similarity (served by ix_products_name_trgm);
+        other dialects correct each query word against the in-process vocabulary and
+        run the regular indexed match with the corrected words. Correction stops with
+        ``SearchBudgetExceeded`` once ``time.perf_counter()`` passes ``deadline``.
+        """
+        if db.engine.dialect.name == "postgresql":
+            needle = literal(query)
+            return stmt.where(needle.op("<%")(Product.name)), func.word_similarity(needle, Product.name)
+        corrected = vocabulary_index.correct(query, deadline)
+        if corrected is None:
+            return None
+        return ProductSearchIndex.apply(stmt, corrected)
+
+    @staticmethod
+    @contextmanager
+    def statement_budget(budget_ms: int) -> Iterator[None]:
+        """Cancel Postgres statements in the block after ``budget_ms``.
+
+        The block runs in a savepoint with a transaction-local ``statement_timeout``;
+        a cancelled statement rolls the savepoint back and raises
+        ``SearchBudgetExceeded``, leaving the surrounding transaction usable.
+        """
+        if db.engine.dialect.name != "postgresql" or budget_ms <= 0:
+            yield
+            return
+        savepoint = db.session.begin_nested()
+        previous = db.session.execute(
+            text("SELECT current_setting('statement_timeout'), set_config('statement_timeout', :budget, true)"),
+            {"budget": f"{budget_ms}ms"},
+        ).scalar()
+        try:
+            yield
+        except DBAPIError as exc:
+            savepoint.rollback()
+            if (getattr(exc.orig, "sqlstate", None) or getattr(exc.orig, "pgcode", None)) == _QUERY_CANCELED:
+                raise SearchBudgetExceeded from exc
+            raise
+        db.session.execute(text("SELECT set_config('statement_timeout', :previous, true)"), {"previous": previous})
+        savepoint.commit()
+
+    @staticmethod
+    def rebuild() -> None:
+        """Repopulate the SQLite shadow table; Postgres indexes need no maintenance."""
+        if db.engine.dialect.name != "sqlite":
+            return
+        db.session.execute(text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
+        db.session.commit()
+
+    @staticmethod
+    def _apply_fts5(stmt: Select, tokens: list[str]) -> tuple[Select, ColumnElement]:
+        # Every token must match as a prefix: "tom che" finds "Cherry Tomatoes".
+        match = " ".join(f'"{token}"*' for token in tokens)
+        matches = (
+            select(
+                _FTS_TABLE.c.rowid.label("product_id"),
+                (-func.bm25(literal_column("products_fts"))).label("rank"),
+            )
+            .select_from(_FTS_TABLE)
+            .where(literal_column("products_fts").op("MATCH")(match))
+            .subquery()
+        )
+        return stmt.join(matches, matches.c.product_id == Product.id), matches.c.rank
+
+    @staticmethod
+    def _apply_tsvector(stmt: Select, query: str, tokens: list[str]) -> tuple[Select, ColumnElement]:
+        document = func.to_tsvector(_TS_CONFIG, Product.name)
+        ts_query = func.to_tsquery(_TS_CONFIG, " & ".join(f"{token}:*" for token in tokens))
+        # The ILIKE arm keeps mid-word matches and is served by ix_products_name_trgm.
+        predicate = or_(document.op("@@")(ts_query), Product.name.ilike(f"%{query}%"))
+        rank = func.ts_rank(document, ts_query) + func.similarity(Product.name, query)
+        return stmt.where(predicate), rank
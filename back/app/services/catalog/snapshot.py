@@ -0,0 +1,134 @@
+"""Full-catalog gzip NDJSON snapshots and the version-based change feed."""
+
+from __future__ import annotations
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+from flask import current_app
+from sqlalchemy import select, union
+from app.extensions import db
+from app.middleware.error_handler import DomainError
+from app.models import Product, ProductStockSummary
+from .mappers import project_products
+from .versioning import CatalogVersionService
+
+_BATCH_SIZE = 1000
+_KEEP_SNAPSHOTS = 2
+_build_lock = threading.Lock()
+
+
+class CatalogSnapshotService:
+    """Writes the active catalog to disk for clients to download and keep locally.
+
+    A snapshot starts with a ``{"type": "meta", "version": N}`` line followed by
+    one ``{"type": "product", ...}`` line per active product. The version is read
+    before any product, so a client that applies ``changes_since(N)`` afterwards
+    sees every later write (some possibly twice, which is harmless).
+    """
+
+    @staticmethod
+    def latest_snapshot() -> tuple[Path, int]:
+        """Newest snapshot on disk, rebuilt once it is older than ``CATALOG_SNAPSHOT_MAX_AGE``.
+
+        Files named with a version ahead of the live catalog (left over from
+        another database, e.g. after a restore) are deleted rather than served.
+        """
+        directory = Path(current_app.config["CATALOG_SNAPSHOT_DIR"])
+        max_age = current_app.config.get("CATALOG_SNAPSHOT_MAX_AGE", 300)
+        version = CatalogVersionService.current()
+        latest = CatalogSnapshotService._newest(directory, max_age, version)
+        if latest:
+            return latest
+        with _build_lock:
+            return (
+                CatalogSnapshotService._newest(directory, max_age, version)
+                or CatalogSnapshotService.build(directory)
+            )
+
+    @staticmethod
+    def build(directory: Path) -> tuple[Path, int]:
+        directory.mkdir(parents=True, exist_ok=True)
+        version = CatalogVersionService.current()
+        path = directory / f"catalog-{version:012d}.ndjson.gz"
+        fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=".catalog-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as out:
+                meta = {"type": "meta", "version": version, "generated_at": datetime.utcnow().isoformat()}
+                out.write(_ndjson(meta))
+                for product_ids in CatalogSnapshotService._active_id_batches():
+                    for product in project_products(product_ids, None):
+                        out.write(_ndjson({"type": "product", **product.model_dump()}))
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        CatalogSnapshotService._prune(directory)
+        return path, version
+
+    @staticmethod
+    def changes_since(since: int, limit: int = 5000) -> dict:
+        """Products (active or not) changed after catalog version ``since``.
+
+        ``resync`` is set instead of returning items when more than ``limit``
+        products changed; the client should download a fresh snapshot.
+        """
+        if since < 0:
+            raise DomainError("INVALID_VERSION", "since must be a non-negative catalog version", status_code=400)
+        version = CatalogVersionService.current()
+        changed = union(
+            select(Product.id.label("product_id")).where(Product.catalog_version > since),
+            select(ProductStockSummary.product_id).where(ProductStockSummary.catalog_version > since),
+        ).subquery()
+        product_ids = db.session.execute(
+            select(changed.c.product_id).order_by(changed.c.product_id).limit(limit + 1)
+        ).scalars().all()
+        if len(product_ids) > limit:
+            return {"version": version, "resync": True, "items": []}
+        return {"version": version, "resync": False, "items": project_products(product_ids, None)}
+
+    @staticmethod
+    def _active_id_batches() -> Iterator[list[int]]:
+        last_id = 0
+        while True:
+            product_ids = db.session.execute(
+                select(Product.id)
+                .where(Product.is_active.is_(True), Product.id > last_id)
+                .order_by(Product.id)
+                .limit(_BATCH_SIZE)
+            ).scalars().all()
+            if not product_ids:
+                return
+            yield product_ids
+            last_id = product_ids[-1]
+
+    @staticmethod
+    def _newest(directory: Path, max_age: float, current_version: int) -> tuple[Path, int] | None:
+        snapshots = []
+        for path in sorted(directory.glob("catalog-*.ndjson.gz")):
+            if _version_of(path) > current_version:
+                path.unlink(missing_ok=True)
+            else:
+                snapshots.append(path)
+        if not snapshots or time.time() - snapshots[-1].stat().st_mtime > max_age:
+            return None
+        newest = snapshots[-1]
+        return newest, _version_of(newest)
+
+    @staticmethod
+    def _prune(directory: Path) -> None:
+        for stale in sorted(directory.glob("catalog-*.ndjson.gz"))[:-_KEEP_SNAPSHOTS]:
+            stale.unlink(missing_ok=True)
+
+
+def _version_of(path: Path) -> int:
+    return int(path.name.split("-")[1].split(".")[0])
+
+
+def _ndjson(payload: dict) -> bytes:
+    return (json.dumps(payload, default=str, separators=(",", ":")) + "\n").encode("utf-8")
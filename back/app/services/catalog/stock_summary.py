@@ -0,0 +1,143 @@
+"""Incrementally maintained per-product stock roll-up (``product_stock_summary``)."""
+
+from __future__ import annotations
+from collections import defaultdict
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, attributes
+from app.extensions import db
+from app.models import Inventory, ProductStockSummary
+from .versioning import CatalogVersionService
+
+_UPSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+class StockSummaryService:
+    """Keeps ``product_stock_summary`` in step with ``inventory``.
+
+    ORM writes to ``Inventory.available_quantity`` (checkout decrements, admin
+    updates, stock request approvals, CSV uploads) are turned into per-product
+    deltas after each flush and applied as a single upsert in the same
+    transaction. Increments rather than recomputed totals keep concurrent writes
+    to different branches of one product from overwriting each other. Core
+    ``UPDATE`` statements must call ``apply_deltas`` themselves; ``reconcile``
+    repairs any drift.
+    """
+
+    @staticmethod
+    def apply_deltas(session: Session, deltas: dict[int, tuple[int, int]]) -> None:
+        """Add ``(total_available, branches_in_stock)`` deltas per product id."""
+        rows = [
+            {"product_id": product_id, "total_available": total, "branches_in_stock": branches}
+            for product_id, (total, branches) in sorted(deltas.items())
+            if total or branches
+        ]
+        if not rows:
+            return
+        table = ProductStockSummary.__table__
+        connection = session.connection()
+        insert = _UPSERTS.get(connection.dialect.name)
+        if insert is None:
+            for row in rows:
+                StockSummaryService._apply_row(connection, row)
+            return
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.product_id],
+            set_={
+                "total_available": table.c.total_available + stmt.excluded.total_available,
+                "branches_in_stock": table.c.branches_in_stock + stmt.excluded.branches_in_stock,
+                "last_changed": func.now(),
+            },
+        )
+        connection.execute(stmt, rows)
+
+    @staticmethod
+    def reconcile(dry_run: bool = False) -> list[int]:
+        """Recompute the summary from ``inventory``; returns the product ids that had drifted."""
+        actual = {
+            product_id: (int(total or 0), int(branches or 0))
+            for product_id, total, branches in db.session.execute(
+                select(
+                    Inventory.product_id,
+                    func.sum(Inventory.available_quantity),
+                    func.sum(case((Inventory.available_quantity > 0, 1), else_=0)),
+                ).group_by(Inventory.product_id)
+            )
+        }
+        stored = {
+            row.product_id: (row.total_available, row.branches_in_stock)
+            for row in db.session.execute(
+                select(
+                    ProductStockSummary.product_id,
+                    ProductStockSummary.total_available,
+                    ProductStockSummary.branches_in_stock,
+                )
+            )
+        }
+        drifted = sorted(
+            product_id
+            for product_id in actual.keys() | stored.keys()
+            if stored.get(product_id, (0, 0)) != actual.get(product_id, (0, 0))
+        )
+        if dry_run or not drifted:
+            return drifted
+        for product_id in drifted:
+            total, branches = actual.get(product_id, (0, 0))
+            db.session.merge(
+                ProductStockSummary(product_id=product_id, total_available=total, branches_in_stock=branches)
+            )
+        CatalogVersionService.mark_changed(stock_product_ids=drifted)
+        db.session.commit()
+        return drifted
+
+    @staticmethod
+    def _apply_row(connection, row: dict) -> None:
+        table = ProductStockSummary.__table__
+        result = connection.execute(
+            table.update()
+            .where(table.c.product_id == row["product_id"])
+            .values(
+                total_available=table.c.total_available + row["total_available"],
+                branches_in_stock=table.c.branches_in_stock + row["branches_in_stock"],
+                last_changed=func.now(),
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(**row))
+
+
+def _quantity_change(inventory: Inventory, state: str) -> tuple[int, int] | None:
+    """Old and new available quantity for a flushed row, or ``None`` if unchanged."""
+    history = attributes.get_history(inventory, "available_quantity", passive=attributes.PASSIVE_NO_INITIALIZE)
+    if state == "new":
+        return 0, inventory.available_quantity or 0
+    if state == "deleted":
+        values = history.unchanged or history.deleted
+        return (values[0] or 0, 0) if values else None
+    if not history.added:
+        return None
+    old = history.deleted[0] if history.deleted else 0
+    return old or 0, history.added[0] or 0
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_stock_summary(session, _flush_context) -> None:
+    deltas: dict[int, list[int]] = defaultdict(lambda: [0, 0])
+    for state, objects in (("new", session.new), ("dirty", session.dirty), ("deleted", session.deleted)):
+        for obj in objects:
+            if not isinstance(obj, Inventory):
+                continue
+            change = _quantity_change(obj, state)
+            if change is None:
+                continue
+            old, new = change
+            # Deleted rows can no longer be refreshed, so read only what is already loaded.
+            product_id = inspect(obj).dict.get("product_id") if state == "deleted" else obj.product_id
+            if product_id is None:
+                continue
+            deltas[product_id][0] += new - old
+            deltas[product_id][1] += int(new > 0) - int(old > 0)
+    if deltas:
+        StockSummaryService.apply_deltas(session, {pid: tuple(delta) for pid, delta in deltas.items()})
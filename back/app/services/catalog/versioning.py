@@ -0,0 +1,110 @@
+"""Catalog version counter used to key caches of public catalog reads."""
+
+from __future__ import annotations
+from itertools import chain
+from typing import Iterable
+from sqlalchemy import event, insert, inspect, select, update
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import CatalogVersion, Category, Inventory, Product, ProductStockSummary
+
+_WATCHED = (Product, Category, Inventory)
+_CHANGED = "catalog_changed"
+_PRODUCTS = "catalog_changed_products"
+_STOCK = "catalog_changed_stock"
+
+
+class CatalogVersionService:
+    """Reads and bumps the single-row ``catalog_version`` counter.
+
+    ORM writes to products, categories or inventory are detected by session
+    events. The counter is bumped as the last statement of the committing
+    transaction, so the row lock is held only for the commit itself and versions
+    are handed out in commit order. The new version is stamped onto the changed
+    ``products`` rows and, for stock changes, their ``product_stock_summary`` rows,
+    which is what the catalog delta feed reads. Writes that bypass the unit of
+    work (Core ``UPDATE`` statements) call ``mark_changed``.
+    """
+
+    @staticmethod
+    def current() -> int:
+        return db.session.scalar(select(CatalogVersion.version).where(CatalogVersion.id == 1)) or 0
+
+    @staticmethod
+    def mark_changed(
+        session: Session | None = None,
+        product_ids: Iterable[int] = (),
+        stock_product_ids: Iterable[int] = (),
+    ) -> None:
+        info = (session or db.session).info
+        info[_CHANGED] = True
+        info.setdefault(_PRODUCTS, set()).update(product_ids)
+        info.setdefault(_STOCK, set()).update(stock_product_ids)
+
+    @staticmethod
+    def bump(session: Session) -> int:
+        version = session.execute(
+            update(CatalogVersion)
+            .where(CatalogVersion.id == 1)
+            .values(version=CatalogVersion.version + 1)
+            .returning(CatalogVersion.version)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        if version is None:
+            session.execute(insert(CatalogVersion).values(id=1, version=1))
+            version = 1
+        return version
+
+    @staticmethod
+    def stamp(session: Session, version: int, product_ids: set[int], stock_product_ids: set[int]) -> None:
+        if product_ids:
+            session.execute(
+                update(Product)
+                .where(Product.id.in_(sorted(product_ids)))
+                .values(catalog_version=version)
+                .execution_options(synchronize_session=False)
+            )
+        if stock_product_ids:
+            session.execute(
+                update(ProductStockSummary)
+                .where(ProductStockSummary.product_id.in_(sorted(stock_product_ids)))
+                .values(catalog_version=version)
+                .execution_options(synchronize_session=False)
+            )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_catalog_writes(session, _flush_context) -> None:
+    touched = False
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, _WATCHED):
+            continue
+        touched = True
+        if isinstance(obj, Product):
+            session.info.setdefault(_PRODUCTS, set()).add(obj.id)
+        elif isinstance(obj, Inventory):
+            product_id = inspect(obj).dict.get("product_id")
+            if product_id is not None:
+                session.info.setdefault(_STOCK, set()).add(product_id)
+    if touched:
+        session.info[_CHANGED] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_catalog_version(session) -> None:
+    if session.new or session.dirty or session.deleted:
+        # Flush now so ids of pending rows are collected before the version is stamped.
+        session.flush()
+    if not session.info.pop(_CHANGED, False):
+        return
+    version = CatalogVersionService.bump(session)
+    CatalogVersionService.stamp(
+        session, version, session.info.pop(_PRODUCTS, set()), session.info.pop(_STOCK, set())
+    )
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _reset_catalog_flag(session) -> None:
+    for key in (_CHANGED, _PRODUCTS, _STOCK):
+        session.info.pop(key, None)
@@ -1,16 +1,35 @@
 from app.services.checkout.branch_validator import CheckoutBranchValidator
 from app.services.checkout.cart_loader import CheckoutCartLoader
-from app.services.checkout.idempotency import CheckoutIdempotencyManager
-from app.services.checkout.inventory import CheckoutInventoryManager
-from app.services.checkout.order_builder import CheckoutOrderBuilder
+from app.services.checkout.idempotency import (
+    CheckoutIdempotencyManager,
+    CheckoutIdempotencyStats,
+    idempotency_stats,
+)
+from app.services.checkout.inventory import CheckoutInventoryManager, ReservedStock
+from app.services.checkout.locking import CheckoutLocking, CheckoutLockStats, checkout_lock_stats
+from app.services.checkout.order_builder import CheckoutOrderBuilder, OrderLine
+from app.services.checkout.order_numbers import OrderNumberGenerator, order_numbers
+from app.services.checkout.reservations import CheckoutReservations
+from app.services.checkout.preview import CheckoutPreviewLoader
 from app.services.checkout.pricing import CheckoutPricing, CheckoutTotals
 
 __all__ = [
     "CheckoutBranchValidator",
     "CheckoutCartLoader",
     "CheckoutIdempotencyManager",
+    "CheckoutIdempotencyStats",
     "CheckoutInventoryManager",
+    "CheckoutLockStats",
+    "CheckoutLocking",
     "CheckoutOrderBuilder",
+    "CheckoutPreviewLoader",
     "CheckoutPricing",
+    "CheckoutReservations",
     "CheckoutTotals",
+    "OrderLine",
+    "OrderNumberGenerator",
+    "ReservedStock",
+    "checkout_lock_stats",
+    "idempotency_stats",
+    "order_numbers",
 ]
@@ -11,7 +11,8 @@ class CheckoutCartLoader:
     def load(cart_id: int, for_update: bool = False) -> Cart:
         stmt = select(Cart).where(Cart.id == cart_id).options(selectinload(Cart.items))
         if for_update:
-            stmt = stmt.with_for_update()
+            # NOWAIT: a second confirm of the same cart backs off and retries instead of queueing.
+            stmt = stmt.with_for_update(nowait=True)
         cart = db.session.execute(stmt).scalar_one_or_none()
         if not cart:
             raise DomainError("NOT_FOUND", "Cart not found", status_code=404)
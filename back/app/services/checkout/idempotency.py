@@ -2,14 +2,68 @@ from __future__ import annotations
 
 import hashlib
 import json
-from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError
+import threading
+from datetime import datetime, timedelta
+from typing import Any, NamedTuple
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.extensions import db
 from app.middleware.error_handler import DomainError
-from app.models import IdempotencyKey
+from app.models import IdempotencyKey, StockReservation
 from app.models.enums import IdempotencyStatus
 from app.schemas.checkout import CheckoutConfirmRequest, CheckoutConfirmResponse
+from app.services.checkout.locking import CheckoutLocking
+from app.utils.ttl_cache import TTLCache
+
+_UPSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+_replay_cache = TTLCache(max_entries=4096)
+
+
+class Replay(NamedTuple):
+    """A succeeded checkout's stored response, as served to retries of the same request."""
+
+    user_id: int
+    key: str
+    request_hash: str
+    response_payload: dict[str, Any]
+    expires_at: datetime
+
+
+class CheckoutIdempotencyStats:
+    """Process-wide counters for idempotent replays.
+
+    Purging runs in the maintenance script's own process, so its progress is read
+    from the database instead (``CheckoutIdempotencyManager.purge_backlog``).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts = {
+            "replay_cache_hits": 0,
+            "replay_db_hits": 0,
+        }
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[counter] += amount
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                **self._counts,
+                "replay_cache": _replay_cache.stats(),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            for counter in self._counts:
+                self._counts[counter] = 0
+
+
+idempotency_stats = CheckoutIdempotencyStats()
+
 
 class CheckoutIdempotencyManager:
     @staticmethod
@@ -20,36 +74,118 @@ class CheckoutIdempotencyManager:
 
     @staticmethod
     def get_or_create_in_progress(user_id: int, key: str, request_hash: str) -> tuple[IdempotencyKey, bool]:
+        """Claim ``key`` for this request, or return the existing record.
+
+        The claim is an ``INSERT ... ON CONFLICT DO NOTHING`` rather than an insert
+        that may fail, so a losing racer never rolls back and drops the cart lock it
+        already holds; it locks the winner's row instead.
+        """
+        values = {
+            "user_id": user_id,
+            "key": key,
+            "request_hash": request_hash,
+            "status": IdempotencyStatus.IN_PROGRESS,
+            "expires_at": datetime.utcnow() + timedelta(hours=24),
+        }
+        upsert = _UPSERTS.get(db.session.get_bind().dialect.name)
+        if upsert is not None:
+            stmt = (
+                upsert(IdempotencyKey)
+                .values(**values)
+                .on_conflict_do_nothing(index_elements=["user_id", "key"])
+                .returning(IdempotencyKey)
+            )
+            record = db.session.scalars(stmt).one_or_none()
+            if record is not None:
+                return record, True
+        else:
+            existing = CheckoutIdempotencyManager._lock_existing(user_id, key)
+            if existing is None:
+                record = db.session.scalars(insert(IdempotencyKey).values(**values).returning(IdempotencyKey)).one()
+                return record, True
         existing = CheckoutIdempotencyManager._lock_existing(user_id, key)
-        if existing:
-            return CheckoutIdempotencyManager._handle_existing(existing, request_hash)
-
-        record = IdempotencyKey(
-            user_id=user_id,
-            key=key,
-            request_hash=request_hash,
-            status=IdempotencyStatus.IN_PROGRESS,
+        return CheckoutIdempotencyManager._handle_existing(existing, request_hash)
+
+    @staticmethod
+    def cached_replay(user_id: int, key: str, request_hash: str) -> dict[str, Any] | None:
+        """Stored response of a succeeded request, served from memory without touching its row.
+
+        Only ``SUCCEEDED`` responses are cached; they never change until the key
+        expires, and entries expire with it. Any other outcome (mismatch, in
+        progress, failed) takes the locked path.
+        """
+        payload = _replay_cache.get((user_id, key, request_hash))
+        if payload is not None:
+            idempotency_stats.increment("replay_cache_hits")
+        return payload
+
+    @staticmethod
+    def replay_of(record: IdempotencyKey) -> Replay:
+        """Capture a succeeded record's response while it is still loaded; pass it to ``remember``."""
+        return Replay(record.user_id, record.key, record.request_hash, record.response_payload, record.expires_at)
+
+    @staticmethod
+    def remember(replay: Replay) -> None:
+        """Cache a committed succeeded response for fast replays."""
+        ttl = (replay.expires_at - datetime.utcnow()).total_seconds()
+        if ttl > 0 and replay.response_payload is not None:
+            _replay_cache.set((replay.user_id, replay.key, replay.request_hash), replay.response_payload, ttl=ttl)
+
+    @staticmethod
+    def clear_cache() -> None:
+        _replay_cache.clear()
+
+    @staticmethod
+    def purge_expired(limit: int = 500) -> int:
+        """Delete up to ``limit`` expired keys; returns how many were deleted. The caller commits.
+
+        Keys still owning a stock reservation are left for the reservation sweep,
+        and rows locked by an in-flight checkout are skipped rather than waited on.
+        """
+        held = exists().where(StockReservation.idempotency_key_id == IdempotencyKey.id)
+        expired = list(
+            db.session.scalars(
+                select(IdempotencyKey.id)
+                .where(IdempotencyKey.expires_at < datetime.utcnow(), ~held)
+                .order_by(IdempotencyKey.expires_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
         )
-        db.session.add(record)
-        try:
-            db.session.flush()
-            return record, True
-        except IntegrityError:
-            db.session.rollback()
-            existing = CheckoutIdempotencyManager._lock_existing(user_id, key)
-            if not existing:
-                raise
-            return CheckoutIdempotencyManager._handle_existing(existing, request_hash)
+        deleted = 0
+        if expired:
+            deleted = db.session.execute(
+                delete(IdempotencyKey)
+                .where(IdempotencyKey.id.in_(expired))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        return deleted
+
+    @staticmethod
+    def purge_backlog() -> dict[str, int | str | None]:
+        """Expired keys still waiting for the purge, and when the oldest of them expired."""
+        count, oldest = db.session.execute(
+            select(func.count(), func.min(IdempotencyKey.expires_at)).where(
+                IdempotencyKey.expires_at < datetime.utcnow()
+            )
+        ).one()
+        return {"expired_keys": count, "oldest_expired_at": oldest.isoformat() if oldest else None}
 
     @staticmethod
     def _lock_existing(user_id: int, key: str) -> IdempotencyKey | None:
-        return db.session.execute(
+        return CheckoutLocking.acquire(
             select(IdempotencyKey).where(
                 IdempotencyKey.user_id == user_id,
                 IdempotencyKey.key == key,
             ).with_for_update()
         ).scalar_one_or_none()
 
+    @staticmethod
+    def lock(record_id: int) -> IdempotencyKey:
+        return CheckoutLocking.acquire(
+            select(IdempotencyKey).where(IdempotencyKey.id == record_id).with_for_update()
+        ).scalar_one()
+
     @staticmethod
     def _handle_existing(existing: IdempotencyKey, request_hash: str) -> tuple[IdempotencyKey, bool]:
         if existing.request_hash != request_hash:
@@ -64,6 +200,11 @@ class CheckoutIdempotencyManager:
                 "This request is already being processed",
                 status_code=409,
             )
+        if existing.status == IdempotencyStatus.FAILED:
+            # A failed attempt left no order behind, so the same request may run again.
+            existing.status = IdempotencyStatus.IN_PROGRESS
+            db.session.flush()
+            return existing, True
         return existing, False
 
     @staticmethod
@@ -1,42 +1,34 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from collections import defaultdict
+from typing import NamedTuple
+
+from sqlalchemy import Integer, column, literal, select, union_all, update, values
 
 from app.extensions import db
-from app.middleware.error_handler import DomainError
 from app.models import Inventory
 from app.schemas.checkout import MissingItem
 from app.services.audit_service import AuditService
+from app.services.catalog import CatalogVersionService, StockSummaryService
+from app.services.checkout.locking import CheckoutLocking
+
+
+class ReservedStock(NamedTuple):
+    inventory_id: int
+    product_id: int
+    quantity: int
 
 
 class CheckoutInventoryManager:
     def __init__(self, branch_id: int):
         self.branch_id = branch_id
 
-    def lock_inventory(self, cart_items) -> dict[tuple[int, int], Inventory]:
-        inv_ids = [item.product_id for item in cart_items]
-        inventory_rows = (
-            db.session.execute(
-                select(Inventory)
-                .where(Inventory.product_id.in_(inv_ids))
-                .where(Inventory.branch_id == self.branch_id)
-                .with_for_update()
-            )
-            .scalars()
-            .all()
-        )
-        return {(inv.product_id, inv.branch_id): inv for inv in inventory_rows}
-
-    def missing_items(self, cart_items, inv_map=None) -> list[MissingItem]:
+    @staticmethod
+    def shortfalls(cart_items, available_by_product: dict[int, int]) -> list[MissingItem]:
+        """Lines asking for more than ``available_by_product`` holds (absent products have none)."""
         missing: list[MissingItem] = []
         for item in cart_items:
-            if inv_map is None:
-                inv_row = db.session.execute(
-                    select(Inventory).where(Inventory.product_id == item.product_id, Inventory.branch_id == self.branch_id)
-                ).scalar_one_or_none()
-            else:
-                inv_row = inv_map.get((item.product_id, self.branch_id))
-            available = inv_row.available_quantity if inv_row else 0
+            available = available_by_product.get(item.product_id) or 0
             if available < item.quantity:
                 missing.append(
                     MissingItem(
@@ -47,31 +39,192 @@ class CheckoutInventoryManager:
                 )
         return missing
 
-    def decrement_inventory(self, cart_items, inv_map) -> None:
+    def decrement_inventory(self, cart_items) -> list[MissingItem]:
+        """Take stock for every cart line outright; returns the lines that were short."""
+        _, missing = self._take(cart_items, reserve=False)
+        return missing
+
+    def reserve_inventory(self, cart_items) -> tuple[list[ReservedStock], list[MissingItem]]:
+        """Move stock for every cart line from available to reserved.
+
+        Returns what was reserved, or nothing and the short lines.
+        """
+        return self._take(cart_items, reserve=True)
+
+    @staticmethod
+    def release_reserved(stock: list[ReservedStock]) -> None:
+        """Return reserved quantities to available stock."""
+        CheckoutInventoryManager._adjust(stock, available=1, reserved=-1, action="RELEASE")
+
+    @staticmethod
+    def consume_reserved(stock: list[ReservedStock]) -> None:
+        """Drop reserved quantities that now belong to a paid order."""
+        CheckoutInventoryManager._adjust(stock, available=0, reserved=-1, action="DECREMENT")
+
+    def _take(self, cart_items, reserve: bool) -> tuple[list[ReservedStock], list[MissingItem]]:
+        """Take stock for every cart line in one conditional ``UPDATE ... RETURNING``.
+
+        A line is taken only if its branch row still has enough stock, so a
+        shortfall shows up as fewer returned rows than requested products. In that
+        case the taken lines are put back and the short ones returned; either way
+        the inventory rows stay locked only until the surrounding transaction ends.
+        Rows are locked in product id order (see ``CheckoutLocking``).
+        """
+        requested: dict[int, int] = defaultdict(int)
         for item in cart_items:
-            key = (item.product_id, self.branch_id)
-            inv_row = inv_map.get(key)
-            if not inv_row:
-                continue
-            if inv_row.available_quantity < item.quantity:
-                raise DomainError(
-                    "INSUFFICIENT_STOCK",
-                    f"Not enough stock for product {item.product_id}",
-                    status_code=400,
+            requested[item.product_id] += item.quantity
+        if not requested:
+            return [], []
+
+        inventory = Inventory.__table__
+        # Lock in product id order first: the UPDATE's join order is up to the planner,
+        # and two carts sharing products must never lock them in opposite orders.
+        seen = dict(
+            CheckoutLocking.acquire(
+                select(inventory.c.product_id, inventory.c.available_quantity)
+                .where(inventory.c.product_id.in_(sorted(requested)), inventory.c.branch_id == self.branch_id)
+                .order_by(inventory.c.product_id)
+                .with_for_update()
+            ).all()
+        )
+        wanted = _rows_table("wanted", ("product_id", "quantity"), requested.items())
+        changes = {"available_quantity": inventory.c.available_quantity - wanted.c.quantity}
+        if reserve:
+            changes["reserved_quantity"] = inventory.c.reserved_quantity + wanted.c.quantity
+        stmt = (
+            update(inventory)
+            .where(
+                inventory.c.product_id == wanted.c.product_id,
+                inventory.c.branch_id == self.branch_id,
+                inventory.c.available_quantity >= wanted.c.quantity,
+            )
+            .values(**changes)
+            .returning(
+                inventory.c.id,
+                inventory.c.product_id,
+                inventory.c.available_quantity,
+                inventory.c.reserved_quantity,
+            )
+        )
+        rows = db.session.execute(stmt).all()
+        taken = [ReservedStock(row.id, row.product_id, requested[row.product_id]) for row in rows]
+        if len(rows) < len(requested):
+            CheckoutInventoryManager._restore(taken, reserved=-1 if reserve else 0)
+            taken_ids = {row.product_id for row in rows}
+            # Judge the summed request against the stock the UPDATE saw: lines repeating a
+            # product, or a row changed since the lock, would pass a fresh per-line check.
+            return [], [
+                MissingItem(
+                    product_id=product_id,
+                    requested_quantity=quantity,
+                    available_quantity=seen.get(product_id) or 0,
                 )
-            old_value = {
-                "available_quantity": inv_row.available_quantity,
-                "reserved_quantity": inv_row.reserved_quantity,
-            }
-            inv_row.available_quantity -= item.quantity
-            db.session.add(inv_row)
-            AuditService.log_event(
-                entity_type="inventory",
-                action="DECREMENT",
-                entity_id=inv_row.id,
-                old_value=old_value,
-                new_value={
-                    "available_quantity": inv_row.available_quantity,
-                    "reserved_quantity": inv_row.reserved_quantity,
-                },
+                for product_id, quantity in sorted(requested.items())
+                if product_id not in taken_ids
+            ]
+
+        CheckoutInventoryManager._record(rows, taken, available=-1, reserved=1 if reserve else 0,
+                                         action="RESERVE" if reserve else "DECREMENT")
+        return taken, []
+
+    @staticmethod
+    def _restore(stock: list[ReservedStock], reserved: int) -> None:
+        """Undo a partial take; the rows are still locked by this transaction.
+
+        The take recorded no summary deltas or audit rows, so the undo must not either.
+        """
+        if not stock:
+            return
+        inventory = Inventory.__table__
+        by_row = _rows_table("taken", ("inventory_id", "quantity"), ((s.inventory_id, s.quantity) for s in stock))
+        db.session.execute(
+            update(inventory)
+            .where(inventory.c.id == by_row.c.inventory_id)
+            .values(
+                available_quantity=inventory.c.available_quantity + by_row.c.quantity,
+                reserved_quantity=inventory.c.reserved_quantity + reserved * by_row.c.quantity,
             )
+        )
+
+    @staticmethod
+    def _adjust(stock: list[ReservedStock], available: int, reserved: int, action: str | None = None) -> None:
+        """Add ``quantity`` times the given signs to each row's available/reserved stock."""
+        if not stock:
+            return
+        # Several holds (carts, checkouts) may point at one row; the join must see it once.
+        merged: dict[int, ReservedStock] = {}
+        for item in stock:
+            previous = merged.get(item.inventory_id)
+            merged[item.inventory_id] = item._replace(quantity=item.quantity + (previous.quantity if previous else 0))
+        stock = list(merged.values())
+        inventory = Inventory.__table__
+        CheckoutLocking.acquire(
+            select(inventory.c.id)
+            .where(inventory.c.id.in_(sorted(s.inventory_id for s in stock)))
+            .order_by(inventory.c.product_id)
+            .with_for_update()
+        ).all()
+        by_row = _rows_table("moved", ("inventory_id", "quantity"), ((s.inventory_id, s.quantity) for s in stock))
+        rows = db.session.execute(
+            update(inventory)
+            .where(inventory.c.id == by_row.c.inventory_id)
+            .values(
+                available_quantity=inventory.c.available_quantity + available * by_row.c.quantity,
+                reserved_quantity=inventory.c.reserved_quantity + reserved * by_row.c.quantity,
+            )
+            .returning(
+                inventory.c.id,
+                inventory.c.product_id,
+                inventory.c.available_quantity,
+                inventory.c.reserved_quantity,
+            )
+        ).all()
+        CheckoutInventoryManager._record(rows, stock, available, reserved, action)
+
+    @staticmethod
+    def _record(rows, stock: list[ReservedStock], available: int, reserved: int, action: str | None) -> None:
+        """Sync the stock summary and write one batched audit insert for a Core update."""
+        moved = {s.inventory_id: s.quantity for s in stock}
+        deltas = {}
+        events = []
+        for row in rows:
+            quantity = moved[row.id]
+            old_available = row.available_quantity - available * quantity
+            if available:
+                total, branches = deltas.get(row.product_id, (0, 0))
+                deltas[row.product_id] = (
+                    total + available * quantity,
+                    branches + int(row.available_quantity > 0) - int(old_available > 0),
+                )
+            if action is None:
+                continue
+            events.append(
+                {
+                    "entity_type": "inventory",
+                    "action": action,
+                    "entity_id": row.id,
+                    "old_value": {
+                        "available_quantity": old_available,
+                        "reserved_quantity": row.reserved_quantity - reserved * quantity,
+                    },
+                    "new_value": {
+                        "available_quantity": row.available_quantity,
+                        "reserved_quantity": row.reserved_quantity,
+                    },
+                }
+            )
+        if deltas:
+            StockSummaryService.apply_deltas(db.session, deltas)
+            CatalogVersionService.mark_changed(stock_product_ids=deltas)
+        AuditService.log_events(events)
+
+
+def _rows_table(name: str, columns: tuple[str, str], rows):
+    """Integer ``rows`` as a named two-column table to join an ``UPDATE`` against."""
+    rows = sorted(rows)
+    if db.session.get_bind().dialect.name == "postgresql":
+        return values(*(column(col, Integer) for col in columns), name=name).data(rows)
+    # SQLite cannot name the columns of a VALUES list, so spell it as a UNION ALL.
+    return union_all(
+        *(select(*(literal(value).label(col) for col, value in zip(columns, row))) for row in rows)
+    ).subquery(name)
@@ -0,0 +1,126 @@
+"""Lock ordering, lock timeouts and contention counters for checkout confirm."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Callable, TypeVar
+
+from flask import current_app
+from sqlalchemy import func, select
+from sqlalchemy.exc import DBAPIError
+
+from app.extensions import db
+from app.middleware.error_handler import DomainError
+
+T = TypeVar("T")
+
+_DEADLOCK_DETECTED = "40P01"
+_LOCK_NOT_AVAILABLE = "55P03"
+
+
+class CheckoutLockStats:
+    """Process-wide counters for row-lock contention during checkout."""
+
+    # Acquisitions slower than this count as having waited on another transaction.
+    WAIT_THRESHOLD_MS = 5.0
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts = {
+            "acquisitions": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "deadlocks": 0,
+            "retries": 0,
+            "exhausted": 0,
+        }
+        self._wait_ms = 0.0
+
+    def record_acquisition(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self._counts["acquisitions"] += 1
+            if elapsed_ms >= self.WAIT_THRESHOLD_MS:
+                self._counts["waits"] += 1
+                self._wait_ms += elapsed_ms
+
+    def increment(self, counter: str) -> None:
+        with self._lock:
+            self._counts[counter] += 1
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {**self._counts, "wait_ms_total": round(self._wait_ms, 1)}
+
+    def reset(self) -> None:
+        with self._lock:
+            for counter in self._counts:
+                self._counts[counter] = 0
+            self._wait_ms = 0.0
+
+
+checkout_lock_stats = CheckoutLockStats()
+
+
+class CheckoutLocking:
+    """Deterministic lock protocol for checkout confirm.
+
+    Locks are always taken in the same order: the cart row (``NOWAIT``, so a
+    duplicate submission backs off instead of queueing), then the idempotency
+    key row, then inventory rows sorted by product id. Every other wait is
+    bounded by ``CHECKOUT_LOCK_TIMEOUT_MS``. Lock timeouts and deadlocks roll
+    the transaction back and retry the locking phase with jittered exponential
+    backoff, up to ``CHECKOUT_LOCK_RETRIES`` times.
+    """
+
+    @staticmethod
+    def run(phase: Callable[[], T]) -> T:
+        retries = current_app.config.get("CHECKOUT_LOCK_RETRIES", 3)
+        base_ms = current_app.config.get("CHECKOUT_LOCK_RETRY_BASE_MS", 25)
+        attempt = 0
+        while True:
+            CheckoutLocking._set_lock_timeout()
+            try:
+                return phase()
+            except DBAPIError as exc:
+                counter = CheckoutLocking._contention_counter(exc)
+                if counter is None:
+                    raise
+                db.session.rollback()
+                checkout_lock_stats.increment(counter)
+                if attempt >= retries:
+                    checkout_lock_stats.increment("exhausted")
+                    raise DomainError(
+                        "CHECKOUT_BUSY",
+                        "Checkout is busy, please retry",
+                        status_code=503,
+                    ) from exc
+                checkout_lock_stats.increment("retries")
+                time.sleep(base_ms * (2 ** attempt) * random.uniform(0.5, 1.5) / 1000)
+                attempt += 1
+
+    @staticmethod
+    def acquire(stmt):
+        """Execute a locking statement, timing how long it waited for the locks."""
+        started = time.perf_counter()
+        result = db.session.execute(stmt)
+        checkout_lock_stats.record_acquisition((time.perf_counter() - started) * 1000)
+        return result
+
+    @staticmethod
+    def _set_lock_timeout() -> None:
+        if db.session.get_bind().dialect.name != "postgresql":
+            return
+        timeout_ms = int(current_app.config.get("CHECKOUT_LOCK_TIMEOUT_MS", 2000))
+        # Transaction-scoped, so it is re-applied after every retry's rollback.
+        db.session.execute(select(func.set_config("lock_timeout", f"{timeout_ms}ms", True)))
+
+    @staticmethod
+    def _contention_counter(exc: DBAPIError) -> str | None:
+        code = getattr(exc.orig, "sqlstate", None) or getattr(exc.orig, "pgcode", None)
+        if code == _DEADLOCK_DETECTED:
+            return "deadlocks"
+        if code == _LOCK_NOT_AVAILABLE or "database is locked" in str(exc.orig):
+            return "timeouts"
+        return None
@@ -1,40 +1,94 @@
 from __future__ import annotations
 from datetime import datetime
-from secrets import token_hex
+from decimal import Decimal
+from typing import NamedTuple
+from sqlalchemy import insert, select
+from sqlalchemy.orm.attributes import set_committed_value
 from app.extensions import db
-from app.models import Order, OrderDeliveryDetails, OrderItem, OrderPickupDetails
+from app.models import Order, OrderDeliveryDetails, OrderItem, OrderPickupDetails, Product
 from app.models.enums import FulfillmentType, OrderStatus
 from app.schemas.checkout import CheckoutConfirmRequest
 from app.services.audit_service import AuditService
+from app.services.checkout.order_numbers import order_numbers
+
+
+class OrderLine(NamedTuple):
+    """A cart line as it was when checkout reserved its stock."""
+
+    product_id: int
+    name: str
+    sku: str
+    unit_price: Decimal
+    quantity: int
 
 
 class CheckoutOrderBuilder:
+    @staticmethod
+    def lines_from_cart(cart) -> list[OrderLine]:
+        """Snapshot the cart's lines, reading every product's name and SKU in one query."""
+        product_ids = {item.product_id for item in cart.items}
+        products = {}
+        if product_ids:
+            products = {
+                row.id: row
+                for row in db.session.execute(
+                    select(Product.id, Product.name, Product.sku).where(Product.id.in_(product_ids))
+                )
+            }
+        return [
+            OrderLine(
+                item.product_id,
+                products[item.product_id].name,
+                products[item.product_id].sku,
+                item.unit_price,
+                item.quantity,
+            )
+            for item in cart.items
+        ]
+
     @staticmethod
     def order_number() -> str:
-        return f"ORD-{int(datetime.utcnow().timestamp())}-{token_hex(3).upper()}"
+        return order_numbers.next()
 
     @staticmethod
-    def create_order(cart, payload: CheckoutConfirmRequest, branch_id: int, total_amount) -> Order:
+    def create_order(
+        user_id: int,
+        lines: list[OrderLine],
+        payload: CheckoutConfirmRequest,
+        branch_id: int,
+        total_amount,
+        order_number: str | None = None,
+    ) -> Order:
+        """Write the order with its fulfillment details, then all items in one multi-row insert."""
         order = Order(
-            order_number=CheckoutOrderBuilder.order_number(),
-            user_id=cart.user_id,
+            order_number=order_number or CheckoutOrderBuilder.order_number(),
+            user_id=user_id,
             total_amount=total_amount,
             fulfillment_type=payload.fulfillment_type or FulfillmentType.DELIVERY,
             status=OrderStatus.CREATED,
             branch_id=branch_id,  # Ensure branch_id is set from resolved branch
         )
         db.session.add(order)
-        for item in cart.items:
-            order_item = OrderItem(
-                order=order,
-                product_id=item.product_id,
-                name=item.product.name,
-                sku=item.product.sku,
-                unit_price=item.unit_price,
-                quantity=item.quantity,
-            )
-            db.session.add(order_item)
+        CheckoutOrderBuilder.add_fulfillment_details(order, payload, branch_id)
         db.session.flush()
+        items = []
+        if lines:
+            items = db.session.scalars(
+                insert(OrderItem).returning(OrderItem),
+                [
+                    {
+                        "order_id": order.id,
+                        "product_id": line.product_id,
+                        "name": line.name,
+                        "sku": line.sku,
+                        "unit_price": line.unit_price,
+                        "quantity": line.quantity,
+                    }
+                    for line in lines
+                ],
+            ).all()
+        # The rows were written outside the unit of work; hand them to the relationship as loaded.
+        set_committed_value(order, "items", items)
         return order
 
     @staticmethod
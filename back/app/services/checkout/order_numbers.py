@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+import threading
+
+from flask import current_app
+from sqlalchemy import Engine
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.extensions import db
+from app.models import OrderNumberCounter
+
+_UPSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+class OrderNumberGenerator:
+    """Monotonic, collision-free order numbers handed out from leased blocks.
+
+    Each worker leases ``ORDER_NUMBER_BLOCK_SIZE`` numbers at a time by bumping
+    the single ``order_number_counter`` row in its own short transaction, then
+    hands them out from memory. A lease commits even if the checkout that
+    triggered it rolls back, so no two workers ever hold the same range, and
+    every new number sorts after the previous ones, keeping inserts into the
+    ``orders.order_number`` index at its right edge.
+
+    On SQLite the lease needs the database write lock, so take a number before
+    the calling transaction's first write; otherwise the lease waits on it.
+    """
+
+    PREFIX = "ORD-"
+    WIDTH = 12  # zero-padded so string order matches numeric order
+
+    def __init__(self, block_size: int | None = None) -> None:
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._next = 0
+        self._end = 0
+
+    def next(self, engine: Engine | None = None) -> str:
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked worker must not hand out the rest of its parent's block.
+                self._pid, self._next, self._end = os.getpid(), 0, 0
+            if self._next >= self._end:
+                self._lease(engine)
+            value = self._next
+            self._next += 1
+        return f"{self.PREFIX}{value:0{self.WIDTH}d}"
+
+    def _lease(self, engine: Engine | None) -> None:
+        size = self.block_size or current_app.config.get("ORDER_NUMBER_BLOCK_SIZE", 100)
+        engine = engine or db.engine
+        upsert = _UPSERTS[engine.dialect.name]
+        table = OrderNumberCounter.__table__
+        stmt = upsert(table).values(id=1, next_value=1 + size)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.id], set_={"next_value": table.c.next_value + size}
+        ).returning(table.c.next_value)
+        if engine.url.database in (None, "", ":memory:"):
+            # An in-memory database has a single connection and a single process;
+            # lease inside the caller's transaction; ``max`` below skips ranges a rollback reissues.
+            end = db.session.execute(stmt).scalar_one()
+        else:
+            with engine.connect() as connection:
+                end = connection.execute(stmt).scalar_one()
+                connection.commit()
+        self._next = max(end - size, self._end)
+        self._end = self._next + size
+
+
+order_numbers = OrderNumberGenerator()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+from datetime import datetime
+from decimal import Decimal
+from typing import NamedTuple
+from flask import current_app
+from sqlalchemy import and_, func, select
+from app.extensions import db
+from app.middleware.error_handler import DomainError
+from app.models import Cart, CartItem, CatalogVersion, Inventory, StockReservation
+from app.schemas.checkout import MissingItem
+from app.services.checkout.inventory import CheckoutInventoryManager
+from app.services.settings_service import SettingsService
+from app.utils.ttl_cache import TTLCache
+
+_preview_cache = TTLCache(max_entries=4096)
+
+
+class PreviewLine(NamedTuple):
+    product_id: int
+    quantity: int
+    unit_price: Decimal
+
+
+class PreviewSnapshot(NamedTuple):
+    lines: tuple[PreviewLine, ...]
+    missing: tuple[MissingItem, ...]
+
+
+class CheckoutPreviewLoader:
+    """Cart lines and stock shortfalls for checkout preview, cached per cart state.
+
+    The cache key carries the cart's version and the catalog version, so any item
+    change or stock write starts a fresh entry; an unchanged cart is served from
+    memory after a single version probe, which also checks the settings version
+    for pricing.
+    """
+
+    @staticmethod
+    def load(cart_id: int, branch_id: int) -> PreviewSnapshot:
+        catalog_version = select(CatalogVersion.version).where(CatalogVersion.id == 1).scalar_subquery()
+        versions = db.session.execute(
+            select(Cart.version, catalog_version, SettingsService.version_probe()).where(Cart.id == cart_id)
+        ).one_or_none()
+        if versions is None:
+            raise DomainError("NOT_FOUND", "Cart not found", status_code=404)
+        SettingsService.observe(versions[2])
+        key = (cart_id, versions[0], versions[1] or 0, branch_id)
+        snapshot = _preview_cache.get(key)
+        if snapshot is None:
+            snapshot = CheckoutPreviewLoader._build(cart_id, branch_id)
+            _preview_cache.set(key, snapshot, ttl=current_app.config.get("CHECKOUT_PREVIEW_TTL_SECONDS", 60))
+        return snapshot
+
+    @staticmethod
+    def clear() -> None:
+        _preview_cache.clear()
+
+    @staticmethod
+    def _build(cart_id: int, branch_id: int) -> PreviewSnapshot:
+        # One query for every line and its branch stock. Stock this cart already holds
+        # there has left available_quantity but is the cart's own, as checkout's claim treats it.
+        held = (
+            select(func.coalesce(func.sum(StockReservation.quantity), 0))
+            .where(
+                StockReservation.cart_id == cart_id,
+                StockReservation.product_id == CartItem.product_id,
+                StockReservation.inventory_id == Inventory.id,
+                StockReservation.expires_at > datetime.utcnow(),
+            )
+            .scalar_subquery()
+        )
+        rows = db.session.execute(
+            select(
+                CartItem.product_id,
+                CartItem.quantity,
+                CartItem.unit_price,
+                (Inventory.available_quantity + held).label("available_quantity"),
+            )
+            .outerjoin(Inventory, and_(Inventory.product_id == CartItem.product_id, Inventory.branch_id == branch_id))
+            .where(CartItem.cart_id == cart_id)
+            .order_by(CartItem.id)
+        ).all()
+        lines = tuple(PreviewLine(row.product_id, row.quantity, row.unit_price) for row in rows)
+        available = {row.product_id: row.available_quantity for row in rows}
+        return PreviewSnapshot(lines, tuple(CheckoutInventoryManager.shortfalls(lines, available)))
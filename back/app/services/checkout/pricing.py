@@ -1,9 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from decimal import Decimal
-from flask import current_app
 from app.models import Cart
 from app.models.enums import FulfillmentType
+from app.services.settings_service import SettingsService
 
 
 @dataclass
@@ -16,12 +16,16 @@ class CheckoutTotals:
 class CheckoutPricing:
     @staticmethod
     def calculate(cart: Cart, fulfillment_type: FulfillmentType | None) -> CheckoutTotals:
-        cart_total = sum(item.unit_price * item.quantity for item in cart.items)
+        return CheckoutPricing.for_lines(cart.items, fulfillment_type)
+
+    @staticmethod
+    def for_lines(lines, fulfillment_type: FulfillmentType | None) -> CheckoutTotals:
+        """Totals for anything with ``unit_price`` and ``quantity`` (cart items, preview lines)."""
+        cart_total = sum((line.unit_price * line.quantity for line in lines), Decimal("0"))
    
         if fulfillment_type == FulfillmentType.DELIVERY:
-            min_total = Decimal(str(current_app.config.get("DELIVERY_MIN_TOTAL", 150)))
-            under_min_fee = Decimal(str(current_app.config.get("DELIVERY_FEE_UNDER_MIN", 30)))
-            delivery_fee: Decimal | None = Decimal("0") if cart_total >= min_total else under_min_fee
+            settings = SettingsService.current()
+            delivery_fee: Decimal | None = Decimal("0") if cart_total >= settings.delivery_min else settings.delivery_fee
         else:
             delivery_fee = None
         total_amount = cart_total + (delivery_fee or Decimal("0"))
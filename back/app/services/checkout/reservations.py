@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from flask import current_app
+from sqlalchemy import delete, insert, select
+
+from app.extensions import db
+from app.models import IdempotencyKey, StockReservation
+from app.models.enums import IdempotencyStatus
+from app.services.checkout.inventory import CheckoutInventoryManager, ReservedStock
+
+
+class CheckoutReservations:
+    """Stock held in ``inventory.reserved_quantity`` while a checkout is being paid for.
+
+    Reservations belong to the checkout's idempotency key and expire after
+    ``CHECKOUT_RESERVATION_TTL_SECONDS``. ``sweep`` releases expired ones; it runs
+    from ``scripts.maintenance.release_expired_reservations`` and whenever a new
+    reservation comes up short on stock that an abandoned checkout still holds.
+    """
+
+    @staticmethod
+    def hold(record: IdempotencyKey, stock: list[ReservedStock]) -> None:
+        if not stock:
+            return
+        expires_at = CheckoutReservations._expiry()
+        db.session.execute(
+            insert(StockReservation),
+            [
+                {
+                    "idempotency_key_id": record.id,
+                    "inventory_id": item.inventory_id,
+                    "product_id": item.product_id,
+                    "quantity": item.quantity,
+                    "expires_at": expires_at,
+                }
+                for item in stock
+            ],
+        )
+
+    @staticmethod
+    def adopt(record: IdempotencyKey, holds: list[StockReservation], lines) -> None:
+        """Move a cart's holds onto the checkout, trimmed to the quantities being bought."""
+        wanted = {line.product_id: line.quantity for line in lines}
+        expires_at = CheckoutReservations._expiry()
+        excess: list[ReservedStock] = []
+        for hold in holds:
+            keep = min(hold.quantity, wanted.get(hold.product_id, 0))
+            if keep < hold.quantity:
+                excess.append(ReservedStock(hold.inventory_id, hold.product_id, hold.quantity - keep))
+            if keep == 0:
+                db.session.delete(hold)
+                continue
+            hold.quantity = keep
+            hold.cart_id = None
+            hold.idempotency_key_id = record.id
+            hold.expires_at = expires_at
+        CheckoutInventoryManager.release_reserved(excess)
+
+    @staticmethod
+    def consume(record_id: int) -> bool:
+        """Turn a reservation into sold stock; ``False`` if it was already released."""
+        stock = CheckoutReservations._take(record_id)
+        CheckoutInventoryManager.consume_reserved(stock)
+        return bool(stock)
+
+    @staticmethod
+    def release(record_id: int) -> int:
+        """Return a reservation to available stock; returns the number of lines released."""
+        stock = CheckoutReservations._take(record_id)
+        CheckoutInventoryManager.release_reserved(stock)
+        return len(stock)
+
+    @staticmethod
+    def sweep(limit: int = 100, product_ids: Iterable[int] | None = None) -> int:
+        """Release up to ``limit`` expired checkouts' reservations.
+
+        Their keys stay ``IN_PROGRESS``: a charge may still be in flight, and failing
+        the key would let a same-key retry charge again. Such a checkout finalizes
+        by taking the stock outright. Keys locked by a checkout that is finalizing
+        right now are skipped, not waited on. The caller commits.
+        """
+        expired = select(StockReservation.idempotency_key_id).where(
+            StockReservation.expires_at < datetime.utcnow()
+        )
+        if product_ids is not None:
+            expired = expired.where(StockReservation.product_id.in_(list(product_ids)))
+        records = db.session.scalars(
+            select(IdempotencyKey)
+            .where(IdempotencyKey.id.in_(expired), IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS)
+            .order_by(IdempotencyKey.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+        released = 0
+        for record in records:
+            released += CheckoutReservations.release(record.id)
+        return released
+
+    @staticmethod
+    def _take(record_id: int) -> list[ReservedStock]:
+        rows = db.session.execute(
+            delete(StockReservation)
+            .where(StockReservation.idempotency_key_id == record_id)
+            .returning(StockReservation.inventory_id, StockReservation.product_id, StockReservation.quantity)
+            .execution_options(synchronize_session=False)
+        ).all()
+        return [ReservedStock(*row) for row in rows]
+
+    @staticmethod
+    def _expiry() -> datetime:
+        ttl = current_app.config.get("CHECKOUT_RESERVATION_TTL_SECONDS", 600)
+        return datetime.utcnow() + timedelta(seconds=ttl)
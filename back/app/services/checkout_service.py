@@ -4,9 +4,12 @@ from __future__ import annotations
 
 from decimal import Decimal
 import traceback
+from typing import NamedTuple
 from flask import current_app
+from sqlalchemy import select
 
 from app.extensions import db
+from app.models import Cart, IdempotencyKey
 from app.middleware.error_handler import DomainError
 from app.models.enums import FulfillmentType
 from app.schemas.checkout import (
@@ -14,110 +17,236 @@ from app.schemas.checkout import (
     CheckoutConfirmResponse,
     CheckoutPreviewRequest,
     CheckoutPreviewResponse,
+    MissingItem,
 )
 from app.models.payment_token import PaymentToken
 from app.services.audit_service import AuditService
+from app.services.cart.reservations import CartReservations
 from app.services.checkout import (
     CheckoutBranchValidator,
     CheckoutCartLoader,
     CheckoutIdempotencyManager,
     CheckoutInventoryManager,
+    CheckoutLocking,
     CheckoutOrderBuilder,
+    CheckoutPreviewLoader,
     CheckoutPricing,
+    CheckoutReservations,
+    CheckoutTotals,
+    OrderLine,
+    idempotency_stats,
 )
 from app.services.payment_service import PaymentService
+from app.services.settings_service import SettingsService
+
+
+class _LockedCheckout(NamedTuple):
+    idempotency_record: IdempotencyKey
+    record_id: int
+    is_new: bool
+    cart_id: int
+    user_id: int
+    totals: CheckoutTotals | None = None
+    lines: list[OrderLine] = []
+    missing: list[MissingItem] = []
 
 
 class CheckoutService:
     @staticmethod
     def preview(payload: CheckoutPreviewRequest) -> CheckoutPreviewResponse:
         branch_id = CheckoutBranchValidator.resolve_branch(payload.fulfillment_type, payload.branch_id)
-        cart = CheckoutCartLoader.load(payload.cart_id)
-        inventory = CheckoutInventoryManager(branch_id)
-        missing = inventory.missing_items(cart.items)
-        totals = CheckoutPricing.calculate(cart, payload.fulfillment_type)
+        snapshot = CheckoutPreviewLoader.load(payload.cart_id, branch_id)
+        totals = CheckoutPricing.for_lines(snapshot.lines, payload.fulfillment_type)
         return CheckoutPreviewResponse(
             cart_total=totals.cart_total,
             delivery_fee=totals.delivery_fee if payload.fulfillment_type == FulfillmentType.DELIVERY else None,
-            missing_items=missing,
+            missing_items=list(snapshot.missing),
             fulfillment_type=payload.fulfillment_type,
         )
 
     @staticmethod
     def confirm(payload: CheckoutConfirmRequest, idempotency_key: str) -> tuple[CheckoutConfirmResponse, bool]:
-        branch_id = CheckoutBranchValidator.resolve_branch(payload.fulfillment_type, payload.branch_id)
-        cart = CheckoutCartLoader.load(payload.cart_id, for_update=True)
-        CheckoutBranchValidator.validate_delivery_slot(payload.fulfillment_type, payload.delivery_slot_id, branch_id)
-
+        """Reserve stock and commit, charge with no locks held, then finalize or compensate."""
         request_hash = CheckoutService._hash_request(payload)
-        
-        # Check or create IN_PROGRESS idempotency record
-        idempotency_record, is_new = CheckoutIdempotencyManager.get_or_create_in_progress(
-            cart.user_id, idempotency_key, request_hash
+        # Retries of a succeeded request are answered from memory, before any lock is taken.
+        probe = db.session.execute(
+            select(Cart.user_id, SettingsService.version_probe()).where(Cart.id == payload.cart_id)
+        ).one_or_none()
+        user_id, settings_version = probe if probe is not None else (None, None)
+        SettingsService.observe(settings_version)
+        if user_id is not None:
+            cached = CheckoutIdempotencyManager.cached_replay(user_id, idempotency_key, request_hash)
+            if cached is not None:
+                return CheckoutConfirmResponse.model_validate(cached), False
+
+        branch_id = CheckoutBranchValidator.resolve_branch(payload.fulfillment_type, payload.branch_id)
+        locked = CheckoutLocking.run(
+            lambda: CheckoutService._lock_and_reserve(payload, idempotency_key, request_hash, branch_id)
         )
-        
+
         # If not new, return cached response (SUCCEEDED status) with 200 status
-        if not is_new:
-            return CheckoutConfirmResponse.model_validate(idempotency_record.response_payload), False
+        if not locked.is_new:
+            replay = CheckoutIdempotencyManager.replay_of(locked.idempotency_record)
+            db.session.rollback()  # nothing was written; drop the cart and key locks
+            CheckoutIdempotencyManager.remember(replay)
+            idempotency_stats.increment("replay_db_hits")
+            return CheckoutConfirmResponse.model_validate(replay.response_payload), False
 
-        inventory = CheckoutInventoryManager(branch_id)
-        inv_map = inventory.lock_inventory(cart.items)
-        missing = inventory.missing_items(cart.items, inv_map)
-        if missing:
-            CheckoutIdempotencyManager.mark_failed(idempotency_record)
-            db.session.commit()
+        if locked.missing:
             raise DomainError(
                 "INSUFFICIENT_STOCK",
                 "Insufficient stock for items",
                 status_code=409,
-                details={"missing": [m.model_dump() for m in missing]},
+                details={"missing": [m.model_dump() for m in locked.missing]},
             )
 
-        totals = CheckoutPricing.calculate(cart, payload.fulfillment_type)
-        payment_ref: str | None = None
-        response_payload: CheckoutConfirmResponse | None = None
-        order = None
+        totals = locked.totals
         try:
-            order = CheckoutOrderBuilder.create_order(cart, payload, branch_id, totals.total_amount)
-            CheckoutOrderBuilder.add_fulfillment_details(order, payload, branch_id)
-            inventory.decrement_inventory(cart.items, inv_map)
-            CheckoutOrderBuilder.audit_creation(order, totals.total_amount)
             payment_ref = PaymentService.charge(payload.payment_token_id, float(totals.total_amount))
-            CheckoutService._maybe_save_default_payment_token(cart.user_id, payload.payment_token_id, payload.save_as_default)
-
-            response_payload = CheckoutConfirmResponse(
-                order_id=order.id,
-                order_number=order.order_number,
-                total_paid=Decimal(totals.total_amount),
-                payment_reference=payment_ref,
-            )
-
-            # Mark idempotency as succeeded
-            CheckoutIdempotencyManager.mark_succeeded(idempotency_record, response_payload, order.id)
-
-            db.session.commit()
-        except DomainError:
+        except Exception:
             db.session.rollback()
+            CheckoutService._abandon(locked.record_id)
             raise
+
+        try:
+            response_payload = CheckoutService._finalize(payload, locked, branch_id, payment_ref)
         except Exception as exc:
             db.session.rollback()
-            if payment_ref:
-                AuditService.log_event(
-                    entity_type="payment",
-                    action="PAYMENT_CAPTURED_NOT_COMMITTED",
-                    entity_id=cart.id,
-                    context={"reference": payment_ref, "cart_id": str(cart.id)},
-                )
-            print("CheckoutService.confirm unexpected error:", exc)
-            traceback.print_exc()
-            current_app.logger.exception(
-                "Unexpected error confirming checkout for cart %s",
-                cart.id,
+            refund_ref = CheckoutService._refund(payment_ref, totals.total_amount)
+            AuditService.log_event(
+                entity_type="payment",
+                action="PAYMENT_CAPTURED_NOT_COMMITTED",
+                entity_id=locked.cart_id,
+                context={"reference": payment_ref, "refund_reference": refund_ref, "cart_id": str(locked.cart_id)},
             )
+            if refund_ref is not None:
+                # The money is back, so the same request may run again: release and fail the key.
+                CheckoutService._abandon(locked.record_id)
+            if not isinstance(exc, DomainError):
+                print("CheckoutService.confirm unexpected error:", exc)
+                traceback.print_exc()
+                current_app.logger.exception(
+                    "Unexpected error confirming checkout for cart %s",
+                    locked.cart_id,
+                )
+            db.session.commit()
             raise
 
         return response_payload, True  # is_new=True for newly created orders
 
+    @staticmethod
+    def _lock_and_reserve(
+        payload: CheckoutConfirmRequest, idempotency_key: str, request_hash: str, branch_id: int
+    ) -> _LockedCheckout:
+        """Reservation phase, locking in the fixed cart -> idempotency key -> inventory order.
+
+        Commits before returning, so no lock outlives it; a shortfall commits the
+        failed idempotency record instead of a reservation.
+        """
+        cart = CheckoutCartLoader.load(payload.cart_id, for_update=True)
+        CheckoutBranchValidator.validate_delivery_slot(payload.fulfillment_type, payload.delivery_slot_id, branch_id)
+
+        # Check or create IN_PROGRESS idempotency record
+        idempotency_record, is_new = CheckoutIdempotencyManager.get_or_create_in_progress(
+            cart.user_id, idempotency_key, request_hash
+        )
+        locked = _LockedCheckout(idempotency_record, idempotency_record.id, is_new, cart.id, cart.user_id)
+        if not is_new:
+            return locked
+
+        totals = CheckoutPricing.calculate(cart, payload.fulfillment_type)
+        lines = CheckoutOrderBuilder.lines_from_cart(cart)
+        # Stock the cart already holds is taken over; only the rest is reserved here.
+        holds = CartReservations.claim(cart.id, branch_id)
+        held = {hold.product_id: hold.quantity for hold in holds}
+        wanted = [
+            line._replace(quantity=line.quantity - held.get(line.product_id, 0))
+            for line in lines
+            if line.quantity > held.get(line.product_id, 0)
+        ]
+        inventory = CheckoutInventoryManager(branch_id)
+        reserved, missing = inventory.reserve_inventory(wanted)
+        if missing:
+            # Abandoned checkouts and carts may be holding some of the stock; try again with it released.
+            product_ids = [m.product_id for m in missing]
+            swept = CheckoutReservations.sweep(product_ids=product_ids)
+            swept += CartReservations.sweep(product_ids=product_ids)
+            if swept:
+                reserved, missing = inventory.reserve_inventory(wanted)
+        if missing:
+            requested = {line.product_id: line.quantity for line in lines}
+            missing = [
+                m.model_copy(
+                    update={
+                        "requested_quantity": requested[m.product_id],
+                        "available_quantity": m.available_quantity + held.get(m.product_id, 0),
+                    }
+                )
+                for m in missing
+            ]
+            CheckoutIdempotencyManager.mark_failed(idempotency_record)
+        else:
+            CheckoutReservations.adopt(idempotency_record, holds, lines)
+            CheckoutReservations.hold(idempotency_record, reserved)
+        db.session.commit()
+        return locked._replace(totals=totals, lines=lines, missing=missing)
+
+    @staticmethod
+    def _finalize(
+        payload: CheckoutConfirmRequest, locked: _LockedCheckout, branch_id: int, payment_ref: str
+    ) -> CheckoutConfirmResponse:
+        """Turn a paid reservation into an order."""
+        # Before the first write: on SQLite a block lease needs the write lock this transaction would hold.
+        order_number = CheckoutOrderBuilder.order_number()
+        idempotency_record = CheckoutIdempotencyManager.lock(locked.record_id)
+        if not CheckoutReservations.consume(locked.record_id):
+            # The reservation expired and was swept while the charge ran; take the stock outright.
+            missing = CheckoutInventoryManager(branch_id).decrement_inventory(locked.lines)
+            if missing:
+                raise DomainError(
+                    "RESERVATION_EXPIRED",
+                    "Stock reservation expired during payment",
+                    status_code=409,
+                    details={"missing": [m.model_dump() for m in missing]},
+                )
+        totals = locked.totals
+        order = CheckoutOrderBuilder.create_order(
+            locked.user_id, locked.lines, payload, branch_id, totals.total_amount, order_number
+        )
+        CheckoutOrderBuilder.audit_creation(order, totals.total_amount)
+        CheckoutService._maybe_save_default_payment_token(locked.user_id, payload.payment_token_id, payload.save_as_default)
+
+        response_payload = CheckoutConfirmResponse(
+            order_id=order.id,
+            order_number=order.order_number,
+            total_paid=Decimal(totals.total_amount),
+            payment_reference=payment_ref,
+        )
+
+        # Mark idempotency as succeeded
+        CheckoutIdempotencyManager.mark_succeeded(idempotency_record, response_payload, order.id)
+        replay = CheckoutIdempotencyManager.replay_of(idempotency_record)
+        db.session.commit()
+        CheckoutIdempotencyManager.remember(replay)
+        return response_payload
+
+    @staticmethod
+    def _abandon(record_id: int) -> None:
+        """Compensate a failed charge: release the reservation and fail the key."""
+        idempotency_record = CheckoutIdempotencyManager.lock(record_id)
+        CheckoutReservations.release(record_id)
+        CheckoutIdempotencyManager.mark_failed(idempotency_record)
+        db.session.commit()
+
+    @staticmethod
+    def _refund(payment_ref: str, amount: Decimal) -> str | None:
+        """Refund a charge whose order was not committed; ``None`` leaves it to manual follow-up."""
+        try:
+            return PaymentService.refund(payment_ref, float(amount))
+        except Exception:
+            current_app.logger.exception("Refund failed for captured payment %s", payment_ref)
+            return None
+
     @staticmethod
     def _hash_request(payload: CheckoutConfirmRequest) -> str:
         return CheckoutIdempotencyManager.hash_request(payload)
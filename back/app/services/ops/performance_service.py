@@ -1,61 +1,112 @@
 from __future__ import annotations
-from datetime import datetime, timedelta
+import threading
+import time
+from datetime import datetime
 
-from sqlalchemy import select ,func ,distinct
+from flask import current_app
+from sqlalchemy import case, func, or_, select
 from app.extensions import db
-from app.models import Audit, Order, OrderItem
+from app.models import Order, OrderItem
 from app.models.enums import OrderStatus, PickedStatus
+from app.utils.ttl_cache import TTLCache
+
+_CACHE_KEY = "ops_metrics"
+_metrics_cache = TTLCache(max_entries=1)
+_compute_lock = threading.Lock()
+_ACTIVE_STATUSES = (OrderStatus.CREATED, OrderStatus.IN_PROGRESS)
+
+
+class PickerActivity:
+    """Sliding window of when each employee last changed a pick status.
+
+    Fed by ``OpsOrderUpdateService.update_item_status`` after its commit. The
+    window lives in the worker's memory, so each worker counts the pickers whose
+    updates it served.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._last_seen: dict[int, float] = {}
+
+    def touch(self, user_id: int, now: float | None = None) -> None:
+        with self._lock:
+            self._last_seen[user_id] = time.monotonic() if now is None else now
+
+    def count(self, window_seconds: float, now: float | None = None) -> int:
+        cutoff = (time.monotonic() if now is None else now) - window_seconds
+        with self._lock:
+            for user_id in [uid for uid, seen in self._last_seen.items() if seen < cutoff]:
+                del self._last_seen[user_id]
+            return len(self._last_seen)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._last_seen.clear()
+
+
+picker_activity = PickerActivity()
 
 
 class OpsPerformanceService:
-    """Aggregates live metrics for the ops dashboard."""
+    """Aggregates live metrics for the ops dashboard.
+
+    Order and item counts cover the operational window: orders placed today
+    (UTC) plus any still ``CREATED`` or ``IN_PROGRESS``. They come from one
+    conditional-aggregate query whose result each worker reuses for
+    ``OPS_METRICS_TTL_SECONDS``, so frequent dashboard polls share one query.
+
+    ``livePickers`` comes from ``picker_activity`` and so only counts the
+    pickers whose updates this worker served. With several workers it
+    undercounts and can change between polls that land on different workers;
+    the response says so with ``livePickersScope: "worker"``.
+    """
 
     RECENT_PICKER_WINDOW_MINUTES = 5
 
     @staticmethod
-    def compute_metrics() -> dict[str, float | int]:
-        session = db.session
-        total_items = session.scalar(
-            select(func.count()).select_from(OrderItem),
-        ) or 0
-        picked_items = session.scalar(
-            select(func.count())
-            .select_from(OrderItem)
-            .where(OrderItem.picked_status == PickedStatus.PICKED),
-        ) or 0
-        efficiency = (
-            round((picked_items / total_items) * 100, 2) if total_items > 0 else 0
-        )
-
-        active_statuses = [OrderStatus.CREATED, OrderStatus.IN_PROGRESS]
-        active_orders = session.scalar(
-            select(func.count()).select_from(Order).where(
-                Order.status.in_(active_statuses),
-            ),
-        ) or 0
-        total_orders = session.scalar(
-            select(func.count()).select_from(Order),
-        ) or 0
-
-        window_start = datetime.utcnow() - timedelta(
-            minutes=OpsPerformanceService.RECENT_PICKER_WINDOW_MINUTES,
-        )
-        live_picker_count = session.scalar(
-            select(func.count(distinct(Audit.actor_user_id)))
-            .where(
-                Audit.entity_type == "order_item",
-                Audit.action == "UPDATE_PICK_STATUS",
-                Audit.actor_user_id.isnot(None),
-                Audit.created_at >= window_start,
-            ),
-        ) or 0
+    def compute_metrics() -> dict[str, float | int | str]:
+        metrics = _metrics_cache.get(_CACHE_KEY)
+        if metrics is None:
+            with _compute_lock:
+                metrics = _metrics_cache.get(_CACHE_KEY)
+                if metrics is None:
+                    metrics = OpsPerformanceService._aggregate()
+                    ttl = current_app.config.get("OPS_METRICS_TTL_SECONDS", 5)
+                    _metrics_cache.set(_CACHE_KEY, metrics, ttl=ttl)
+        window = OpsPerformanceService.RECENT_PICKER_WINDOW_MINUTES
+        return {
+            **metrics,
+            "livePickers": picker_activity.count(window * 60),
+            "livePickersScope": "worker",
+            "pickerWindowMinutes": window,
+        }
+
+    @staticmethod
+    def invalidate() -> None:
+        _metrics_cache.clear()
 
+    @staticmethod
+    def _aggregate() -> dict[str, float | int | str]:
+        since = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        is_active = Order.status.in_(_ACTIVE_STATUSES)
+        row = db.session.execute(
+            select(
+                func.count(func.distinct(Order.id)).label("total_orders"),
+                func.count(func.distinct(case((is_active, Order.id)))).label("active_orders"),
+                func.count(OrderItem.id).label("total_items"),
+                func.count(case((OrderItem.picked_status == PickedStatus.PICKED, OrderItem.id))).label("picked_items"),
+            )
+            .select_from(Order)
+            .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+            .where(or_(Order.created_at >= since, is_active))
+        ).one()
+        total_items = row.total_items or 0
+        picked_items = row.picked_items or 0
         return {
-            "batchEfficiency": efficiency,
-            "livePickers": live_picker_count,
-            "activeOrders": active_orders,
-            "totalOrders": total_orders,
+            "batchEfficiency": round((picked_items / total_items) * 100, 2) if total_items > 0 else 0,
+            "activeOrders": row.active_orders or 0,
+            "totalOrders": row.total_orders or 0,
             "pickedItems": picked_items,
             "totalItems": total_items,
-            "pickerWindowMinutes": OpsPerformanceService.RECENT_PICKER_WINDOW_MINUTES,
+            "windowStart": since.isoformat(),
         }
@@ -9,7 +9,9 @@ from app.models import Order
 from app.models.enums import OrderStatus, PickedStatus, Role
 from app.schemas.orders import OrderResponse
 from app.services.audit_service import AuditService
+from app.services.revenue_rollup_service import RevenueRollupService
 from .mappers import to_detail
+from .performance_service import picker_activity
 from .transitions import can_transition
 
 
@@ -49,6 +51,7 @@ class OpsOrderUpdateService:
             new_value={"picked_status": new_status.value},
         )
         session.commit()
+        picker_activity.touch(actor_id)
         return to_detail(order)
 
     @staticmethod
@@ -74,8 +77,11 @@ class OpsOrderUpdateService:
         if not can_transition(order, new_status, actor_role):
             raise DomainError("INVALID_STATUS_TRANSITION", "Status transition not allowed", status_code=409)
         old_value = {"status": order.status.value}
+        was_delivered = order.status == OrderStatus.DELIVERED
         order.status = new_status
         session.add(order)
+        if (new_status == OrderStatus.DELIVERED) != was_delivered:
+            RevenueRollupService.record(order, 1 if not was_delivered else -1)
         AuditService.log_event(
             entity_type="order",
             action="UPDATE_STATUS",
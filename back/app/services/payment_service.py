@@ -35,3 +35,14 @@ class PaymentService:
 
         # Only return mock reference if all validations pass
         return  f"MOCKPAY-{token.id}-{token_hex(4).upper()}"
+
+    @staticmethod
+    def refund(payment_reference: str, amount: float) -> str:
+        """Return a captured charge in full; returns the refund reference."""
+        if not payment_reference:
+            raise DomainError(
+                "PAYMENT_REFERENCE_REQUIRED",
+                "Payment reference required for refund",
+                status_code=400,
+            )
+        return f"MOCKREFUND-{token_hex(4).upper()}"
@@ -0,0 +1,166 @@
+"""Admin-editable global settings, cached per worker for pricing reads."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import GlobalSettings
+from app.services.audit_service import AuditService
+from app.utils.ttl_cache import TTLCache
+
+_CACHE_KEY = "global_settings"
+_settings_cache = TTLCache(max_entries=1)
+_EDITABLE = ("delivery_min", "delivery_fee", "free_threshold")
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    id: int | None
+    version: int
+    delivery_min: Decimal
+    delivery_fee: Decimal
+    free_threshold: Decimal
+    updated_at: datetime | None
+    updated_by: int | None
+
+    @classmethod
+    def from_row(cls, row: GlobalSettings) -> SettingsSnapshot:
+        return cls(
+            id=row.id,
+            version=row.version or 0,
+            delivery_min=Decimal(str(row.delivery_min)),
+            delivery_fee=Decimal(str(row.delivery_fee)),
+            free_threshold=Decimal(str(row.free_threshold)),
+            updated_at=row.updated_at,
+            updated_by=row.updated_by,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "version": self.version,
+            "delivery_min": float(self.delivery_min),
+            "delivery_fee": float(self.delivery_fee),
+            "free_threshold": float(self.free_threshold),
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "updated_by": self.updated_by,
+        }
+
+
+class SettingsService:
+    """Serves the ``global_settings`` row from a per-worker cache.
+
+    Checkout pricing reads settings on every request, so reads never touch the
+    database while the cached snapshot is fresh. ``update`` bumps the row's
+    version and replaces the snapshot in the worker that made the change. Checkout
+    preview and confirm select ``version_probe()`` in a query they already run and
+    pass it to ``observe``, so other workers drop an outdated snapshot on their
+    next checkout request; anything else they serve from settings may be up to
+    ``SETTINGS_CACHE_TTL_SECONDS`` old. Until an admin first saves settings, the
+    ``DELIVERY_MIN_TOTAL`` / ``DELIVERY_FEE_UNDER_MIN`` config values apply;
+    the admin read saves them as the row (``get_or_create``) so it always has an id.
+    """
+
+    @staticmethod
+    def current() -> SettingsSnapshot:
+        snapshot = _settings_cache.get(_CACHE_KEY)
+        if snapshot is None:
+            row = db.session.scalars(select(GlobalSettings).order_by(GlobalSettings.id).limit(1)).first()
+            snapshot = SettingsSnapshot.from_row(row) if row else SettingsService._defaults()
+            SettingsService._remember(snapshot)
+        return snapshot
+
+    @staticmethod
+    def get_or_create() -> SettingsSnapshot:
+        """Like ``current``, but first saves the default row if none exists, so it has an ``id``."""
+        snapshot = SettingsService.current()
+        if snapshot.id is not None:
+            return snapshot
+        row = db.session.scalars(select(GlobalSettings).order_by(GlobalSettings.id).limit(1)).first()
+        if row is None:
+            row = SettingsService._insert_defaults()
+            db.session.commit()
+        snapshot = SettingsSnapshot.from_row(row)
+        SettingsService._remember(snapshot)
+        return snapshot
+
+    @staticmethod
+    def version_probe():
+        """Scalar subquery for the settings version, to add to a query the caller runs anyway."""
+        return select(GlobalSettings.version).order_by(GlobalSettings.id).limit(1).scalar_subquery()
+
+    @staticmethod
+    def observe(version: int | None) -> None:
+        """Drop the cached snapshot if the stored settings version (from ``version_probe``) differs."""
+        snapshot = _settings_cache.get(_CACHE_KEY)
+        if snapshot is not None and snapshot.version != (version or 0):
+            _settings_cache.clear()
+
+    @staticmethod
+    def update(data: dict[str, Any], user_id: int) -> SettingsSnapshot:
+        """Apply the editable fields in ``data``, bump the version and commit."""
+        row = db.session.scalars(
+            select(GlobalSettings).order_by(GlobalSettings.id).limit(1).with_for_update()
+        ).first()
+        if row is None:
+            row = SettingsService._insert_defaults()
+        old_values = SettingsSnapshot.from_row(row).to_dict()
+        for field in _EDITABLE:
+            if field in data:
+                setattr(row, field, Decimal(str(data[field])))
+        row.version = (row.version or 0) + 1
+        row.updated_by = user_id
+        db.session.flush()
+        snapshot = SettingsSnapshot.from_row(row)
+        AuditService.log_event(
+            entity_type="global_settings",
+            action="UPDATE",
+            actor_user_id=user_id,
+            entity_id=row.id,
+            old_value=old_values,
+            new_value=snapshot.to_dict(),
+        )
+        db.session.commit()
+        SettingsService._remember(snapshot)
+        return snapshot
+
+    @staticmethod
+    def invalidate() -> None:
+        _settings_cache.clear()
+
+    @staticmethod
+    def _remember(snapshot: SettingsSnapshot) -> None:
+        _settings_cache.set(_CACHE_KEY, snapshot, ttl=current_app.config.get("SETTINGS_CACHE_TTL_SECONDS", 30))
+
+    @staticmethod
+    def _insert_defaults() -> GlobalSettings:
+        defaults = SettingsService._defaults()
+        row = GlobalSettings(
+            delivery_min=defaults.delivery_min,
+            delivery_fee=defaults.delivery_fee,
+            free_threshold=defaults.free_threshold,
+            version=0,
+        )
+        db.session.add(row)
+        db.session.flush()
+        return row
+
+    @staticmethod
+    def _defaults() -> SettingsSnapshot:
+        config = current_app.config
+        return SettingsSnapshot(
+            id=None,
+            version=0,
+            delivery_min=Decimal(str(config.get("DELIVERY_MIN_TOTAL", 150))),
+            delivery_fee=Decimal(str(config.get("DELIVERY_FEE_UNDER_MIN", 30))),
+            free_threshold=Decimal("200"),
+            updated_at=None,
+            updated_by=None,
+        )
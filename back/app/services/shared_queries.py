@@ -1,12 +1,15 @@
 """Shared database queries and operations that can be reused across services."""
 
 from __future__ import annotations
-from sqlalchemy import select, func
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import DateTime, Float, Numeric, literal, select, func, tuple_
 from sqlalchemy.exc import IntegrityError
 from app.extensions import db
 from app.middleware.error_handler import DomainError
 from app.models import User, Address
 from app.schemas.profile import UserProfileResponse
+from app.utils.cursor import decode_cursor, encode_cursor
 
 class SharedQueries:
     """Common database queries used across multiple services."""
@@ -95,6 +98,51 @@ class SharedOperations:
         
         return rows, total or 0
 
+    @staticmethod
+    def keyset_paginate(
+        base_query,
+        sort_keys: list,
+        limit: int = 50,
+        cursor: str | None = None,
+        descending: bool = False,
+        transform_fn=None,
+    ) -> tuple[list, str | None]:
+        """Seek past ``cursor`` instead of skipping rows with OFFSET.
+
+        ``sort_keys`` are ordered in one direction and must end with a unique
+        column (usually the primary key). Returns the page and the cursor for the
+        next page, or ``None`` on the last page.
+        """
+        if cursor:
+            bound = SharedOperations._cursor_bound(cursor, sort_keys)
+            keys = tuple_(*sort_keys)
+            base_query = base_query.where(keys < bound if descending else keys > bound)
+        ordering = [key.desc() if descending else key.asc() for key in sort_keys]
+        stmt = base_query.order_by(None).order_by(*ordering).add_columns(*sort_keys).limit(limit + 1)
+        rows = db.session.execute(stmt).all()
+        next_cursor = encode_cursor(list(rows[limit - 1][1:])) if len(rows) > limit else None
+        items = [row[0] for row in rows[:limit]]
+        if transform_fn:
+            items = [transform_fn(item) for item in items]
+        return items, next_cursor
+
+    @staticmethod
+    def _cursor_bound(cursor: str, sort_keys: list):
+        values = decode_cursor(cursor, len(sort_keys))
+        if values is None:
+            raise DomainError("INVALID_CURSOR", "Pagination cursor is invalid", status_code=400)
+        try:
+            bound = []
+            for key, value in zip(sort_keys, values):
+                if isinstance(key.type, Numeric) and not isinstance(key.type, Float):
+                    value = Decimal(str(value))
+                elif isinstance(key.type, DateTime):
+                    value = datetime.fromisoformat(value)
+                bound.append(literal(value, key.type))
+        except (ArithmeticError, TypeError, ValueError) as exc:
+            raise DomainError("INVALID_CURSOR", "Pagination cursor is invalid", status_code=400) from exc
+        return tuple_(*bound)
+
     @staticmethod
     def build_filtered_query(base_query, conditions: dict):
         for check_fn, where_clause in conditions.values():
@@ -3,26 +3,35 @@ from __future__ import annotations
 from ...extensions import db
 from ...middleware.error_handler import DomainError
 from ...models import Product, WishlistItem
+from ..catalog import CatalogQueryService
 
 
 class WishlistService:
     """Manage a user's wishlist entries."""
 
     @staticmethod
-    def list_items(user_id: int) -> list[dict]:
+    def list_items(user_id: int, embed_products: bool = False, branch_id: int | None = None) -> list[dict]:
         items = (
             db.session.query(WishlistItem)
             .filter_by(user_id=user_id)
             .order_by(WishlistItem.created_at.desc())
             .all()
         )
-        return [
+        rows = [
             {
                 "product_id": item.product_id,
                 "created_at": item.created_at.isoformat(),
             }
             for item in items
         ]
+        if embed_products and rows:
+            products = {
+                product.id: product
+                for product in CatalogQueryService.lookup_products([row["product_id"] for row in rows], branch_id)
+            }
+            for row in rows:
+                row["product"] = products.get(row["product_id"])
+        return rows
 
     @staticmethod
     def add_item(user_id: int, product_id: int) -> dict:
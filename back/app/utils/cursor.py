@@ -0,0 +1,34 @@
+"""Opaque keyset-pagination cursors."""
+
+from __future__ import annotations
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """Pack the sort-key values of the last row into a URL-safe token."""
+    payload = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> list[Any] | None:
+    """Unpack a cursor into ``size`` raw values; ``None`` if it is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
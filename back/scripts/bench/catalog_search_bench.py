@@ -0,0 +1,104 @@
+# bench/catalog_search_bench.py
+"""Compare the legacy ILIKE scan with the indexed product search.
+
+Usage:
+    python -m scripts.bench.catalog_search_bench --products 100000
+    DATABASE_URL=postgresql+psycopg://... python -m scripts.bench.catalog_search_bench
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from app import create_app
+from app.config import AppConfig
+from app.extensions import db
+from app.models import Base, Branch, Category, Product
+from app.services.catalog import ProductSearchIndex
+
+WORDS = [
+    "apple", "banana", "tomato", "cherry", "cucumber", "milk", "yogurt", "cheese", "bread",
+    "pita", "hummus", "tahini", "olive", "pepper", "onion", "garlic", "lemon", "orange",
+    "salmon", "tuna", "chicken", "rice", "pasta", "flour", "sugar", "coffee", "tea", "honey",
+]
+QUERIES = ["tomato", "chee", "olive oil", "hummus pita", "zzz"]
+
+
+def _prepare(db_url: str, products: int) -> None:
+    engine = create_engine(db_url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        if session.scalar(select(func.count()).select_from(Product)) >= products:
+            return
+        if not session.get(Branch, 1):
+            session.add(Branch(id=1, name="Bench Warehouse", address="Bench 1"))
+        category = Category(name=f"Bench {random.randint(0, 10**9)}")
+        session.add(category)
+        session.flush()
+        rnd = random.Random(7)
+        rows = [
+            {
+                "name": " ".join(rnd.sample(WORDS, 3)).title(),
+                "sku": f"BENCH-{category.id}-{i}",
+                "price": rnd.randint(100, 9000) / 100,
+                "category_id": category.id,
+            }
+            for i in range(products)
+        ]
+        for start in range(0, len(rows), 5000):
+            session.execute(insert(Product), rows[start:start + 5000])
+        session.commit()
+
+
+def _time(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _page_and_count(stmt) -> None:
+    db.session.execute(stmt.limit(20)).scalars().all()
+    db.session.scalar(select(func.count()).select_from(stmt.subquery()))
+
+
+def _legacy_search(query: str) -> None:
+    base = select(Product).where(Product.is_active.is_(True))
+    _page_and_count(base.where(Product.name.ilike(f"%{query}%")).order_by(Product.id.desc()))
+
+
+def _indexed_search(query: str) -> None:
+    base = select(Product).where(Product.is_active.is_(True))
+    stmt, rank = ProductSearchIndex.apply(base, query)
+    _page_and_count(stmt.order_by(rank.desc(), Product.id.desc()) if rank is not None else stmt)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=15)
+    args = parser.parse_args()
+
+    db_url = os.getenv("DATABASE_URL") or f"sqlite:///{tempfile.gettempdir()}/catalog_search_bench.db"
+    _prepare(db_url, args.products)
+    app = create_app(AppConfig(DATABASE_URL=db_url, JWT_SECRET_KEY="bench", APP_ENV="development",
+                               DELIVERY_SOURCE_BRANCH_ID="1"))
+    with app.app_context():
+        print(f"{'query':<14}{'ilike ms':>10}{'indexed ms':>12}{'speedup':>9}")
+        for query in QUERIES:
+            legacy = _time(lambda: _legacy_search(query), args.repeats)
+            indexed = _time(lambda: _indexed_search(query), args.repeats)
+            print(f"{query:<14}{legacy:>10.2f}{indexed:>12.2f}{legacy / indexed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
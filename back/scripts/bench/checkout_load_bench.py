@@ -0,0 +1,251 @@
+# bench/checkout_load_bench.py
+"""Drive concurrent checkout confirmations and report capacity and contention.
+
+Seeds a fresh set of users, carts and a few deliberately scarce "hot" SKUs,
+then fires ``POST /api/v1/checkout/confirm`` through the Flask test client from
+a thread or process pool. A share of the requests is sent twice with the same
+Idempotency-Key to exercise replays and in-progress conflicts. Results are
+printed and written as JSON:
+
+    latency_ms       p50 / p95 / p99 / max of every request
+    throughput_rps   completed requests per wall-clock second
+    statuses, codes  responses by HTTP status and by error code
+    deadlocks        lock timeouts, deadlocks and retries seen by CheckoutLocking
+    idempotency      replays (200) and IDEMPOTENCY_* conflicts (409)
+    oversell         units sold beyond the seeded stock (must be 0)
+
+Usage:
+    python -m scripts.bench.checkout_load_bench --users 200 --workers 16
+    DATABASE_URL=postgresql+psycopg://... python -m scripts.bench.checkout_load_bench --mode process
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import secrets
+import statistics
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app import create_app
+from app.config import AppConfig
+from app.models import Base, Branch, Cart, CartItem, Category, Inventory, OrderItem, PaymentToken, Product, User
+from app.models.enums import Role
+from app.services.checkout import checkout_lock_stats
+
+BRANCH_ID = 1
+
+
+@dataclass(frozen=True)
+class LoadConfig:
+    db_url: str
+    users: int = 100
+    hot_skus: int = 3
+    hot_stock: int = 40
+    cold_skus: int = 30
+    lines_per_cart: int = 4
+    workers: int = 8
+    mode: str = "thread"
+    duplicate_rate: float = 0.1
+    seed: int = 7
+
+
+@dataclass(frozen=True)
+class Job:
+    user_id: int
+    role: str
+    cart_id: int
+    payment_token_id: int
+    key: str
+
+
+def _app(db_url: str):
+    return create_app(
+        AppConfig(
+            DATABASE_URL=db_url,
+            JWT_SECRET_KEY="checkout-load-bench",
+            APP_ENV="development",
+            DELIVERY_SOURCE_BRANCH_ID=str(BRANCH_ID),
+            RATE_LIMIT_DEFAULTS="1000000 per minute",
+        )
+    )
+
+
+def seed(config: LoadConfig) -> tuple[list[Job], dict[int, int]]:
+    """Create users with carts; returns the jobs and the seeded stock of each hot SKU."""
+    rnd = random.Random(config.seed)
+    tag = secrets.token_hex(4)
+    engine = create_engine(config.db_url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        if not session.get(Branch, BRANCH_ID):
+            session.add(Branch(id=BRANCH_ID, name="Load Warehouse", address="Bench 1"))
+        category = Category(name=f"Load {tag}")
+        session.add(category)
+        session.flush()
+        hot = [Product(name=f"Hot {tag} {i}", sku=f"HOT-{tag}-{i}", price="9.90", category_id=category.id)
+               for i in range(config.hot_skus)]
+        cold = [Product(name=f"Cold {tag} {i}", sku=f"CLD-{tag}-{i}", price="2.50", category_id=category.id)
+                for i in range(config.cold_skus)]
+        session.add_all(hot + cold)
+        session.flush()
+        session.add_all(Inventory(product_id=p.id, branch_id=BRANCH_ID, available_quantity=config.hot_stock)
+                        for p in hot)
+        session.add_all(Inventory(product_id=p.id, branch_id=BRANCH_ID, available_quantity=10 * config.users)
+                        for p in cold)
+
+        users = [User(email=f"load-{tag}-{i}@example.com", full_name="Load", password_hash="x", role=Role.CUSTOMER)
+                 for i in range(config.users)]
+        session.add_all(users)
+        session.flush()
+        carts = [Cart(user_id=user.id) for user in users]
+        tokens = [PaymentToken(user_id=user.id, provider="mockpay", provider_token=f"tok-{tag}-{user.id}")
+                  for user in users]
+        session.add_all(carts + tokens)
+        session.flush()
+        for cart in carts:
+            picks = [rnd.choice(hot)] + rnd.sample(cold, min(config.lines_per_cart - 1, len(cold)))
+            session.add_all(CartItem(cart_id=cart.id, product_id=p.id, quantity=rnd.randint(1, 2),
+                                     unit_price=Decimal(str(p.price))) for p in picks)
+        session.commit()
+        jobs = [Job(user.id, user.role.value, cart.id, token.id, f"load-{tag}-{cart.id}")
+                for user, cart, token in zip(users, carts, tokens)]
+        stock = {p.id: config.hot_stock for p in hot}
+    engine.dispose()
+    duplicates = [job for job in jobs if rnd.random() < config.duplicate_rate]
+    jobs = jobs + duplicates
+    rnd.shuffle(jobs)
+    return jobs, stock
+
+
+def _confirm(client, app, job: Job) -> tuple[float, int, str | None]:
+    with app.app_context():
+        token = create_access_token(identity=str(job.user_id), additional_claims={"role": job.role})
+    body = {"cart_id": job.cart_id, "fulfillment_type": "PICKUP", "branch_id": BRANCH_ID,
+            "payment_token_id": job.payment_token_id, "save_as_default": False}
+    started = time.perf_counter()
+    response = client.post(
+        "/api/v1/checkout/confirm",
+        json=body,
+        headers={"Authorization": f"Bearer {token}", "Idempotency-Key": job.key},
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    code = None
+    if response.status_code >= 400:
+        code = (response.get_json(silent=True) or {}).get("error", {}).get("code")
+    return elapsed, response.status_code, code
+
+
+def _drive(db_url: str, jobs: list[Job], threads: int) -> tuple[list[tuple[float, int, str | None]], dict]:
+    app = _app(db_url)
+    checkout_lock_stats.reset()
+    client = app.test_client()
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(lambda job: _confirm(client, app, job), jobs))
+    return results, checkout_lock_stats.stats()
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _oversell(db_url: str, stock: dict[int, int]) -> dict[str, int]:
+    engine = create_engine(db_url)
+    with Session(engine) as session:
+        sold = dict(session.execute(
+            select(OrderItem.product_id, func.sum(OrderItem.quantity))
+            .where(OrderItem.product_id.in_(stock)).group_by(OrderItem.product_id)
+        ).all())
+        negative = session.scalar(
+            select(func.count()).select_from(Inventory).where(Inventory.available_quantity < 0)
+        )
+    engine.dispose()
+    return {
+        "units": sum(max(0, int(sold.get(pid) or 0) - seeded) for pid, seeded in stock.items()),
+        "hot_units_sold": sum(int(units or 0) for units in sold.values()),
+        "negative_inventory_rows": int(negative or 0),
+    }
+
+
+def run(config: LoadConfig) -> dict:
+    jobs, stock = seed(config)
+    started = time.perf_counter()
+    if config.mode == "process":
+        shards = [jobs[i::config.workers] for i in range(config.workers)]
+        with ProcessPoolExecutor(config.workers) as pool:
+            parts = list(pool.map(_drive, [config.db_url] * config.workers, shards, [1] * config.workers))
+    else:
+        parts = [_drive(config.db_url, jobs, config.workers)]
+    wall = time.perf_counter() - started
+
+    results = [result for part, _ in parts for result in part]
+    locks: Counter = Counter()
+    for _, lock_stats in parts:
+        locks.update(lock_stats)
+    latencies = [elapsed for elapsed, _, _ in results]
+    codes = Counter(code for _, _, code in results if code)
+    statuses = Counter(status for _, status, _ in results)
+    return {
+        "config": {key: value for key, value in asdict(config).items() if key != "db_url"},
+        "dialect": config.db_url.split(":", 1)[0],
+        "requests": len(results),
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(results) / wall, 1) if wall else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 2),
+            "p95": round(_percentile(latencies, 95), 2),
+            "p99": round(_percentile(latencies, 99), 2),
+            "max": round(max(latencies, default=0.0), 2),
+            "mean": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        },
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "codes": dict(codes.most_common()),
+        "deadlocks": {name: locks[name] for name in ("deadlocks", "timeouts", "retries", "exhausted")},
+        "idempotency": {
+            "replays": statuses.get(200, 0),
+            "conflicts": sum(count for code, count in codes.items() if code.startswith("IDEMPOTENCY_")),
+        },
+        "oversell": _oversell(config.db_url, stock),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--hot-skus", type=int, default=3)
+    parser.add_argument("--hot-stock", type=int, default=40, help="units of each hot SKU (keep below demand)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--duplicate-rate", type=float, default=0.1)
+    parser.add_argument("--output", default="checkout_load_results.json")
+    args = parser.parse_args()
+
+    db_url = os.getenv("DATABASE_URL") or f"sqlite:///{tempfile.gettempdir()}/checkout_load_bench.db"
+    config = LoadConfig(db_url=db_url, users=args.users, hot_skus=args.hot_skus, hot_stock=args.hot_stock,
+                        workers=args.workers, mode=args.mode, duplicate_rate=args.duplicate_rate)
+    report = run(config)
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    latency = report["latency_ms"]
+    print(f"{report['requests']} requests in {report['wall_seconds']}s ({report['throughput_rps']} req/s)")
+    print(f"latency ms  p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}")
+    print(f"statuses {report['statuses']}  codes {report['codes']}")
+    print(f"deadlocks {report['deadlocks']}  idempotency {report['idempotency']}  oversell {report['oversell']}")
+    print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# bench/fuzzy_search_bench.py
+"""Latency and recall of typo-tolerant product search.
+
+Usage:
+    python -m scripts.bench.fuzzy_search_bench --products 200000
+    DATABASE_URL=postgresql+psycopg://... python -m scripts.bench.fuzzy_search_bench
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import select
+
+from app import create_app
+from app.config import AppConfig
+from app.extensions import db
+from app.models import Product
+from app.services.catalog import CatalogQueryService, vocabulary_index
+from scripts.bench.catalog_search_bench import _prepare, _time
+
+# (typed query, word the shopper meant)
+TYPOS = [
+    ("tomatoe", "tomato"),
+    ("chese", "cheese"),
+    ("hummos", "hummus"),
+    ("olivee pepper", "olive"),
+    ("cofee", "coffee"),
+    ("bananna", "banana"),
+]
+
+
+def _search(query: str, fuzzy: bool) -> list:
+    items, _ = CatalogQueryService.search_products(query, None, None, None, 20, 0, fuzzy=fuzzy)
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=200_000)
+    parser.add_argument("--repeats", type=int, default=15)
+    args = parser.parse_args()
+
+    db_url = os.getenv("DATABASE_URL") or f"sqlite:///{tempfile.gettempdir()}/fuzzy_search_bench.db"
+    _prepare(db_url, args.products)
+    app = create_app(AppConfig(DATABASE_URL=db_url, JWT_SECRET_KEY="bench", APP_ENV="development",
+                               DELIVERY_SOURCE_BRANCH_ID="1"))
+    with app.app_context():
+        count = len(db.session.execute(select(Product.id)).all())
+        started = time.perf_counter()
+        vocabulary_index.rebuild()
+        print(f"{count} products, vocabulary built in {(time.perf_counter() - started) * 1000:.0f} ms")
+        print(f"{'query':<12}{'exact ms':>10}{'fuzzy ms':>10}{'exact hits':>12}{'fuzzy hits':>12}{'precision':>11}")
+        for query, meant in TYPOS:
+            exact_ms = _time(lambda: _search(query, False), args.repeats)
+            fuzzy_ms = _time(lambda: _search(query, True), args.repeats)
+            exact, fuzzy = _search(query, False), _search(query, True)
+            relevant = sum(meant in item.name.lower() for item in fuzzy)
+            precision = relevant / len(fuzzy) if fuzzy else 0.0
+            print(f"{query:<12}{exact_ms:>10.2f}{fuzzy_ms:>10.2f}{len(exact):>12}{len(fuzzy):>12}{precision:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
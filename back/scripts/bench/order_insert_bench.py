@@ -0,0 +1,122 @@
+# bench/order_insert_bench.py
+"""Compare per-line ORM order creation with the bulk order-item insert.
+
+Each run builds the order for a cart of 1, 20 and 150 lines inside a
+transaction that is rolled back, so the database does not grow between runs.
+
+Usage:
+    python -m scripts.bench.order_insert_bench
+    DATABASE_URL=postgresql+psycopg://... python -m scripts.bench.order_insert_bench --repeats 50
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+from decimal import Decimal
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, selectinload
+
+from app import create_app
+from app.config import AppConfig
+from app.extensions import db
+from app.models import Base, Branch, Cart, CartItem, Category, Order, OrderItem, OrderPickupDetails, Product, User
+from app.models.enums import FulfillmentType, OrderStatus, Role
+from app.schemas.checkout import CheckoutConfirmRequest
+from app.services.checkout import CheckoutOrderBuilder
+from scripts.bench.catalog_search_bench import _time
+
+SIZES = [1, 20, 150]
+
+
+def _prepare(db_url: str) -> dict[int, tuple[int, int]]:
+    """Create one cart per size; returns ``{size: (user_id, cart_id)}``."""
+    engine = create_engine(db_url)
+    Base.metadata.create_all(engine)
+    carts = {}
+    with Session(engine) as session:
+        if not session.get(Branch, 1):
+            session.add(Branch(id=1, name="Bench Warehouse", address="Bench 1"))
+        category = Category(name=f"Order bench {os.getpid()}")
+        session.add(category)
+        session.flush()
+        products = [
+            Product(name=f"Order bench {i}", sku=f"OB-{category.id}-{i}", price="3.50", category_id=category.id)
+            for i in range(max(SIZES))
+        ]
+        session.add_all(products)
+        for size in SIZES:
+            user = User(email=f"order-bench-{category.id}-{size}@example.com", full_name="Bench",
+                        password_hash="x", role=Role.CUSTOMER)
+            session.add(user)
+            session.flush()
+            cart = Cart(user_id=user.id)
+            session.add(cart)
+            session.flush()
+            session.add_all(
+                CartItem(cart_id=cart.id, product_id=p.id, quantity=1, unit_price=Decimal("3.50"))
+                for p in products[:size]
+            )
+            carts[size] = (user.id, cart.id)
+        session.commit()
+    return carts
+
+
+def _load_cart(cart_id: int) -> Cart:
+    return db.session.execute(
+        select(Cart).where(Cart.id == cart_id).options(selectinload(Cart.items))
+    ).scalar_one()
+
+
+def _legacy_create(user_id: int, cart_id: int) -> None:
+    """The previous path: one ORM item per line, lazy product loads, two flushes."""
+    cart = _load_cart(cart_id)
+    order = Order(order_number=CheckoutOrderBuilder.order_number(), user_id=user_id, total_amount=0,
+                  fulfillment_type=FulfillmentType.PICKUP, status=OrderStatus.CREATED, branch_id=1)
+    db.session.add(order)
+    for item in cart.items:
+        db.session.add(OrderItem(order=order, product_id=item.product_id, name=item.product.name,
+                                 sku=item.product.sku, unit_price=item.unit_price, quantity=item.quantity))
+    db.session.flush()
+    db.session.add(OrderPickupDetails(order=order, branch_id=1, pickup_window_start=func.now(),
+                                      pickup_window_end=func.now()))
+    db.session.flush()
+    _discard()
+
+
+def _bulk_create(user_id: int, cart_id: int, payload: CheckoutConfirmRequest) -> None:
+    cart = _load_cart(cart_id)
+    lines = CheckoutOrderBuilder.lines_from_cart(cart)
+    CheckoutOrderBuilder.create_order(user_id, lines, payload, 1, Decimal("0"))
+    db.session.flush()
+    _discard()
+
+
+def _discard() -> None:
+    # Rolled-back rows keep their ids available; drop their objects so the next run starts clean.
+    db.session.rollback()
+    db.session.expunge_all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+
+    db_url = os.getenv("DATABASE_URL") or f"sqlite:///{tempfile.gettempdir()}/order_insert_bench.db"
+    carts = _prepare(db_url)
+    app = create_app(AppConfig(DATABASE_URL=db_url, JWT_SECRET_KEY="bench", APP_ENV="development",
+                               DELIVERY_SOURCE_BRANCH_ID="1"))
+    with app.app_context():
+        print(f"{'lines':>6}{'per-line ms':>13}{'bulk ms':>10}{'speedup':>9}")
+        for size, (user_id, cart_id) in carts.items():
+            payload = CheckoutConfirmRequest(cart_id=cart_id, fulfillment_type=FulfillmentType.PICKUP,
+                                             branch_id=1, payment_token_id=1, save_as_default=False)
+            legacy = _time(lambda: _legacy_create(user_id, cart_id), args.repeats)
+            bulk = _time(lambda: _bulk_create(user_id, cart_id, payload), args.repeats)
+            print(f"{size:>6}{legacy:>13.2f}{bulk:>10.2f}{legacy / bulk:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
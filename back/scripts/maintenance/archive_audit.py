@@ -0,0 +1,62 @@
+# maintenance/archive_audit.py
+"""Archive audit months older than the retention window, then drop them.
+
+Each expired month is written to ``audit-YYYY-MM.ndjson.gz`` under
+``AUDIT_ARCHIVE_DIR`` before its rows leave the database; a month archived again
+goes to ``audit-YYYY-MM.partN.ndjson.gz`` rather than replacing that file. On Postgres this also
+creates the partitions for the coming months, so run it at least monthly (daily
+from cron is fine: months already archived are skipped). ``AUDIT_ARCHIVE_DIR`` (or
+``--dir``) must point at durable storage; without it, or with a temporary
+directory, the partitions are still created but nothing is archived or dropped
+and the script exits with an error. ``--partitions-only`` just creates the
+partitions (moving any rows already in ``audit_default`` into them); the Render
+cron runs it that way because cron jobs there have no durable disk.
+
+Usage:
+    python -m scripts.maintenance.archive_audit
+    python -m scripts.maintenance.archive_audit --keep-months 3 --dir /var/backups/audit
+    python -m scripts.maintenance.archive_audit --dry-run
+    python -m scripts.maintenance.archive_audit --partitions-only
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+from app import create_app
+from app.services.audit_retention import AuditRetentionService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keep-months", type=int, default=None, help="defaults to AUDIT_RETENTION_MONTHS")
+    parser.add_argument("--dir", default=None, help="defaults to AUDIT_ARCHIVE_DIR")
+    parser.add_argument("--months-ahead", type=int, default=3, help="future monthly partitions to keep ready")
+    parser.add_argument("--dry-run", action="store_true", help="list the months that would be archived")
+    parser.add_argument("--partitions-only", action="store_true", help="create partitions without archiving")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        keep = args.keep_months if args.keep_months is not None else app.config["AUDIT_RETENTION_MONTHS"]
+        if args.dry_run:
+            months = AuditRetentionService.expired_months(keep)
+            print("Would archive: " + (", ".join(f"{month:%Y-%m}" for month in months) or "nothing"))
+            return
+        created = AuditRetentionService.ensure_partitions(args.months_ahead)
+        for name, moved in created.items():
+            print(f"Created partition {name}" + (f" ({moved} rows moved from audit_default)" if moved else ""))
+        if args.partitions_only:
+            return
+        try:
+            directory = AuditRetentionService.archive_directory(args.dir or app.config["AUDIT_ARCHIVE_DIR"])
+        except RuntimeError as exc:
+            sys.exit(str(exc))
+        for month in AuditRetentionService.expired_months(keep):
+            archived = AuditRetentionService.archive_month(month, directory)
+            action = "dropped partition" if archived.dropped_partition else "deleted rows"
+            print(f"{archived.month:%Y-%m}: {archived.rows} rows -> {archived.path or '(nothing to export)'}, {action}")
+
+
+if __name__ == "__main__":
+    main()
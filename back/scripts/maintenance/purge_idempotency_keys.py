@@ -0,0 +1,48 @@
+# maintenance/purge_idempotency_keys.py
+"""Delete expired idempotency keys in small batches.
+
+Keys are only needed for 24 hours, so run this from cron (hourly is plenty).
+Each batch is its own short transaction; ``--pause`` spaces batches out so a
+large backlog does not compete with checkout traffic.
+
+Usage:
+    python -m scripts.maintenance.purge_idempotency_keys
+    python -m scripts.maintenance.purge_idempotency_keys --batch 1000 --pause 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from app import create_app
+from app.extensions import db
+from app.services.checkout import CheckoutIdempotencyManager
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=500, help="keys deleted per transaction")
+    parser.add_argument("--pause", type=float, default=0.1, help="seconds to sleep between batches")
+    args = parser.parse_args()
+
+    app = create_app()
+    purged = batches = 0
+    working = 0.0
+    with app.app_context():
+        while True:
+            started = time.perf_counter()
+            deleted = CheckoutIdempotencyManager.purge_expired(limit=args.batch)
+            db.session.commit()
+            working += time.perf_counter() - started
+            purged += deleted
+            batches += 1
+            if deleted < args.batch:
+                break
+            time.sleep(args.pause)
+        backlog = CheckoutIdempotencyManager.purge_backlog()
+    rate = purged / working if working else 0.0
+    print(f"Purged {purged} expired idempotency keys in {batches} batches ({rate:.0f} keys/s); "
+          f"{backlog['expired_keys']} expired keys left")
+
+if __name__ == "__main__":
+    main()
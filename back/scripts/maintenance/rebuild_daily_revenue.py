@@ -0,0 +1,42 @@
+# maintenance/rebuild_daily_revenue.py
+"""Backfill or rebuild the ``daily_revenue`` rollup from ``orders``.
+
+Migration 0014 backfills the rollup once. The ops status endpoint keeps it
+current for orders it delivers, but no in-app transition reaches DELIVERED yet,
+so run this nightly (render.yaml schedules ``--months 2``) and after seeding or
+changing orders by hand. Each month is replaced in its own transaction.
+
+Usage:
+    python -m scripts.maintenance.rebuild_daily_revenue
+    python -m scripts.maintenance.rebuild_daily_revenue --since 2025-01-01
+    python -m scripts.maintenance.rebuild_daily_revenue --months 2
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date, datetime
+
+from app import create_app
+from app.models.audit import month_start
+from app.services.revenue_rollup_service import RevenueRollupService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", type=date.fromisoformat, default=None,
+                        help="first day to rebuild (YYYY-MM-DD); defaults to the first delivered order")
+    parser.add_argument("--months", type=int, default=None,
+                        help="rebuild only the current month and the N-1 before it")
+    args = parser.parse_args()
+    since = args.since
+    if args.months is not None:
+        since = month_start(datetime.utcnow(), -(max(args.months, 1) - 1))
+
+    app = create_app()
+    with app.app_context():
+        written = RevenueRollupService.rebuild(since)
+    print(f"Rebuilt daily_revenue: {written} rows")
+
+
+if __name__ == "__main__":
+    main()
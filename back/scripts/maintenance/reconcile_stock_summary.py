@@ -0,0 +1,31 @@
+# maintenance/reconcile_stock_summary.py
+"""Repair drift between product_stock_summary and inventory.
+
+Usage:
+    python -m scripts.maintenance.reconcile_stock_summary            # fix drifted rows
+    python -m scripts.maintenance.reconcile_stock_summary --dry-run  # report only
+"""
+from __future__ import annotations
+
+import argparse
+
+from app import create_app
+from app.services.catalog import StockSummaryService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="list drifted products without writing")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        drifted = StockSummaryService.reconcile(dry_run=args.dry_run)
+    verb = "Found" if args.dry_run else "Repaired"
+    print(f"{verb} {len(drifted)} drifted product summaries")
+    if drifted:
+        print("product ids:", ", ".join(str(pid) for pid in drifted[:50]), "..." if len(drifted) > 50 else "")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# maintenance/release_expired_reservations.py
+"""Release stock held by checkouts that never finished paying and by abandoned carts.
+
+Run it from cron every minute or so; checkout and cart writes also sweep on
+demand when a reservation comes up short.
+
+Usage:
+    python -m scripts.maintenance.release_expired_reservations
+    python -m scripts.maintenance.release_expired_reservations --batch 500
+"""
+from __future__ import annotations
+
+import argparse
+
+from app import create_app
+from app.extensions import db
+from app.services.cart.reservations import CartReservations
+from app.services.checkout import CheckoutReservations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=100, help="checkouts (or cart lines) released per transaction")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        released = _drain(CheckoutReservations.sweep, args.batch)
+        cart_released = _drain(CartReservations.sweep, args.batch)
+    print(f"Released {released} expired checkout reservation lines and {cart_released} cart holds")
+
+
+def _drain(sweep, batch: int) -> int:
+    released = 0
+    while True:
+        lines = sweep(limit=batch)
+        db.session.commit()
+        if not lines:
+            return released
+        released += lines
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
 """Tests for admin audit endpoints."""
 
+import csv
+import io
+import json
+from datetime import datetime
+
 import pytest
 from app.models import User, Audit
 from app.models.enums import Role
+from app.services.audit_service import AuditQueryService
 
 
 @pytest.fixture
@@ -120,3 +126,35 @@ class TestAuditEndpoints:
                 headers=auth_header(customer),
             )
             assert response.status_code == 403
+
+    def test_export_streams_filtered_rows(self, test_app, admin_user, auth_header, session):
+        """Should stream every matching row as CSV or NDJSON with the actor email."""
+        # Same timestamp on every row, as AuditService writes them, so the keyset breaks ties on id.
+        now = datetime.utcnow()
+        session.add_all(
+            [Audit(entity_type="Export", entity_id=i, action="UPDATE", actor_user_id=admin_user.id,
+                   new_value={"step": i}, created_at=now) for i in range(3)]
+            + [Audit(entity_type="Other", entity_id=9, action="UPDATE")]
+        )
+        session.commit()
+
+        with test_app.test_client() as client:
+            response = client.get("/api/v1/admin/audit/export?entityType=Export", headers=auth_header(admin_user))
+            assert response.status_code == 200
+            assert response.mimetype == "text/csv"
+            rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+            assert [int(row["entity_id"]) for row in rows] == [0, 1, 2]
+            assert {row["actor_email"] for row in rows} == {"admin@example.com"}
+            assert json.loads(rows[0]["new_value"]) == {"step": 0}
+
+            response = client.get(
+                "/api/v1/admin/audit/export?entityType=Export&format=ndjson", headers=auth_header(admin_user)
+            )
+            lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+            assert [line["entity_id"] for line in lines] == [0, 1, 2]
+
+            response = client.get("/api/v1/admin/audit/export?format=xml", headers=auth_header(admin_user))
+            assert response.status_code == 400
+
+        pages = list(AuditQueryService.iter_rows([Audit.entity_type == "Export"], batch_size=2))
+        assert [row["entity_id"] for row in pages] == [0, 1, 2]
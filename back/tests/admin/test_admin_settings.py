@@ -1,4 +1,15 @@
-from app.models.enums import Role
+from decimal import Decimal
+
+from sqlalchemy import event, update
+
+from app.extensions import db
+from app.models import Cart, CartItem, GlobalSettings
+from app.models.enums import FulfillmentType, Role
+from app.schemas.checkout import CheckoutPreviewRequest
+from app.services.checkout import CheckoutPricing
+from app.services.checkout.preview import PreviewLine
+from app.services.checkout_service import CheckoutService
+from app.services.settings_service import SettingsService
 
 def test_admin_settings_get(test_app, auth_header, create_user_with_role):
     """GET /api/v1/admin/settings returns settings envelope for admin only (אמיתי)."""
@@ -22,3 +33,66 @@ def test_admin_settings_get(test_app, auth_header, create_user_with_role):
             headers=auth_header(employee),
         )
         assert response.status_code == 403
+
+
+def test_admin_settings_update_reprices_checkout_without_queries(session, test_app, auth_header, create_user_with_role):
+    """PUT /api/v1/admin/settings takes effect immediately; warm pricing reads no rows."""
+    admin = create_user_with_role(role=Role.ADMIN)
+    lines = [PreviewLine(product_id=1, quantity=2, unit_price=Decimal("20.00"))]
+    with test_app.test_client() as client:
+        response = client.put(
+            "/api/v1/admin/settings",
+            json={"delivery_min": 100, "delivery_fee": 12.5},
+            headers=auth_header(admin),
+        )
+        assert response.status_code == 200
+        first_version = response.get_json()["data"]["version"]
+        assert CheckoutPricing.for_lines(lines, FulfillmentType.DELIVERY).delivery_fee == Decimal("12.5")
+
+        client.put("/api/v1/admin/settings", json={"delivery_min": 40}, headers=auth_header(admin))
+
+    statements = []
+    engine = db.session.get_bind()
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        totals = CheckoutPricing.for_lines(lines, FulfillmentType.DELIVERY)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert totals.delivery_fee == Decimal("0")
+    assert SettingsService.current().version == first_version + 1
+    assert statements == []
+
+
+def test_checkout_preview_picks_up_settings_changed_by_another_worker(session, create_user_with_role):
+    customer = create_user_with_role(role=Role.CUSTOMER)
+    settings = SettingsService.update({"delivery_min": 100, "delivery_fee": 12.5}, customer.id)
+    cart = Cart(user_id=customer.id)
+    session.add(cart)
+    session.flush()
+    session.add(CartItem(cart_id=cart.id, product_id=1, quantity=1, unit_price=Decimal("20.00")))
+    session.commit()
+    request = CheckoutPreviewRequest(cart_id=cart.id, fulfillment_type=FulfillmentType.DELIVERY)
+    assert CheckoutService.preview(request).delivery_fee == Decimal("12.5")
+
+    # Another worker saves new settings; this worker's cached snapshot is still warm.
+    session.execute(
+        update(GlobalSettings)
+        .where(GlobalSettings.id == settings.id)
+        .values(delivery_fee=Decimal("7.00"), version=settings.version + 1)
+    )
+    session.commit()
+
+    assert CheckoutService.preview(request).delivery_fee == Decimal("7.00")
+
+
+def test_admin_settings_get_saves_the_default_row(session, test_app, auth_header, create_user_with_role):
+    admin = create_user_with_role(role=Role.ADMIN)
+    SettingsService.current()  # warm the cache with the unsaved defaults
+
+    with test_app.test_client() as client:
+        data = client.get("/api/v1/admin/settings", headers=auth_header(admin)).get_json()["data"]
+
+    assert data["id"] is not None
+    assert session.get(GlobalSettings, data["id"]).delivery_min == Decimal(str(data["delivery_min"]))
+    assert SettingsService.current().id == data["id"]
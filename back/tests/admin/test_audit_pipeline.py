@@ -0,0 +1,86 @@
+"""Audit rows are buffered per transaction and written together."""
+
+import secrets
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import Audit, Base
+from app.services.audit_pipeline import AuditPipeline, AuditWriter
+from app.services.audit_service import AuditService
+
+
+@pytest.fixture
+def audit_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(engine, tables=[Audit.__table__])
+    yield engine
+    engine.dispose()
+
+
+def _capture(engine):
+    statements = []
+
+    def _listen(conn, cursor, statement, *_args):
+        statements.append(statement.lstrip().upper())
+
+    event.listen(engine, "before_cursor_execute", _listen)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", _listen)
+
+
+def test_log_event_defers_the_insert(session):
+    entity_type = f"pipeline-{secrets.token_hex(4)}"
+    statements, stop = _capture(db.session.get_bind())
+    try:
+        for index in range(3):
+            AuditService.log_event(entity_type=entity_type, action="UPDATE", entity_id=index + 1,
+                                   new_value={"step": index})
+        db.session.flush()
+        assert not any(s.startswith("INSERT INTO AUDIT") for s in statements)
+        AuditService.flush_pending()
+    finally:
+        stop()
+
+    assert sum(s.startswith("INSERT INTO AUDIT") for s in statements) == 1
+    assert db.session.scalar(
+        select(func.count()).select_from(Audit).where(Audit.entity_type == entity_type)
+    ) == 3
+
+
+def test_commit_writes_one_insert_and_rollback_discards(audit_engine):
+    rows = [{"entity_type": "pipeline", "action": "UPDATE", "entity_id": i} for i in range(3)]
+    statements, stop = _capture(audit_engine)
+    with Session(audit_engine) as session:
+        AuditPipeline.add(rows, session)
+        session.commit()
+        AuditPipeline.add(rows[:1], session)
+        session.rollback()
+        session.commit()
+        AuditPipeline.add(rows[:1], session)
+        session.begin_nested().rollback()
+        session.commit()
+        written = session.scalar(select(func.count()).select_from(Audit))
+    stop()
+
+    assert sum(s.startswith("INSERT INTO AUDIT") for s in statements) == 2
+    assert written == 4
+
+
+def test_writer_falls_back_to_sync_write_when_queue_is_full(audit_engine):
+    rows = [{"entity_type": "writer", "action": "UPDATE", "entity_id": i} for i in range(3)]
+    writer = AuditWriter(audit_engine, max_queue=1, batch_size=10)
+    writer.submit(rows[:1])
+    assert writer.flush()
+    writer.stop()
+
+    writer.submit(rows, timeout=0.01)
+    stats = writer.stats()
+    with audit_engine.connect() as connection:
+        written = connection.scalar(select(func.count()).select_from(Audit))
+
+    assert written == 3
+    assert stats["sync_fallbacks"] == 1
+    assert stats["written"] == 3
+    assert stats["queue_depth"] == 1
@@ -0,0 +1,78 @@
+"""Old audit months are exported to gzip NDJSON before they are removed."""
+
+import gzip
+import json
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from app.extensions import db
+from app.models import Audit, Base, User
+from app.models.audit import month_start
+from app.services.audit_retention import AuditRetentionService
+
+
+@pytest.fixture
+def audit_db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(engine, tables=[User.__table__, Audit.__table__])
+    session = scoped_session(sessionmaker(bind=engine))
+    monkeypatch.setattr(db, "session", session)
+    yield session
+    session.remove()
+    engine.dispose()
+
+
+def test_expired_month_is_exported_then_deleted(audit_db, tmp_path):
+    old = datetime.combine(month_start(datetime.utcnow(), -24), datetime.min.time()) + timedelta(days=3)
+    audit_db.add_all(
+        [Audit(entity_type="cart", action="UPDATE", entity_id=i, created_at=old) for i in range(3)]
+        + [Audit(entity_type="cart", action="UPDATE", entity_id=9, created_at=datetime.utcnow())]
+    )
+    audit_db.commit()
+
+    months = AuditRetentionService.expired_months(keep_months=6)
+    assert months == [month_start(old)]
+    archived = AuditRetentionService.archive_month(months[0], tmp_path / "archive", batch_size=2)
+
+    with gzip.open(archived.path, "rt", encoding="utf-8") as handle:
+        exported = [json.loads(line) for line in handle]
+    assert archived.rows == 3
+    assert archived.path.name == f"audit-{old:%Y-%m}.ndjson.gz"
+    assert [row["entity_id"] for row in exported] == [0, 1, 2]
+    assert not archived.dropped_partition
+    assert audit_db.scalar(select(func.count()).select_from(Audit)) == 1
+    assert AuditRetentionService.expired_months(keep_months=6) == []
+
+
+def test_rearchiving_a_month_never_overwrites_its_archive(audit_db, tmp_path):
+    old = datetime.combine(month_start(datetime.utcnow(), -24), datetime.min.time()) + timedelta(days=3)
+    directory = tmp_path / "archive"
+    audit_db.add(Audit(entity_type="cart", action="UPDATE", entity_id=1, created_at=old))
+    audit_db.commit()
+    first = AuditRetentionService.archive_month(month_start(old), directory)
+
+    # Rows left behind by an interrupted run are archived again next time.
+    audit_db.add(Audit(entity_type="cart", action="UPDATE", entity_id=2, created_at=old))
+    audit_db.commit()
+    second = AuditRetentionService.archive_month(month_start(old), directory)
+
+    assert second.path.name == f"audit-{old:%Y-%m}.part2.ndjson.gz"
+    with gzip.open(first.path, "rt", encoding="utf-8") as handle:
+        assert [json.loads(line)["entity_id"] for line in handle] == [1]
+    with gzip.open(second.path, "rt", encoding="utf-8") as handle:
+        assert [json.loads(line)["entity_id"] for line in handle] == [2]
+    assert sorted(p.name for p in directory.iterdir()) == sorted([first.path.name, second.path.name])
+
+
+def test_archive_directory_must_be_configured_and_durable(tmp_path, monkeypatch):
+    with pytest.raises(RuntimeError, match="not set"):
+        AuditRetentionService.archive_directory("")
+    with pytest.raises(RuntimeError, match="temporary"):
+        AuditRetentionService.archive_directory(str(tmp_path / "archive"))
+
+    monkeypatch.setattr(tempfile, "gettempdir", lambda: str(tmp_path / "scratch"))
+    assert AuditRetentionService.archive_directory(str(tmp_path / "archive")) == (tmp_path / "archive").resolve()
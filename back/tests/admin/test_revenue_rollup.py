@@ -0,0 +1,64 @@
+"""The daily_revenue rollup matches delivered orders, incrementally and on rebuild."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from app.extensions import db
+from app.models import Base, Branch, Order, User
+from app.models.enums import FulfillmentType, OrderStatus, Role
+from app.services.revenue_rollup_service import RevenueRollupService
+
+
+@pytest.fixture
+def revenue_db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'revenue.db'}")
+    Base.metadata.create_all(engine)
+    session = scoped_session(sessionmaker(bind=engine))
+    monkeypatch.setattr(db, "session", session)
+    yield session
+    session.remove()
+    engine.dispose()
+
+
+def _order(user, branch, number, status, amount, created_at, fulfillment=FulfillmentType.DELIVERY):
+    return Order(order_number=f"ORD-R{number}", user_id=user.id, branch_id=branch.id, status=status,
+                 total_amount=Decimal(amount), fulfillment_type=fulfillment, created_at=created_at)
+
+
+def test_rollup_tracks_deliveries_and_rebuild_agrees(revenue_db):
+    user = User(email="revenue@example.com", full_name="Revenue", password_hash="x", role=Role.CUSTOMER)
+    branch = Branch(name="Revenue", address="Street 1")
+    revenue_db.add_all([user, branch])
+    revenue_db.flush()
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    yesterday = today - timedelta(days=1)
+    revenue_db.add_all([
+        _order(user, branch, 1, OrderStatus.DELIVERED, "10.00", yesterday),
+        _order(user, branch, 2, OrderStatus.DELIVERED, "5.50", yesterday, FulfillmentType.PICKUP),
+        _order(user, branch, 3, OrderStatus.CREATED, "99.00", today),
+    ])
+    revenue_db.commit()
+
+    assert RevenueRollupService.rebuild() == 2
+    start = (today - timedelta(days=30)).date()
+    assert RevenueRollupService.series(start, "day") == ([yesterday.date().isoformat()], [15.5])
+
+    pending = revenue_db.query(Order).filter_by(order_number="ORD-R3").one()
+    pending.status = OrderStatus.DELIVERED
+    RevenueRollupService.record(pending, 1)
+    refunded = revenue_db.query(Order).filter_by(order_number="ORD-R1").one()
+    refunded.status = OrderStatus.CANCELED
+    RevenueRollupService.record(refunded, -1)
+    revenue_db.commit()
+
+    expected = ([yesterday.date().isoformat(), today.date().isoformat()], [5.5, 99.0])
+    assert RevenueRollupService.series(start, "day") == expected
+    RevenueRollupService.rebuild()
+    assert RevenueRollupService.series(start, "day") == expected
+    month_labels, month_values = RevenueRollupService.series(start, "month")
+    assert sum(month_values) == 104.5
+    assert month_labels == sorted({yesterday.strftime("%Y-%m"), today.strftime("%Y-%m")})
@@ -1,7 +1,9 @@
+import secrets
+
 import pytest
 
 from app.middleware.error_handler import DomainError
-from app.models import Category, Product
+from app.models import Category, Inventory, Product
 from app.services.cart_service import CartService
 
 def test_cart_add_update_delete(session, users, product_with_inventory):
@@ -29,3 +31,26 @@ def test_cart_add_fails_when_out_of_stock(session, users):
     with pytest.raises(DomainError) as exc:
         CartService.add_item(user.id, product.id, 1)
     assert exc.value.code == "OUT_OF_STOCK_ANYWHERE"
+
+
+def test_get_cart_embeds_products_from_batch_lookup(session, users, test_app):
+    user, _ = users
+    unique = secrets.token_hex(4)
+    category = Category(name=f"Embed {unique}")
+    session.add(category)
+    session.flush()
+    product = Product(name=f"Embed {unique}", sku=f"EMB-{unique}", price="3.00", category_id=category.id)
+    session.add(product)
+    session.flush()
+    branch_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    session.add(Inventory(product_id=product.id, branch_id=branch_id, available_quantity=4))
+    session.commit()
+    CartService.add_item(user.id, product.id, 1)
+
+    plain = CartService.get_cart(user.id)
+    embedded = CartService.get_cart(user.id, embed_products=True, branch_id=branch_id)
+
+    line = next(item for item in embedded.items if item.product_id == product.id)
+    assert all(item.product is None for item in plain.items)
+    assert line.product.id == product.id
+    assert line.product.branch_available_quantity == 4
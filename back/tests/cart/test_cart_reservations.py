@@ -0,0 +1,125 @@
+"""Optional cart stock holds: sync on cart writes, expiry sweep and checkout takeover."""
+
+import secrets
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.middleware.error_handler import DomainError
+from app.models import CartItem, Category, Inventory, Product, StockReservation, User
+from app.models.enums import FulfillmentType, Role
+from app.schemas.checkout import CheckoutConfirmRequest, CheckoutPreviewRequest
+from app.services.cart.reservations import CartReservations
+from app.services.cart_service import CartService
+from app.services.checkout import CheckoutPreviewLoader
+from app.services.checkout_service import CheckoutService
+from app.services.payment_service import PaymentService
+
+
+@pytest.fixture
+def reservations_on(test_app):
+    test_app.config["CART_RESERVATIONS_ENABLED"] = True
+    yield
+    test_app.config["CART_RESERVATIONS_ENABLED"] = False
+
+
+def _seed(session, test_app, stock=5):
+    unique = secrets.token_hex(4)
+    user = User(email=f"hold-{unique}@example.com", full_name="Holder", password_hash="hash", role=Role.CUSTOMER)
+    category = Category(name=f"Hold {unique}")
+    session.add_all([user, category])
+    session.flush()
+    product = Product(name=f"Hold {unique}", sku=f"HLD-{unique}", price="4.00", category_id=category.id)
+    session.add(product)
+    session.flush()
+    warehouse_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    session.add(Inventory(product_id=product.id, branch_id=warehouse_id, available_quantity=stock))
+    session.commit()
+    return user, product, warehouse_id
+
+
+def _stock(session, product):
+    session.expire_all()
+    row = session.execute(select(Inventory).where(Inventory.product_id == product.id)).scalar_one()
+    return row.available_quantity, row.reserved_quantity
+
+
+def _holds(session, product):
+    return session.scalar(
+        select(func.coalesce(func.sum(StockReservation.quantity), 0)).where(StockReservation.product_id == product.id)
+    )
+
+
+def test_cart_writes_hold_and_release_stock(session, test_app, reservations_on):
+    user, product, _ = _seed(session, test_app)
+
+    cart = CartService.add_item(user.id, product.id, 2)
+    assert _stock(session, product) == (3, 2)
+    CartService.add_item(user.id, product.id, 1)
+    assert _stock(session, product) == (2, 3)
+    CartService.update_item(user.id, cart.id, cart.items[0].id, 1)
+    assert _stock(session, product) == (4, 1)
+
+    with pytest.raises(DomainError) as exc:
+        CartService.update_item(user.id, cart.id, cart.items[0].id, 6)
+    assert exc.value.code == "OUT_OF_STOCK_DELIVERY_BRANCH"
+    assert _stock(session, product) == (4, 1)
+
+    CartService.delete_item(user.id, cart.id, cart.items[0].id)
+    assert _stock(session, product) == (5, 0)
+    assert _holds(session, product) == 0
+
+
+def test_expired_cart_holds_are_swept_for_other_shoppers(session, test_app, reservations_on):
+    first, product, _ = _seed(session, test_app, stock=3)
+    second, _, _ = _seed(session, test_app)
+    CartService.add_item(first.id, product.id, 3)
+    session.execute(
+        update(StockReservation)
+        .where(StockReservation.product_id == product.id)
+        .values(expires_at=datetime.utcnow() - timedelta(minutes=1))
+    )
+    session.commit()
+
+    # The shortfall sweeps the abandoned hold instead of failing.
+    CartService.add_item(second.id, product.id, 2)
+    assert _stock(session, product) == (1, 2)
+    assert CartReservations.sweep() == 0
+
+
+def test_checkout_at_warehouse_takes_over_cart_hold(session, test_app, reservations_on, monkeypatch):
+    user, product, warehouse_id = _seed(session, test_app)
+    cart = CartService.add_item(user.id, product.id, 2)
+    monkeypatch.setattr(PaymentService, "charge", lambda *_a, **_k: "ref-cart-hold")
+
+    payload = CheckoutConfirmRequest(
+        cart_id=cart.id,
+        fulfillment_type=FulfillmentType.PICKUP,
+        branch_id=warehouse_id,
+        payment_token_id=1,
+        save_as_default=False,
+    )
+    _, is_new = CheckoutService.confirm(payload, idempotency_key=f"hold-{cart.id}")
+
+    assert is_new
+    assert _stock(session, product) == (3, 0)  # taken once, not reserved twice
+    assert _holds(session, product) == 0
+
+
+def test_preview_counts_the_carts_own_hold_as_available(session, test_app, reservations_on):
+    user, product, warehouse_id = _seed(session, test_app)
+    cart = CartService.add_item(user.id, product.id, 5)
+    assert _stock(session, product) == (0, 5)
+
+    def missing():
+        CheckoutPreviewLoader.clear()
+        response = CheckoutService.preview(
+            CheckoutPreviewRequest(cart_id=cart.id, fulfillment_type=FulfillmentType.PICKUP, branch_id=warehouse_id)
+        )
+        return [(m.requested_quantity, m.available_quantity) for m in response.missing_items]
+
+    assert missing() == []
+    session.execute(update(CartItem).where(CartItem.cart_id == cart.id).values(quantity=6))
+    session.commit()
+    assert missing() == [(6, 5)]
@@ -0,0 +1,106 @@
+"""In-process autocomplete trie: ranking, incremental refresh, no DB round trips."""
+
+import secrets
+
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import Category, Order, OrderItem, Product
+from app.models.enums import FulfillmentType
+from app.services.catalog import CatalogAdminService, CatalogQueryService, autocomplete_index
+
+
+@pytest.fixture
+def category(session):
+    category = Category(name=f"Trie {secrets.token_hex(4)}")
+    session.add(category)
+    session.commit()
+    return category
+
+
+def _product(session, category, name):
+    product = Product(name=name, sku=f"TRIE-{secrets.token_hex(4)}", price="3.00", category_id=category.id)
+    session.add(product)
+    session.commit()
+    return product
+
+
+def _names(query, limit=10):
+    return [item.name for item in CatalogQueryService.autocomplete(query, limit).items]
+
+
+def test_ranks_by_units_sold(session, category, users):
+    quiet = _product(session, category, "Wafflequix Vanilla")
+    popular = _product(session, category, "Wafflequix Cocoa")
+    order = Order(order_number=f"ORD-{secrets.token_hex(4)}", user_id=users[0].id, total_amount="9.00",
+                  fulfillment_type=FulfillmentType.PICKUP)
+    session.add(order)
+    session.flush()
+    session.add(OrderItem(order_id=order.id, product_id=popular.id, name=popular.name, sku=popular.sku,
+                          unit_price="3.00", quantity=3))
+    session.commit()
+    autocomplete_index.rebuild()
+
+    assert _names("wafflequix") == [popular.name, quiet.name]
+    assert _names("coc wafflequ") == [popular.name]
+
+
+def test_admin_writes_refresh_incrementally(session, category):
+    autocomplete_index.rebuild()
+    created = CatalogAdminService.create_product("Gooseberry Jam", f"G-{secrets.token_hex(3)}", "4.00",
+                                                 category.id, None)
+    assert "Gooseberry Jam" in _names("goose")
+
+    CatalogAdminService.update_product(created.id, "Blackcurrant Jam", None, None, None, None)
+    assert _names("goose") == []
+    assert "Blackcurrant Jam" in _names("blackc")
+
+    CatalogAdminService.toggle_product(created.id, active=False)
+    assert _names("blackc") == []
+
+
+def test_lookups_skip_the_database(session, category):
+    _product(session, category, "Rambutan Fresh")
+    autocomplete_index.rebuild()
+    statements = []
+
+    def _record(*args):
+        statements.append(args[2])
+
+    event.listen(db.engine, "before_cursor_execute", _record)
+    try:
+        assert _names("rambu") == ["Rambutan Fresh"]
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _record)
+    assert statements == []
+
+
+def test_stale_index_is_rebuilt_by_one_request_at_a_time(session, category, monkeypatch):
+    _product(session, category, "Tamarillo Red")
+    autocomplete_index.rebuild()
+    rebuilds = []
+    rebuild = autocomplete_index.rebuild
+    monkeypatch.setattr(autocomplete_index, "rebuild", lambda: rebuilds.append(1) or rebuild())
+    autocomplete_index._built_at -= 10_000
+
+    with autocomplete_index._rebuild_lock:  # another request is rebuilding
+        assert _names("tamar") == ["Tamarillo Red"]
+    assert rebuilds == []
+
+    assert _names("tamar") == ["Tamarillo Red"]
+    assert _names("tamar") == ["Tamarillo Red"]
+    assert rebuilds == [1]
+
+
+def test_deactivating_a_top_product_does_not_rerank_every_product(session, category, monkeypatch):
+    products = [_product(session, category, f"Feijoa {i}") for i in range(3)]
+    autocomplete_index.rebuild()
+    reranks = []
+    ranked = autocomplete_index._ranked
+    monkeypatch.setattr(autocomplete_index, "_ranked", lambda *args: reranks.append(1) or ranked(*args))
+
+    autocomplete_index.upsert(products[0].id, products[0].name, is_active=False)
+
+    assert reranks == []
+    assert _names("feijoa") == ["Feijoa 1", "Feijoa 2"]
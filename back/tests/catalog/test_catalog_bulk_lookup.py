@@ -0,0 +1,40 @@
+"""Bulk product lookup by id."""
+
+import secrets
+
+from app.models import Category, Product
+
+
+def _products(session, count):
+    unique = secrets.token_hex(4)
+    category = Category(name=f"Bulk {unique}")
+    session.add(category)
+    session.flush()
+    products = [
+        Product(name=f"Bulk {unique} {i}", sku=f"BLK-{unique}-{i}", price="1.00", category_id=category.id)
+        for i in range(count)
+    ]
+    session.add_all(products)
+    session.commit()
+    return products
+
+
+def test_bulk_lookup_keeps_request_order_and_reports_missing(client, session):
+    first, second, inactive = _products(session, 3)
+    inactive.is_active = False
+    session.commit()
+    ids = f"{second.id},{first.id},{inactive.id},999999,{second.id}"
+
+    resp = client.get(f"/api/v1/catalog/products?ids={ids}")
+
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert [item["id"] for item in body["data"]] == [second.id, first.id]
+    assert body["meta"]["missing"] == [inactive.id, 999999]
+
+
+def test_bulk_lookup_rejects_bad_ids(client):
+    assert client.get("/api/v1/catalog/products?ids=1,x").status_code == 400
+    assert client.get("/api/v1/catalog/products").status_code == 400
+    too_many = ",".join(str(i) for i in range(1, 400))
+    assert client.get(f"/api/v1/catalog/products?ids={too_many}").status_code == 400
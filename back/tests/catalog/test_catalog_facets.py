@@ -0,0 +1,56 @@
+"""Search facets computed in one grouped pass."""
+
+import secrets
+
+from app.models import Category, Inventory, Product
+from app.services.catalog import CatalogQueryService
+
+
+def _seed(session):
+    unique = secrets.token_hex(4)
+    fruit, dairy = Category(name=f"Fruit {unique}"), Category(name=f"Dairy {unique}")
+    session.add_all([fruit, dairy])
+    session.flush()
+    term = f"facet{unique}"
+    products = [
+        Product(name=f"{term} Apple", sku=f"FCT-{unique}-1", price="4.00", category_id=fruit.id, is_organic=True),
+        Product(name=f"{term} Pear", sku=f"FCT-{unique}-2", price="12.00", category_id=fruit.id),
+        Product(name=f"{term} Milk", sku=f"FCT-{unique}-3", price="250.00", category_id=dairy.id, is_organic=True),
+    ]
+    session.add_all(products)
+    session.flush()
+    session.add(Inventory(product_id=products[0].id, branch_id=1, available_quantity=2))
+    session.commit()
+    return term, fruit, dairy
+
+
+def test_facets_count_categories_prices_organic_and_stock(session):
+    term, fruit, dairy = _seed(session)
+    facets = CatalogQueryService.search_facets(term, None, None, None)
+
+    assert facets.total == 3
+    assert [(c.category_id, c.count) for c in facets.categories] == [(fruit.id, 2), (dairy.id, 1)]
+    buckets = {(b.min, b.max): b.count for b in facets.price_buckets}
+    assert buckets[(0, 10)] == 1 and buckets[(10, 25)] == 1 and buckets[(200, None)] == 1
+    assert sum(buckets.values()) == 3
+    assert facets.organic == 2 and facets.in_stock == 1
+
+
+def test_search_endpoint_returns_facets_in_meta(client, session):
+    term, _, _ = _seed(session)
+    resp = client.get(f"/api/v1/catalog/products/search?q={term}&facets=true&limit=2")
+    assert resp.status_code == 200
+    meta = resp.get_json()["meta"]
+    assert meta["total"] == 3 and meta["has_next"] is True
+    assert meta["facets"]["total"] == 3
+    assert len(resp.get_json()["data"]) == 2
+
+
+def test_cached_facets_follow_catalog_writes(session):
+    term, fruit, _ = _seed(session)
+    assert CatalogQueryService.search_facets(term, None, None, None).total == 3
+
+    session.add(Product(name=f"{term} Plum", sku=f"FCT-{term}-4", price="5.00", category_id=fruit.id))
+    session.commit()
+
+    assert CatalogQueryService.search_facets(term, None, None, None).total == 4
@@ -0,0 +1,109 @@
+"""Typo-tolerant product search."""
+
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import Category, Product
+from app.services.catalog import CatalogQueryService, vocabulary_index
+from app.services.catalog.fuzzy_index import SearchBudgetExceeded, trigrams
+
+
+def _seed(session, names):
+    unique = secrets.token_hex(4)
+    category = Category(name=f"Fuzzy {unique}")
+    session.add(category)
+    session.flush()
+    products = [
+        Product(name=name, sku=f"FZY-{unique}-{i}", price="3.00", category_id=category.id)
+        for i, name in enumerate(names)
+    ]
+    session.add_all(products)
+    session.commit()
+    vocabulary_index.invalidate()
+    return category, products
+
+
+def test_trigrams_match_pg_trgm_padding():
+    assert trigrams("cat") == {"  c", " ca", "cat", "at "}
+
+
+def test_vocabulary_corrects_unknown_words_only(session):
+    _seed(session, ["Persimmonade Sparkling Drink"])
+    assert vocabulary_index.correct("persimonade sparkling") == "persimmonade sparkling"
+    assert vocabulary_index.correct("persimmonade") is None
+    assert vocabulary_index.correct("qqqqzzzz") is None
+
+
+def test_search_falls_back_to_fuzzy_match_when_exact_finds_nothing(session):
+    category, products = _seed(session, ["Kumquatine Preserve", "Kumquatine Syrup"])
+
+    fuzzy, total = CatalogQueryService.search_products("kumqatine", category.id, None, None, 10, 0)
+    strict, strict_total = CatalogQueryService.search_products(
+        "kumqatine", category.id, None, None, 10, 0, fuzzy=False
+    )
+
+    assert total == 2 and {p.id for p in fuzzy} == {p.id for p in products}
+    assert strict == [] and strict_total == 0
+
+
+def test_exact_hit_skips_the_fuzzy_round_trip(session):
+    category, _ = _seed(session, ["Kumquatine Preserve"])
+    category_id = category.id
+    counts = []
+    for fuzzy in (False, True):
+        statements = []
+        listener = lambda _conn, _cursor, statement, *_args: statements.append(statement)
+        engine = db.session.get_bind()
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            items, _ = CatalogQueryService.search_products("kumquatine", category_id, None, None, 10, 0, fuzzy=fuzzy)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        assert len(items) == 1
+        counts.append(len(statements))
+    assert counts[0] == counts[1]
+
+
+def test_fuzzy_fallback_over_budget_keeps_the_empty_result(session, monkeypatch):
+    category, _ = _seed(session, ["Kumquatine Preserve"])
+    with pytest.raises(SearchBudgetExceeded):
+        vocabulary_index.correct("kumqatine", deadline=0.0)
+
+    def too_slow(*_args, **_kwargs):
+        raise SearchBudgetExceeded
+
+    monkeypatch.setattr(vocabulary_index, "correct", too_slow)
+    assert CatalogQueryService.search_products("kumqatine", category.id, None, None, 10, 0) == ([], 0)
+
+
+def test_concurrent_stale_lookups_rebuild_the_vocabulary_once(session, test_app, monkeypatch):
+    _seed(session, ["Rambutan Syrup"])
+    assert vocabulary_index.correct("rambutann") == "rambutan"
+    started, release = threading.Event(), threading.Event()
+    rebuilds = []
+
+    def slow_rebuild():
+        rebuilds.append(1)
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setattr(vocabulary_index, "rebuild", slow_rebuild)
+    vocabulary_index.invalidate()
+
+    def lookup():
+        with test_app.app_context():
+            return vocabulary_index.correct("rambutann")
+
+    with ThreadPoolExecutor(4) as pool:
+        first = pool.submit(lookup)
+        assert started.wait(5)
+        # The others answer from the previous vocabulary without waiting for the rebuild.
+        assert [f.result(5) for f in [pool.submit(lookup) for _ in range(3)]] == ["rambutan"] * 3
+        release.set()
+        first.result(5)
+    assert rebuilds == [1]
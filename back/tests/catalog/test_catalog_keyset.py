@@ -0,0 +1,57 @@
+"""Cursor (keyset) pagination on catalog listings."""
+
+import secrets
+
+import pytest
+
+from app.models import Category, Product
+
+
+@pytest.fixture
+def priced_category(session):
+    unique = secrets.token_hex(4)
+    category = Category(name=f"Keyset {unique}")
+    session.add(category)
+    session.flush()
+    prices = ["4.00", "2.00", "2.00", "9.00", "1.00"]
+    session.add_all(
+        Product(name=f"Keyset{unique} Item {i}", sku=f"KS-{secrets.token_hex(4)}", price=price, category_id=category.id)
+        for i, price in enumerate(prices)
+    )
+    session.commit()
+    return category
+
+
+def _walk(client, url, limit=2):
+    pages, cursor = [], ""
+    while True:
+        resp = client.get(f"{url}&limit={limit}&cursor={cursor}")
+        assert resp.status_code == 200
+        body = resp.get_json()
+        pages.append(body["data"])
+        cursor = body["meta"]["next_cursor"]
+        if cursor is None:
+            assert body["meta"]["has_next"] is False
+            return pages, body["meta"]
+
+
+def test_category_products_cursor_walks_every_row_once(client, priced_category):
+    pages, meta = _walk(client, f"/api/v1/catalog/categories/{priced_category.id}/products?include_total=true")
+    ids = [p["id"] for page in pages for p in page]
+    assert len(ids) == 5 and ids == sorted(ids)
+    assert meta["total"] == 5
+    assert "offset" not in meta
+
+
+def test_search_cursor_seeks_on_price_then_id(client, priced_category):
+    term = priced_category.name.replace(" ", "")
+    pages, meta = _walk(client, f"/api/v1/catalog/products/search?q={term}&sort=price_asc&include_total=false")
+    rows = [(float(p["price"]), p["id"]) for page in pages for p in page]
+    assert rows == sorted(rows) and len(rows) == 5
+    assert "total" not in meta
+
+
+def test_invalid_cursor_is_rejected(client):
+    resp = client.get("/api/v1/catalog/categories?cursor=not-a-cursor")
+    assert resp.status_code == 400
+    assert resp.get_json()["error"]["code"] == "INVALID_CURSOR"
@@ -0,0 +1,69 @@
+"""Stock fields on catalog responses come from one aggregate query."""
+
+import secrets
+
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import Branch, Category, Inventory, Product
+from app.services.catalog import CatalogQueryService
+
+
+def _seed(session, quantities):
+    unique = secrets.token_hex(4)
+    category = Category(name=f"Projection {unique}")
+    branches = [Branch(name=f"Proj {unique} {i}", address="Street 9") for i in range(2)]
+    session.add_all([category, *branches])
+    session.flush()
+    products = []
+    for idx, per_branch in enumerate(quantities):
+        product = Product(name=f"Proj{unique} {idx}", sku=f"PRJ-{unique}-{idx}", price="3.00", category_id=category.id)
+        session.add(product)
+        session.flush()
+        session.add_all(
+            Inventory(product_id=product.id, branch_id=branch.id, available_quantity=qty)
+            for branch, qty in zip(branches, per_branch)
+        )
+        products.append(product)
+    session.commit()
+    return category, branches, products
+
+
+def test_projection_aggregates_stock_per_branch(session):
+    category, branches, products = _seed(session, [(0, 4), (0, 0), (2,)])
+    items, _ = CatalogQueryService.get_category_products(category.id, branches[0].id, limit=10, offset=0)
+    by_id = {item.id: item for item in items}
+
+    stocked, empty, single = (by_id[p.id] for p in products)
+    assert (stocked.available_quantity, stocked.in_stock_anywhere) == (4, True)
+    assert (stocked.branch_available_quantity, stocked.in_stock_for_branch) == (0, False)
+    assert (empty.available_quantity, empty.in_stock_anywhere) == (0, False)
+    assert (single.branch_available_quantity, single.in_stock_for_branch) == (2, True)
+
+
+def test_product_detail_without_branch_and_without_inventory(session):
+    category, _, products = _seed(session, [()])
+    item = CatalogQueryService.get_product(products[0].id, None)
+    assert item.available_quantity == 0 and item.in_stock_anywhere is False
+    assert item.in_stock_for_branch is None and item.branch_available_quantity is None
+
+
+def test_search_page_does_not_load_inventory_per_product(session):
+    category, branches, _ = _seed(session, [(1, 1)] * 5)
+    category_id, branch_id = category.id, branches[1].id
+    statements = []
+
+    def _count(_conn, _cursor, statement, *_args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        items, _ = CatalogQueryService.search_products(
+            query=None, category_id=category_id, in_stock=True, branch_id=branch_id, limit=10, offset=0
+        )
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+    assert len(items) == 5
+    # Page ids, count, and the stock projection; no per-product inventory loads.
+    assert len(statements) == 3
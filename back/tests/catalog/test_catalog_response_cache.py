@@ -0,0 +1,81 @@
+"""Versioned response cache and conditional GETs on public catalog routes."""
+
+import secrets
+
+from app.models import Category, Inventory, Product
+from app.services.catalog import CatalogAdminService, CatalogVersionService, catalog_response_cache
+from app.services.catalog.response_cache import CachedResponse, CatalogResponseCache
+
+
+def _product(session):
+    unique = secrets.token_hex(4)
+    category = Category(name=f"Cache {unique}")
+    session.add(category)
+    session.flush()
+    product = Product(name=f"Cached {unique}", sku=f"CCH-{unique}", price="4.50", category_id=category.id)
+    session.add(product)
+    session.commit()
+    return product
+
+
+def test_repeat_reads_hit_cache_and_revalidate(client, session):
+    product = _product(session)
+    url = f"/api/v1/catalog/products/{product.id}"
+    before = catalog_response_cache.stats()
+
+    first = client.get(url)
+    second = client.get(url)
+    revalidated = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+
+    after = catalog_response_cache.stats()
+    assert first.status_code == second.status_code == 200
+    assert second.get_data() == first.get_data()
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert "public" in first.headers["Cache-Control"] and "max-age" in first.headers["Cache-Control"]
+    assert revalidated.status_code == 304 and revalidated.get_data() == b""
+    assert after["hits"] - before["hits"] == 2
+    assert after["not_modified"] - before["not_modified"] == 1
+
+
+def test_admin_write_bumps_version_and_etag(client, session):
+    product = _product(session)
+    url = f"/api/v1/catalog/products/{product.id}"
+    first = client.get(url)
+    version = CatalogVersionService.current()
+
+    CatalogAdminService.update_product(product.id, "Renamed Cached", None, None, None, None)
+
+    second = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert CatalogVersionService.current() > version
+    assert second.status_code == 200
+    assert second.get_json()["data"]["name"] == "Renamed Cached"
+
+
+def test_inventory_write_bumps_version(session, test_app):
+    product = _product(session)
+    version = CatalogVersionService.current()
+    branch_id = int(test_app.config["DELIVERY_SOURCE_BRANCH_ID"])
+    session.add(Inventory(product_id=product.id, branch_id=branch_id, available_quantity=3))
+    session.commit()
+    assert CatalogVersionService.current() > version
+
+
+def test_read_only_commit_keeps_version(session):
+    _product(session)
+    version = CatalogVersionService.current()
+    session.query(Product).first()
+    session.commit()
+    assert CatalogVersionService.current() == version
+
+
+def test_cache_evicts_least_recently_used_beyond_max_entries():
+    cache = CatalogResponseCache()
+    entries = {key: CachedResponse(body=key.encode(), etag=key, mimetype="application/json") for key in "abc"}
+    cache.put("a", entries["a"], max_entries=2)
+    cache.put("b", entries["b"], max_entries=2)
+    assert cache.get("a") == entries["a"]
+    cache.put("c", entries["c"], max_entries=2)
+
+    assert cache.get("b") is None and cache.get("c") == entries["c"]
+    stats = cache.stats()
+    assert (stats["size"], stats["evictions"], stats["hits"], stats["misses"]) == (2, 1, 2, 1)
@@ -0,0 +1,59 @@
+"""Indexed product search and autocomplete."""
+
+import secrets
+
+from app.models import Category, Product
+from app.services.catalog import CatalogAdminService, CatalogQueryService, autocomplete_index
+
+
+def _seed(session, names):
+    unique = secrets.token_hex(4)
+    category = Category(name=f"Search {unique}", description=None)
+    session.add(category)
+    session.flush()
+    products = [
+        Product(name=name, sku=f"SRCH-{unique}-{idx}", price="5.00", category_id=category.id)
+        for idx, name in enumerate(names)
+    ]
+    session.add_all(products)
+    session.commit()
+    return category, products
+
+
+def test_search_matches_token_prefixes_in_any_order(session):
+    _seed(session, ["Zesty Cherry Tomatoes", "Zesty Tomato Paste", "Zesty Cucumbers"])
+    items, total = CatalogQueryService.search_products(
+        query="tom zest", category_id=None, in_stock=None, branch_id=None, limit=10, offset=0
+    )
+    assert total == 2
+    assert {p.name for p in items} == {"Zesty Cherry Tomatoes", "Zesty Tomato Paste"}
+
+
+def test_search_ranks_closer_matches_first(session):
+    _seed(session, ["Quarkish Quarkish Spread", "Quarkish Cheese Spread With Herbs And Garlic"])
+    items, _ = CatalogQueryService.search_products(
+        query="quarkish", category_id=None, in_stock=None, branch_id=None, limit=10, offset=0
+    )
+    assert items[0].name == "Quarkish Quarkish Spread"
+
+
+def test_search_follows_admin_renames(session):
+    category, products = _seed(session, ["Plumcot Jam"])
+    CatalogAdminService.update_product(products[0].id, "Apricot Jam", None, None, None, None)
+    old, old_total = CatalogQueryService.search_products(
+        query="plumcot", category_id=None, in_stock=None, branch_id=None, limit=10, offset=0
+    )
+    new, _ = CatalogQueryService.search_products(
+        query="apricot", category_id=category.id, in_stock=None, branch_id=None, limit=10, offset=0
+    )
+    assert old_total == 0 and old == []
+    assert [p.id for p in new] == [products[0].id]
+
+
+def test_autocomplete_endpoint_uses_index(client, session):
+    _seed(session, ["Kohlrabi Green", "Kohlrabi Purple"])
+    autocomplete_index.invalidate()
+    resp = client.get("/api/v1/catalog/products/autocomplete?q=kohl&limit=5")
+    assert resp.status_code == 200
+    names = [item["name"] for item in resp.get_json()["data"]["items"]]
+    assert sorted(names) == ["Kohlrabi Green", "Kohlrabi Purple"]
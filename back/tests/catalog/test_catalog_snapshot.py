@@ -0,0 +1,75 @@
+"""Gzip NDJSON catalog snapshot and version-based change feed."""
+
+import gzip
+import json
+import secrets
+
+from app.models import Category, Inventory, Product
+from app.services.catalog import CatalogAdminService, CatalogSnapshotService, CatalogVersionService
+
+
+def _product(session):
+    unique = secrets.token_hex(4)
+    category = Category(name=f"Snap {unique}")
+    session.add(category)
+    session.flush()
+    product = Product(name=f"Snap {unique}", sku=f"SNP-{unique}", price="6.00", category_id=category.id)
+    session.add(product)
+    session.commit()
+    return product
+
+
+def test_snapshot_is_versioned_gzip_ndjson(session, tmp_path):
+    product = _product(session)
+    path, version = CatalogSnapshotService.build(tmp_path)
+
+    lines = [json.loads(line) for line in gzip.decompress(path.read_bytes()).splitlines()]
+    assert lines[0]["type"] == "meta" and lines[0]["version"] == version
+    products = {line["id"]: line for line in lines[1:]}
+    assert products[product.id]["type"] == "product"
+    assert products[product.id]["price"] == "6.00"
+
+
+def test_changes_since_lists_product_and_stock_writes(session, test_app):
+    product, untouched = _product(session), _product(session)
+    since = CatalogVersionService.current()
+
+    CatalogAdminService.update_product(product.id, "Snap Renamed", None, None, None, None)
+    restocked = _product(session)
+    session.add(Inventory(product_id=untouched.id, branch_id=1, available_quantity=7))
+    session.commit()
+
+    changes = CatalogSnapshotService.changes_since(since)
+    by_id = {item.id: item for item in changes["items"]}
+    assert changes["version"] > since and changes["resync"] is False
+    assert by_id[product.id].name == "Snap Renamed"
+    assert by_id[untouched.id].available_quantity == 7
+    assert restocked.id in by_id
+    assert CatalogSnapshotService.changes_since(changes["version"])["items"] == []
+
+
+def test_snapshot_and_changes_endpoints(client, session):
+    _product(session)
+    resp = client.get("/api/v1/catalog/products/snapshot", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    version = int(resp.headers["X-Catalog-Version"])
+    resp.close()
+
+    changes = client.get(f"/api/v1/catalog/products/changes?since={version}")
+    assert changes.status_code == 200
+    assert changes.get_json()["data"]["version"] >= version
+    assert client.get("/api/v1/catalog/products/changes").status_code == 400
+
+
+def test_snapshot_ahead_of_the_live_catalog_is_discarded(session, test_app, tmp_path, monkeypatch):
+    _product(session)
+    monkeypatch.setitem(test_app.config, "CATALOG_SNAPSHOT_DIR", str(tmp_path))
+    version = CatalogVersionService.current()
+    foreign = tmp_path / f"catalog-{version + 1000:012d}.ndjson.gz"
+    foreign.write_bytes(gzip.compress(b'{"type":"meta","version":0}\n'))
+
+    path, served = CatalogSnapshotService.latest_snapshot()
+
+    assert served == version and path != foreign
+    assert not foreign.exists()
@@ -0,0 +1,76 @@
+"""product_stock_summary maintenance and stock filters."""
+
+import secrets
+
+from app.models import Branch, Category, Inventory, Product, ProductStockSummary
+from app.services.catalog import CatalogQueryService, StockSummaryService
+
+
+def _seed(session):
+    unique = secrets.token_hex(4)
+    category = Category(name=f"Summary {unique}")
+    branches = [Branch(name=f"Sum {unique} {i}", address="Street 5") for i in range(2)]
+    session.add_all([category, *branches])
+    session.flush()
+    product = Product(name=f"Summary {unique}", sku=f"SUM-{unique}", price="2.00", category_id=category.id)
+    session.add(product)
+    session.flush()
+    rows = [
+        Inventory(product_id=product.id, branch_id=branches[0].id, available_quantity=5),
+        Inventory(product_id=product.id, branch_id=branches[1].id, available_quantity=0),
+    ]
+    session.add_all(rows)
+    session.commit()
+    return category, product, rows
+
+
+def _summary(session, product_id):
+    session.expire_all()
+    row = session.get(ProductStockSummary, product_id)
+    return (row.total_available, row.branches_in_stock) if row else None
+
+
+def test_summary_follows_inventory_writes(session):
+    _, product, rows = _seed(session)
+    assert _summary(session, product.id) == (5, 1)
+
+    rows[1].available_quantity = 3
+    session.commit()
+    assert _summary(session, product.id) == (8, 2)
+
+    session.expire_all()
+    rows[0].available_quantity = 0  # assigned while expired: old value still counted
+    session.commit()
+    assert _summary(session, product.id) == (3, 1)
+
+    session.delete(rows[1])
+    session.commit()
+    assert _summary(session, product.id) == (0, 0)
+
+
+def test_in_stock_filter_and_stock_sort_use_summary(session):
+    category, product, rows = _seed(session)
+    empty = Product(name=f"Empty {product.name}", sku=f"{product.sku}-E", price="2.00", category_id=category.id)
+    session.add(empty)
+    session.commit()
+
+    in_stock, _ = CatalogQueryService.search_products(None, category.id, True, None, 10, 0)
+    out_of_stock, _ = CatalogQueryService.search_products(None, category.id, False, None, 10, 0)
+    by_branch, _ = CatalogQueryService.search_products(None, category.id, True, rows[1].branch_id, 10, 0)
+    by_stock, _ = CatalogQueryService.search_products(None, category.id, None, None, 10, 0, sort="stock_desc")
+
+    assert [p.id for p in in_stock] == [product.id]
+    assert [p.id for p in out_of_stock] == [empty.id]
+    assert by_branch == []
+    assert [p.id for p in by_stock] == [product.id, empty.id]
+
+
+def test_reconcile_repairs_drift(session):
+    _, product, _ = _seed(session)
+    session.get(ProductStockSummary, product.id).total_available = 999
+    session.commit()
+
+    assert product.id in StockSummaryService.reconcile(dry_run=True)
+    assert product.id in StockSummaryService.reconcile()
+    assert _summary(session, product.id) == (5, 1)
+    assert product.id not in StockSummaryService.reconcile(dry_run=True)
@@ -0,0 +1,83 @@
+"""Idempotent replays from memory and the expired-key purge."""
+
+import secrets
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app.models import Branch, Cart, CartItem, Category, IdempotencyKey, Inventory, Product, StockReservation, User
+from app.models.enums import FulfillmentType, IdempotencyStatus, Role
+from app.schemas.checkout import CheckoutConfirmRequest
+from app.services.checkout import CheckoutIdempotencyManager, idempotency_stats
+from app.services.checkout_service import CheckoutService
+from app.services.payment_service import PaymentService
+
+
+def _seed(session):
+    unique = secrets.token_hex(4)
+    user = User(email=f"idem-{unique}@example.com", full_name="Replayer", password_hash="hash", role=Role.CUSTOMER)
+    category = Category(name=f"Idem {unique}")
+    branch = Branch(name=f"Idem {unique}", address="Street 9")
+    session.add_all([user, category, branch])
+    session.flush()
+    product = Product(name=f"Idem {unique}", sku=f"IDM-{unique}", price="4.00", category_id=category.id)
+    session.add(product)
+    session.flush()
+    inventory = Inventory(product_id=product.id, branch_id=branch.id, available_quantity=5)
+    cart = Cart(user_id=user.id)
+    session.add_all([inventory, cart])
+    session.flush()
+    session.add(CartItem(cart_id=cart.id, product_id=product.id, quantity=1, unit_price=Decimal("4.00")))
+    session.commit()
+    return user, branch, cart, inventory
+
+
+def test_succeeded_replay_is_served_without_locking(session, monkeypatch):
+    _, branch, cart, _ = _seed(session)
+    payload = CheckoutConfirmRequest(
+        cart_id=cart.id,
+        fulfillment_type=FulfillmentType.PICKUP,
+        branch_id=branch.id,
+        payment_token_id=1,
+        save_as_default=False,
+    )
+    monkeypatch.setattr(PaymentService, "charge", lambda *_a, **_k: "ref-replay")
+    first, _ = CheckoutService.confirm(payload, idempotency_key="replay")
+    idempotency_stats.reset()
+
+    def no_locks(*_args, **_kwargs):
+        raise AssertionError("replay should not lock")
+
+    monkeypatch.setattr(CheckoutService, "_lock_and_reserve", no_locks)
+    second, is_new = CheckoutService.confirm(payload, idempotency_key="replay")
+
+    assert not is_new and second == first
+    assert idempotency_stats.stats()["replay_cache_hits"] == 1
+
+
+def test_purge_deletes_expired_keys_in_batches(session):
+    user, _, _, inventory = _seed(session)
+    past = datetime.utcnow() - timedelta(hours=1)
+    expired = [
+        IdempotencyKey(user_id=user.id, key=f"old-{i}", request_hash="h", status=IdempotencyStatus.SUCCEEDED,
+                       expires_at=past)
+        for i in range(3)
+    ]
+    live = IdempotencyKey(user_id=user.id, key="live", request_hash="h", status=IdempotencyStatus.SUCCEEDED)
+    holding = IdempotencyKey(user_id=user.id, key="holding", request_hash="h",
+                             status=IdempotencyStatus.IN_PROGRESS, expires_at=past)
+    session.add_all([*expired, live, holding])
+    session.flush()
+    session.add(StockReservation(idempotency_key_id=holding.id, inventory_id=inventory.id,
+                                 product_id=inventory.product_id, quantity=1, expires_at=past))
+    session.commit()
+
+    assert CheckoutIdempotencyManager.purge_expired(limit=2) == 2
+    assert CheckoutIdempotencyManager.purge_expired(limit=2) == 1
+    assert CheckoutIdempotencyManager.purge_expired(limit=2) == 0
+    session.commit()
+
+    remaining = session.scalars(select(IdempotencyKey.key).where(IdempotencyKey.user_id == user.id)).all()
+    assert sorted(remaining) == ["holding", "live"]
+    assert CheckoutIdempotencyManager.purge_backlog()["expired_keys"] == 1  # "holding" waits for the sweep
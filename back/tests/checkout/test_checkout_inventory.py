@@ -0,0 +1,107 @@
+"""Set-based inventory decrement used by checkout confirm."""
+
+import secrets
+from types import SimpleNamespace
+
+from sqlalchemy import func, select
+
+from app.models import Audit, Branch, Category, Inventory, Product, ProductStockSummary
+from app.services.checkout import CheckoutInventoryManager
+
+
+def _seed(session, quantities):
+    unique = secrets.token_hex(4)
+    category = Category(name=f"Decrement {unique}")
+    branch = Branch(name=f"Decrement {unique}", address="Street 9")
+    session.add_all([category, branch])
+    session.flush()
+    products = [
+        Product(name=f"Decrement {unique} {i}", sku=f"DEC-{unique}-{i}", price="3.00", category_id=category.id)
+        for i in range(len(quantities))
+    ]
+    session.add_all(products)
+    session.flush()
+    session.add_all(
+        Inventory(product_id=product.id, branch_id=branch.id, available_quantity=qty)
+        for product, qty in zip(products, quantities)
+    )
+    session.commit()
+    return branch, products
+
+
+def _lines(products, quantities):
+    return [SimpleNamespace(product_id=p.id, quantity=q) for p, q in zip(products, quantities)]
+
+
+def _available(session, products):
+    session.expire_all()
+    rows = session.execute(
+        select(Inventory.product_id, Inventory.available_quantity).where(
+            Inventory.product_id.in_([p.id for p in products])
+        )
+    ).all()
+    return [dict(rows)[p.id] for p in products]
+
+
+def _audit_count(session):
+    return session.scalar(select(func.count()).select_from(Audit).where(Audit.action == "DECREMENT"))
+
+
+def test_decrement_takes_all_lines_and_batches_audit(session):
+    branch, products = _seed(session, [5, 2])
+    before = _audit_count(session)
+
+    missing = CheckoutInventoryManager(branch.id).decrement_inventory(_lines(products, [3, 2]))
+    session.commit()
+
+    assert missing == []
+    assert _available(session, products) == [2, 0]
+    assert _audit_count(session) == before + 2
+    summary = session.get(ProductStockSummary, products[1].id)
+    assert (summary.total_available, summary.branches_in_stock) == (0, 0)
+
+
+def test_decrement_shortfall_takes_nothing(session):
+    branch, products = _seed(session, [5, 1])
+    before = _audit_count(session)
+
+    missing = CheckoutInventoryManager(branch.id).decrement_inventory(_lines(products, [3, 2]))
+    session.commit()
+
+    assert [(m.product_id, m.requested_quantity, m.available_quantity) for m in missing] == [
+        (products[1].id, 2, 1)
+    ]
+    assert _available(session, products) == [5, 1]
+    assert _audit_count(session) == before
+
+
+def test_decrement_sums_duplicate_lines_for_one_product(session):
+    branch, products = _seed(session, [5])
+
+    missing = CheckoutInventoryManager(branch.id).decrement_inventory(_lines(products * 2, [3, 3]))
+    session.commit()
+
+    assert [(m.product_id, m.requested_quantity, m.available_quantity) for m in missing] == [
+        (products[0].id, 6, 5)
+    ]
+    assert _available(session, products) == [5]
+
+
+def test_reserve_shortfall_leaves_stock_summary_matching_inventory(session):
+    branch, products = _seed(session, [5, 1])
+    other = Branch(name=f"{branch.name} east", address="Street 10")
+    session.add(other)
+    session.flush()
+    session.add_all(Inventory(product_id=p.id, branch_id=other.id, available_quantity=2) for p in products)
+    session.commit()
+
+    reserved, missing = CheckoutInventoryManager(branch.id).reserve_inventory(_lines(products, [3, 2]))
+    session.commit()
+
+    assert reserved == [] and [m.product_id for m in missing] == [products[1].id]
+    session.expire_all()
+    for product in products:
+        stock = session.scalar(
+            select(func.sum(Inventory.available_quantity)).where(Inventory.product_id == product.id)
+        )
+        assert session.get(ProductStockSummary, product.id).total_available == stock
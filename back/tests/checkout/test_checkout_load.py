@@ -0,0 +1,33 @@
+"""Smoke run of the checkout load harness command against a file-backed SQLite database."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_concurrent_confirms_never_oversell(tmp_path):
+    output = tmp_path / "results.json"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'checkout_load.db'}"}
+    subprocess.run(
+        [
+            sys.executable, "-m", "scripts.bench.checkout_load_bench",
+            "--users", "24", "--hot-skus", "2", "--hot-stock", "10",
+            "--workers", "4", "--duplicate-rate", "0.2", "--output", str(output),
+        ],
+        cwd=BACKEND_ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+    report = json.loads(output.read_text())
+
+    assert report["requests"] >= 24
+    oversell = report["oversell"]
+    assert oversell["units"] == 0 and oversell["negative_inventory_rows"] == 0
+    assert 0 < oversell["hot_units_sold"] <= 20
+    assert set(report["codes"]) <= {"INSUFFICIENT_STOCK", "IDEMPOTENCY_IN_PROGRESS", "CHECKOUT_BUSY"}
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
@@ -0,0 +1,61 @@
+"""Lock-contention retries and counters for checkout confirm."""
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.middleware.error_handler import DomainError
+from app.services.checkout import CheckoutLocking, checkout_lock_stats
+
+
+class _DriverError(Exception):
+    def __init__(self, sqlstate):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+def _failing(sqlstate, failures):
+    calls = []
+
+    def phase():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise OperationalError("SELECT 1", {}, _DriverError(sqlstate))
+        return "done"
+
+    return phase, calls
+
+
+@pytest.fixture
+def fast_retries(test_app, session):
+    test_app.config["CHECKOUT_LOCK_RETRY_BASE_MS"] = 0
+    checkout_lock_stats.reset()
+    yield
+    test_app.config["CHECKOUT_LOCK_RETRY_BASE_MS"] = 25
+
+
+def test_deadlocks_and_timeouts_are_retried_and_counted(fast_retries):
+    deadlocked, calls = _failing("40P01", failures=2)
+    assert CheckoutLocking.run(deadlocked) == "done"
+    assert len(calls) == 3
+    timed_out, _ = _failing("55P03", failures=1)
+    assert CheckoutLocking.run(timed_out) == "done"
+
+    stats = checkout_lock_stats.stats()
+    assert (stats["deadlocks"], stats["timeouts"], stats["retries"], stats["exhausted"]) == (2, 1, 3, 0)
+
+
+def test_retries_are_bounded(test_app, fast_retries):
+    phase, calls = _failing("55P03", failures=100)
+    with pytest.raises(DomainError) as exc:
+        CheckoutLocking.run(phase)
+    assert exc.value.code == "CHECKOUT_BUSY"
+    assert len(calls) == test_app.config["CHECKOUT_LOCK_RETRIES"] + 1
+    assert checkout_lock_stats.stats()["exhausted"] == 1
+
+
+def test_other_database_errors_are_not_retried(fast_retries):
+    phase, calls = _failing("23505", failures=1)
+    with pytest.raises(OperationalError):
+        CheckoutLocking.run(phase)
+    assert len(calls) == 1
+    assert checkout_lock_stats.stats()["retries"] == 0
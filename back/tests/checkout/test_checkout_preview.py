@@ -0,0 +1,95 @@
+"""Batched, cached checkout preview."""
+
+import secrets
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import Branch, Cart, CartItem, Category, Inventory, Product, User
+from app.models.enums import FulfillmentType, Role
+from app.schemas.checkout import CheckoutPreviewRequest
+from app.services.checkout_service import CheckoutService
+
+
+def _seed(session, lines=30):
+    unique = secrets.token_hex(4)
+    user = User(email=f"prev-{unique}@example.com", full_name="Preview", password_hash="hash", role=Role.CUSTOMER)
+    category = Category(name=f"Preview {unique}")
+    branch = Branch(name=f"Preview {unique}", address="Street 3")
+    session.add_all([user, category, branch])
+    session.flush()
+    products = [
+        Product(name=f"Preview {unique} {i}", sku=f"PRV-{unique}-{i}", price="2.00", category_id=category.id)
+        for i in range(lines)
+    ]
+    session.add_all(products)
+    session.flush()
+    # Every other product is stocked at the branch.
+    session.add_all(
+        Inventory(product_id=p.id, branch_id=branch.id, available_quantity=5) for p in products[::2]
+    )
+    cart = Cart(user_id=user.id)
+    session.add(cart)
+    session.flush()
+    session.add_all(
+        CartItem(cart_id=cart.id, product_id=p.id, quantity=2, unit_price=Decimal("2.00")) for p in products
+    )
+    session.commit()
+    return branch, cart, products
+
+
+def _preview(cart, branch):
+    return _preview_ids(cart.id, branch.id)
+
+
+def _preview_ids(cart_id, branch_id):
+    return CheckoutService.preview(
+        CheckoutPreviewRequest(cart_id=cart_id, fulfillment_type=FulfillmentType.PICKUP, branch_id=branch_id)
+    )
+
+
+def _count_selects(fn):
+    statements = []
+
+    def _listen(conn, cursor, statement, *_args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = db.session.get_bind()
+    event.listen(engine, "before_cursor_execute", _listen)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", _listen)
+    return result, len(statements)
+
+
+def test_preview_query_count_is_flat_and_cached(session):
+    branch, cart, products = _seed(session)
+    cart_id, branch_id = cart.id, branch.id
+    missing_ids = {p.id for p in products[1::2]}
+    session.get(Branch, branch_id)
+
+    first, cold = _count_selects(lambda: _preview_ids(cart_id, branch_id))
+    second, warm = _count_selects(lambda: _preview_ids(cart_id, branch_id))
+
+    assert first.cart_total == Decimal("120.00")
+    assert {m.product_id for m in first.missing_items} == missing_ids
+    assert second == first
+    assert cold <= 2  # version probe + one lines-with-stock query
+    assert warm == 1  # version probe only
+
+
+def test_preview_cache_follows_cart_and_stock_changes(session):
+    branch, cart, products = _seed(session, lines=2)
+    assert len(_preview(cart, branch).missing_items) == 1
+
+    item = session.query(CartItem).filter_by(cart_id=cart.id, product_id=products[0].id).one()
+    item.quantity = 3
+    session.commit()
+    assert _preview(cart, branch).cart_total == Decimal("10.00")
+
+    session.add(Inventory(product_id=products[1].id, branch_id=branch.id, available_quantity=9))
+    session.commit()
+    assert _preview(cart, branch).missing_items == []
@@ -0,0 +1,196 @@
+"""Two-phase checkout: reservations, compensation and the expiry sweeper."""
+
+import secrets
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from app.extensions import db
+from app.middleware.error_handler import DomainError
+from app.models import (
+    Base,
+    Branch,
+    Cart,
+    CartItem,
+    Category,
+    IdempotencyKey,
+    Inventory,
+    Order,
+    Product,
+    StockReservation,
+    User,
+)
+from app.models.enums import FulfillmentType, IdempotencyStatus, Role
+from app.schemas.checkout import CheckoutConfirmRequest
+from app.services.checkout import CheckoutInventoryManager, CheckoutReservations, OrderLine
+from app.services.checkout_service import CheckoutService
+from app.services.payment_service import PaymentService
+
+
+def _seed(session, stock=5):
+    unique = secrets.token_hex(4)
+    user = User(email=f"resv-{unique}@example.com", full_name="Reserver", password_hash="hash", role=Role.CUSTOMER)
+    category = Category(name=f"Reserve {unique}")
+    branch = Branch(name=f"Reserve {unique}", address="Street 7")
+    session.add_all([user, category, branch])
+    session.flush()
+    product = Product(name=f"Reserve {unique}", sku=f"RSV-{unique}", price="4.00", category_id=category.id)
+    session.add(product)
+    session.flush()
+    session.add(Inventory(product_id=product.id, branch_id=branch.id, available_quantity=stock))
+    session.commit()
+    return user, branch, product
+
+
+def _cart(session, user, product, quantity):
+    cart = Cart(user_id=user.id)
+    session.add(cart)
+    session.flush()
+    session.add(CartItem(cart_id=cart.id, product_id=product.id, quantity=quantity, unit_price=Decimal("4.00")))
+    session.commit()
+    return cart
+
+
+def _payload(cart, branch):
+    return CheckoutConfirmRequest(
+        cart_id=cart.id,
+        fulfillment_type=FulfillmentType.PICKUP,
+        branch_id=branch.id,
+        payment_token_id=1,
+        save_as_default=False,
+    )
+
+
+def _stock(session, product):
+    session.expire_all()
+    row = session.execute(select(Inventory).where(Inventory.product_id == product.id)).scalar_one()
+    return row.available_quantity, row.reserved_quantity
+
+
+def _reservations(session):
+    return session.scalar(select(func.count()).select_from(StockReservation))
+
+
+def test_confirm_reserves_then_consumes_stock(session, monkeypatch):
+    user, branch, product = _seed(session)
+    cart = _cart(session, user, product, 2)
+    seen = {}
+
+    def charge(*_args, **_kwargs):
+        seen["stock"] = _stock(session, product)
+        return "ref-two-phase"
+
+    monkeypatch.setattr(PaymentService, "charge", charge)
+    result, is_new = CheckoutService.confirm(_payload(cart, branch), idempotency_key="two-phase")
+
+    assert is_new and result.payment_reference == "ref-two-phase"
+    assert seen["stock"] == (3, 2)  # reserved and committed before the charge
+    assert _stock(session, product) == (3, 0)
+    assert _reservations(session) == 0
+    assert session.get(Order, result.order_id).items[0].quantity == 2
+
+
+def test_failed_charge_releases_reservation(session, monkeypatch):
+    user, branch, product = _seed(session)
+    cart = _cart(session, user, product, 2)
+
+    def decline(*_args, **_kwargs):
+        raise DomainError("PAYMENT_DECLINED", "Declined", status_code=402)
+
+    monkeypatch.setattr(PaymentService, "charge", decline)
+    with pytest.raises(DomainError):
+        CheckoutService.confirm(_payload(cart, branch), idempotency_key="declined")
+
+    assert _stock(session, product) == (5, 0)
+    assert _reservations(session) == 0
+    record = session.execute(select(IdempotencyKey).where(IdempotencyKey.key == "declined")).scalar_one()
+    assert record.status == IdempotencyStatus.FAILED
+
+    monkeypatch.setattr(PaymentService, "charge", lambda *_a, **_k: "ref-retry")
+    _, is_new = CheckoutService.confirm(_payload(cart, branch), idempotency_key="declined")
+    assert is_new
+    assert _stock(session, product) == (3, 0)
+
+
+def test_sweep_releases_expired_reservations(session, test_app):
+    user, branch, product = _seed(session)
+    record = IdempotencyKey(user_id=user.id, key="abandoned", request_hash="h", status=IdempotencyStatus.IN_PROGRESS)
+    session.add(record)
+    session.flush()
+    line = OrderLine(product.id, product.name, product.sku, Decimal("4.00"), 4)
+    reserved, _ = CheckoutInventoryManager(branch.id).reserve_inventory([line])
+    test_app.config["CHECKOUT_RESERVATION_TTL_SECONDS"] = -1
+    try:
+        CheckoutReservations.hold(record, reserved)
+    finally:
+        test_app.config["CHECKOUT_RESERVATION_TTL_SECONDS"] = 600
+    session.commit()
+    assert _stock(session, product) == (1, 4)
+
+    assert CheckoutReservations.sweep() == 1
+    session.commit()
+    assert _stock(session, product) == (5, 0)
+    # The charge may still be running, so the key is not reopened for retries.
+    assert session.get(IdempotencyKey, record.id).status == IdempotencyStatus.IN_PROGRESS
+
+
+def test_shortfall_reclaims_stock_from_expired_reservations(session, test_app, monkeypatch):
+    user, branch, product = _seed(session, stock=2)
+    monkeypatch.setattr(PaymentService, "charge", lambda *_a, **_k: "ref-reclaim")
+    abandoned = IdempotencyKey(user_id=user.id, key="stale", request_hash="h", status=IdempotencyStatus.IN_PROGRESS)
+    session.add(abandoned)
+    session.flush()
+    line = OrderLine(product.id, product.name, product.sku, Decimal("4.00"), 2)
+    reserved, _ = CheckoutInventoryManager(branch.id).reserve_inventory([line])
+    test_app.config["CHECKOUT_RESERVATION_TTL_SECONDS"] = -1
+    try:
+        CheckoutReservations.hold(abandoned, reserved)
+    finally:
+        test_app.config["CHECKOUT_RESERVATION_TTL_SECONDS"] = 600
+    session.commit()
+
+    cart = _cart(session, user, product, 2)
+    _, is_new = CheckoutService.confirm(_payload(cart, branch), idempotency_key="fresh")
+    assert is_new
+    assert _stock(session, product) == (0, 0)
+
+
+@pytest.fixture
+def checkout_db(test_app, tmp_path, monkeypatch):
+    # The shared session fixture cannot survive the rollback this path performs.
+    engine = create_engine(f"sqlite:///{tmp_path / 'checkout.db'}")
+    Base.metadata.create_all(engine)
+    scoped = scoped_session(sessionmaker(bind=engine))
+    monkeypatch.setattr(db, "session", scoped)
+    yield scoped
+    scoped.remove()
+    engine.dispose()
+
+
+def test_charge_outliving_a_swept_reservation_is_refunded(checkout_db, monkeypatch):
+    user, branch, product = _seed(checkout_db, stock=2)
+    cart = _cart(checkout_db, user, product, 2)
+    refunds = []
+
+    def charge(*_args, **_kwargs):
+        # The reservation expires mid-payment and another shopper buys the stock.
+        checkout_db.execute(update(StockReservation).values(expires_at=datetime.utcnow() - timedelta(minutes=1)))
+        CheckoutReservations.sweep()
+        CheckoutInventoryManager(branch.id).decrement_inventory([OrderLine(product.id, "", "", Decimal("4.00"), 2)])
+        checkout_db.commit()
+        return "ref-swept"
+
+    monkeypatch.setattr(PaymentService, "charge", charge)
+    monkeypatch.setattr(PaymentService, "refund", lambda ref, amount: refunds.append((ref, amount)) or "refund-1")
+    with pytest.raises(DomainError) as exc:
+        CheckoutService.confirm(_payload(cart, branch), idempotency_key="swept")
+
+    assert exc.value.code == "RESERVATION_EXPIRED"
+    assert refunds == [("ref-swept", 8.0)]
+    record = checkout_db.execute(select(IdempotencyKey).where(IdempotencyKey.key == "swept")).scalar_one()
+    assert record.status == IdempotencyStatus.FAILED
+    assert _stock(checkout_db, product) == (0, 0)
+    assert checkout_db.scalar(select(func.count()).select_from(Order)) == 0
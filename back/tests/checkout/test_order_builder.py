@@ -0,0 +1,65 @@
+"""Order creation writes all lines in one statement."""
+
+import secrets
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import Branch, Cart, CartItem, Category, Product, User
+from app.models.enums import FulfillmentType, Role
+from app.schemas.checkout import CheckoutConfirmRequest
+from app.services.checkout import CheckoutCartLoader, CheckoutOrderBuilder
+
+
+def _seed(session, lines):
+    unique = secrets.token_hex(4)
+    user = User(email=f"bulk-{unique}@example.com", full_name="Bulk", password_hash="hash", role=Role.CUSTOMER)
+    category = Category(name=f"Bulk {unique}")
+    branch = Branch(name=f"Bulk {unique}", address="Street 5")
+    session.add_all([user, category, branch])
+    session.flush()
+    products = [
+        Product(name=f"Bulk {unique} {i}", sku=f"BLK-{unique}-{i}", price="3.00", category_id=category.id)
+        for i in range(lines)
+    ]
+    cart = Cart(user_id=user.id)
+    session.add_all([*products, cart])
+    session.flush()
+    session.add_all(
+        CartItem(cart_id=cart.id, product_id=p.id, quantity=1, unit_price=Decimal("3.00")) for p in products
+    )
+    session.commit()
+    return user, branch, cart, products
+
+
+def test_order_items_are_written_in_one_insert(session):
+    user, branch, cart, products = _seed(session, lines=20)
+    user_id, branch_id, cart_id = user.id, branch.id, cart.id
+    payload = CheckoutConfirmRequest(
+        cart_id=cart_id,
+        fulfillment_type=FulfillmentType.PICKUP,
+        branch_id=branch_id,
+        payment_token_id=1,
+        save_as_default=False,
+    )
+    session.expire_all()
+    loaded = CheckoutCartLoader.load(cart_id)
+    statements = []
+
+    def _listen(conn, cursor, statement, *_args):
+        statements.append(statement.lstrip().upper())
+
+    engine = db.session.get_bind()
+    event.listen(engine, "before_cursor_execute", _listen)
+    try:
+        lines = CheckoutOrderBuilder.lines_from_cart(loaded)
+        order = CheckoutOrderBuilder.create_order(user_id, lines, payload, branch_id, Decimal("60.00"))
+        items = list(order.items)
+    finally:
+        event.remove(engine, "before_cursor_execute", _listen)
+
+    assert sum(s.startswith("SELECT") and "FROM PRODUCTS" in s for s in statements) == 1
+    assert sum(s.startswith("INSERT INTO ORDER_ITEMS") for s in statements) == 1
+    assert {(item.name, item.sku) for item in items} == {(p.name, p.sku) for p in products}
+    assert order.pickup.branch_id == branch_id
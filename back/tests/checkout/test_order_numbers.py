@@ -0,0 +1,66 @@
+"""Block-leased order numbers: monotonic per worker and unique across processes."""
+
+import multiprocessing
+import os
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.models import OrderNumberCounter
+from app.services.checkout import OrderNumberGenerator
+
+THREADS = 2
+
+
+def _generate(db_url: str, per_thread: int, block_size: int) -> bytes:
+    engine = create_engine(db_url, connect_args={"timeout": 30})
+    generator = OrderNumberGenerator(block_size=block_size)
+
+    def run(_):
+        numbers = [generator.next(engine) for _ in range(per_thread)]
+        assert numbers == sorted(numbers)  # monotonic within a thread
+        return array("q", (int(number[len(OrderNumberGenerator.PREFIX):]) for number in numbers))
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        chunks = list(pool.map(run, range(THREADS)))
+    engine.dispose()
+    return b"".join(chunk.tobytes() for chunk in chunks)
+
+
+def test_numbers_are_ordered_and_survive_rollbacks(session):
+    generator = OrderNumberGenerator(block_size=3)
+    first = [generator.next() for _ in range(4)]
+    session.rollback()  # undoes the in-transaction lease; the next block must not reissue numbers
+    second = [generator.next() for _ in range(4)]
+
+    numbers = first + second
+    assert numbers == sorted(numbers) and len(set(numbers)) == len(numbers)
+    assert all(len(number) == len(OrderNumberGenerator.PREFIX) + OrderNumberGenerator.WIDTH for number in numbers)
+
+
+def _assert_unique_across_processes(tmp_path, processes: int, per_thread: int, block_size: int):
+    db_url = f"sqlite:///{tmp_path / 'order_numbers.db'}"
+    engine = create_engine(db_url)
+    OrderNumberCounter.__table__.create(engine)
+    engine.dispose()
+
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        results = pool.starmap(_generate, [(db_url, per_thread, block_size)] * processes)
+
+    numbers = array("q")
+    for chunk in results:
+        numbers.frombytes(chunk)
+    assert len(numbers) == processes * THREADS * per_thread
+    assert len(set(numbers)) == len(numbers)
+
+
+def test_numbers_never_collide_across_processes(tmp_path):
+    # Small blocks so the workers contend for leases many times.
+    _assert_unique_across_processes(tmp_path, processes=2, per_thread=2_000, block_size=50)
+
+
+@pytest.mark.skipif(not os.getenv("ORDER_NUMBER_STRESS"), reason="set ORDER_NUMBER_STRESS=1 to run")
+def test_millions_of_numbers_across_processes_never_collide(tmp_path):
+    _assert_unique_across_processes(tmp_path, processes=4, per_thread=250_000, block_size=5_000)
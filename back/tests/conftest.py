@@ -19,6 +19,10 @@ from app.config import AppConfig
 from app.extensions import db
 from app.models import Base, Branch, Category, DeliverySlot, Inventory, Product, User
 from app.models.enums import Role
+from app.services.catalog import catalog_response_cache
+from app.services.checkout import CheckoutIdempotencyManager, CheckoutPreviewLoader
+from app.services.ops.performance_service import OpsPerformanceService, picker_activity
+from app.services.settings_service import SettingsService
 
 @pytest.fixture
 def client(test_app):
@@ -65,12 +69,13 @@ def ensure_product(session):
 
 
 @pytest.fixture(scope="session")
-def test_app():
+def test_app(tmp_path_factory):
     warehouse_id = 1
     cfg = AppConfig(
         DATABASE_URL="sqlite:///:memory:",
         JWT_SECRET_KEY="test",
         DELIVERY_SOURCE_BRANCH_ID=str(warehouse_id),
+        CATALOG_SNAPSHOT_DIR=str(tmp_path_factory.mktemp("catalog-snapshots")),
     )
     app = create_app(cfg)
     app.config["TESTING"] = True
@@ -93,6 +98,13 @@ def test_app():
 
 @pytest.fixture
 def session(test_app):
+    # Each test rolls back, so catalog and cart versions are reused; drop responses cached under them.
+    catalog_response_cache.clear()
+    CheckoutPreviewLoader.clear()
+    CheckoutIdempotencyManager.clear_cache()
+    SettingsService.invalidate()
+    OpsPerformanceService.invalidate()
+    picker_activity.reset()
     with test_app.app_context():
         connection = db.engine.connect()
         transaction = connection.begin()
@@ -0,0 +1,83 @@
+"""Ops metrics come from one cached query; live pickers from in-memory activity."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from app.extensions import db
+from app.models import Base, Branch, Order, OrderItem, User
+from app.models.enums import FulfillmentType, OrderStatus, PickedStatus, Role
+from app.services.ops.performance_service import OpsPerformanceService, PickerActivity, picker_activity
+from app.services.ops.update_service import OpsOrderUpdateService
+
+
+@pytest.fixture
+def ops_db(test_app, tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ops.db'}")
+    Base.metadata.create_all(engine)
+    session = scoped_session(sessionmaker(bind=engine))
+    monkeypatch.setattr(db, "session", session)
+    OpsPerformanceService.invalidate()
+    picker_activity.reset()
+    with test_app.app_context():
+        yield session, engine
+    OpsPerformanceService.invalidate()
+    picker_activity.reset()
+    session.remove()
+    engine.dispose()
+
+
+def _order(user, branch, number, status, created_at, picked):
+    order = Order(order_number=f"ORD-P{number}", user_id=user.id, branch_id=branch.id, status=status,
+                  total_amount=Decimal("10.00"), fulfillment_type=FulfillmentType.PICKUP, created_at=created_at)
+    order.items = [
+        OrderItem(product_id=1, name="Milk", sku="MILK-1", unit_price=Decimal("5.00"), quantity=1, picked_status=state)
+        for state in picked
+    ]
+    return order
+
+
+def test_metrics_cover_window_in_one_cached_query(ops_db):
+    session, engine = ops_db
+    picker = User(email="picker@example.com", full_name="Picker", password_hash="x", role=Role.EMPLOYEE)
+    branch = Branch(name="Ops", address="Street 1")
+    session.add_all([picker, branch])
+    session.flush()
+    now = datetime.utcnow()
+    old = now - timedelta(days=3)
+    session.add_all([
+        _order(picker, branch, 1, OrderStatus.IN_PROGRESS, old, [PickedStatus.PENDING, PickedStatus.PENDING]),
+        _order(picker, branch, 2, OrderStatus.DELIVERED, now, [PickedStatus.PICKED]),
+        _order(picker, branch, 3, OrderStatus.DELIVERED, old, [PickedStatus.PICKED]),
+    ])
+    session.commit()
+    active = session.query(Order).filter_by(order_number="ORD-P1").one()
+    OpsOrderUpdateService.update_item_status(active.id, active.items[0].id, "PICKED", picker.id)
+
+    statements = []
+    listener = lambda _conn, _cursor, statement, *_args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        first = OpsPerformanceService.compute_metrics()
+        second = OpsPerformanceService.compute_metrics()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert sum("order_items" in statement for statement in statements) == 1
+    assert first == second
+    assert (first["totalOrders"], first["activeOrders"]) == (2, 1)
+    assert (first["pickedItems"], first["totalItems"]) == (2, 3)
+    assert first["batchEfficiency"] == 66.67
+    assert first["livePickers"] == 1
+    assert first["livePickersScope"] == "worker"
+
+
+def test_picker_activity_expires_outside_window():
+    activity = PickerActivity()
+    activity.touch(1, now=100.0)
+    activity.touch(2, now=350.0)
+    assert activity.count(300, now=390.0) == 2
+    assert activity.count(300, now=420.0) == 1
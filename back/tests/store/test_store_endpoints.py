@@ -1,6 +1,9 @@
 """Storefront endpoint smoke tests."""
 
-from app.models import Product
+import secrets
+
+from app.models import Category, Product, WishlistItem
+from app.services.catalog.query import BULK_LOOKUP_MAX_IDS
 
 def test_store_notifications_empty(client, customer_user, auth_header):
     response = client.get(
@@ -46,3 +49,25 @@ def test_store_wishlist_add_list_remove(client, session, customer_user, auth_hea
 
     list_empty = client.get("/api/v1/store/wishlist", headers=headers)
     assert list_empty.get_json()["data"]["items"] == []
+
+
+def test_store_wishlist_embeds_products_past_bulk_lookup_cap(client, session, customer_user, auth_header):
+    unique = secrets.token_hex(4)
+    category = Category(name=f"Wish {unique}")
+    session.add(category)
+    session.flush()
+    products = [
+        Product(name=f"Wish {unique} {i}", sku=f"WSH-{unique}-{i}", price="1.00", category_id=category.id)
+        for i in range(BULK_LOOKUP_MAX_IDS + 1)
+    ]
+    session.add_all(products)
+    session.flush()
+    session.add_all(WishlistItem(user_id=customer_user.id, product_id=product.id) for product in products)
+    session.commit()
+
+    response = client.get("/api/v1/store/wishlist?include=products", headers=auth_header(customer_user))
+
+    assert response.status_code == 200
+    items = response.get_json()["data"]["items"]
+    assert len(items) == len(products)
+    assert all(item["product"]["id"] == item["product_id"] for item in items)
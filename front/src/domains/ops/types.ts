@@ -38,6 +38,7 @@ export interface StaffPerformance {
 export interface OpsPerformanceMetrics {
   batchEfficiency: number;
   livePickers: number;
+  livePickersScope: "worker";
   activeOrders: number;
   totalOrders: number;
   pickedItems: number;